@@ -0,0 +1,142 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import ainews_scraper
+import article_db
+import circuit_breaker
+import cybernews_scraper
+import deadline
+
+# --- Aggregate refresh ---
+# Runs every source concurrently (at most MAX_CONCURRENCY listings at once;
+# detail fetches are additionally capped by fetch_pool) and merges the
+# results, so a full refresh costs about as much as the slowest source.
+# Under a request deadline the merge does not wait for sources still running
+# DEADLINE_GRACE seconds after it: they are reported as "timeout", and
+# sources that returned their cards without every detail page as "partial".
+
+MAX_CONCURRENCY = int(os.environ.get("AGGREGATE_MAX_CONCURRENCY", "8"))
+# Lets sources that hit the deadline themselves hand back their partial rows
+DEADLINE_GRACE = float(os.environ.get("AGGREGATE_DEADLINE_GRACE", "1"))
+
+# name -> (feed, callable returning the fresh articles and persisting them)
+SOURCES = {
+    "deepmind": ("ai", lambda: ainews_scraper.scrape_deepmind(return_results=True, save_csv=True)),
+    "wired": ("ai", lambda: ainews_scraper.scrape_wired(return_results=True, save_csv=True)),
+    "zdnet": ("ai", lambda: ainews_scraper.scrape_zdnet_ai_carousels(return_results=True, save_csv=True)),
+    "nvidia": ("ai", lambda: ainews_scraper.scrape_nvidia(return_results=True, save_csv=True)),
+    "forbes": ("ai", lambda: ainews_scraper.scrape_forbes_ai(return_results=True, save_csv=True)),
+    "thegradient": ("ai", lambda: ainews_scraper.scrape_thegradient(return_results=True, save_csv=True)),
+    "ainews": ("ai", lambda: ainews_scraper.scrape_ainews(return_results=True, save_csv=True)),
+    "marktechpost": ("ai", lambda: ainews_scraper.scrape_marktechpost(return_results=True, save_csv=True)),
+    "datascience": ("ai", lambda: ainews_scraper.scrape_towardsdatascience(return_results=True, save_csv=True)),
+    "cyberexpress": ("cyber", cybernews_scraper.cyberexpress_results),
+    "arstechnica": ("cyber", cybernews_scraper.arstechnica_results),
+    "infosecurity": ("cyber", cybernews_scraper.infosecurity_results),
+    "cyberscoop": ("cyber", cybernews_scraper.cyberscoop_results),
+    "gbhackers": ("cyber", cybernews_scraper.gbhackers_results),
+}
+
+
+def select_sources(feeds=None, names=None):
+    return [
+        name for name, (feed, _) in SOURCES.items()
+        if (not feeds or feed in feeds) and (not names or name in names)
+    ]
+
+
+def run_source(name):
+    feed, scrape = SOURCES[name]
+    started = time.monotonic()
+    status = {"feed": feed, "status": "ok", "count": 0, "error": None}
+    articles = []
+    try:
+        data = scrape()
+        if isinstance(data, dict) and "error" in data:
+            # scrape_forbes_ai reports failures as {"error": ...}
+            status["status"] = "error"
+            status["error"] = data["error"]
+        else:
+            articles = list(data or [])
+            if name in deadline.partial():
+                status["status"] = "partial"
+    except circuit_breaker.CircuitOpen as e:
+        status["status"] = "skipped"
+        status["error"] = str(e)
+    except Exception as e:
+        status["status"] = "error"
+        status["error"] = f"{type(e).__name__}: {e}"
+    status["count"] = len(articles)
+    status["elapsed"] = round(time.monotonic() - started, 3)
+    return status, articles
+
+
+def run_all(feeds=None, names=None, max_concurrency=None):
+    selected = select_sources(feeds, names)
+    started = time.monotonic()
+    statuses = {}
+    articles = []
+    workers = max(1, min(max_concurrency or MAX_CONCURRENCY, len(selected) or 1))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="source")
+    futures = [(name, deadline.submit(pool, run_source, name)) for name in selected]
+    left = deadline.remaining()
+    done, _ = wait([future for _, future in futures], timeout=None if left is None else left + DEADLINE_GRACE)
+    # Sources still running past the deadline finish in the background
+    pool.shutdown(wait=False, cancel_futures=True)
+    # Merge in registry order so the output is stable between runs
+    for name, future in futures:
+        if future in done:
+            status, items = future.result()
+        else:
+            deadline.mark_partial(name)
+            status = {"feed": SOURCES[name][0], "status": "timeout", "count": 0,
+                      "error": "deadline exceeded", "elapsed": round(time.monotonic() - started, 3)}
+            items = []
+        statuses[name] = status
+        for item in items:
+            articles.append(dict(item, source_name=name, feed=status["feed"]))
+    return summarize(statuses, articles, started)
+
+
+def summarize(statuses, articles, started):
+    """The run_all() result for per-source ``statuses`` and the merged ``articles``."""
+    return {
+        "elapsed": round(time.monotonic() - started, 3),
+        # A partial source still returned its articles
+        "ok": sum(1 for s in statuses.values() if s["status"] in ("ok", "partial")),
+        "failed": sum(1 for s in statuses.values() if s["status"] not in ("ok", "partial")),
+        "partial": deadline.partial(),
+        "sources": statuses,
+        "articles": articles,
+    }
+
+
+def cluster_ids(articles, name=None):
+    """Each article's near-duplicate cluster_id (see near_dup); None until it is stored.
+
+    ``name`` is the source of all of them; without it each item's source_name is used.
+    """
+    keys = [(name or item.get("source_name"), article_db.row_key(item)) for item in articles]
+    clusters = article_db.cluster_ids({key for key in keys if key[1]})
+    return [clusters.get(key) for key in keys]
+
+
+def with_clusters(result, dedupe=False):
+    """Add each article's near-duplicate cluster_id (see near_dup).
+
+    With ``dedupe`` only the first article of every cluster is kept (in
+    source order); it lists the others under ``also_in``.
+    """
+    articles = []
+    kept = {}
+    for item, cluster in zip(result["articles"], cluster_ids(result["articles"])):
+        item = dict(item, cluster_id=cluster)
+        if dedupe and cluster is not None:
+            if cluster in kept:
+                link = item.get("anchor_link") or item.get("article_url") or item.get("link")
+                kept[cluster].setdefault("also_in", []).append({"source_name": item.get("source_name"), "link": link})
+                continue
+            kept[cluster] = item
+        articles.append(item)
+    return dict(result, articles=articles)
@@ -0,0 +1,598 @@
+import base64
+import html
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import pandas as pd
+
+import near_dup
+import timestamps
+
+# --- SQLite article store ---
+# One table for every source, unique on (source, canonical URL).  Saving the
+# same article again fills in fields that were missing (e.g. a long_desc the
+# first scrape could not fetch) instead of adding a row.  Each row's
+# timestamp text is also stored as UTC epoch seconds (timestamp_epoch, see
+# timestamps.py), so sources with different date formats sort together and
+# "latest N from wired" is an index range scan.
+# The assets/csv/*.csv archives are still written; `python article_db.py
+# import` loads them into the database once.
+#
+# page() serves the JSON list views: newest first with a keyset cursor on
+# (timestamp_epoch, id) so every page is one range scan of the (source,
+# timestamp_epoch, id) index, an optional `since` on the same publish epoch
+# (an integer bound on that index; `seen_since` filters on first_seen, the
+# time we stored the row), and a column projection that leaves long_desc on
+# disk unless it is asked for.
+
+DB_PATH = os.environ.get("ARTICLE_DB_PATH", "assets/articles.sqlite")
+DEFAULT_LIMIT = int(os.environ.get("ARTICLE_PAGE_LIMIT", "50"))
+MAX_LIMIT = int(os.environ.get("ARTICLE_PAGE_MAX", "500"))
+
+# Left out of list views unless requested with fields=
+LIST_OMIT = ("long_desc",)
+
+COLUMNS = ["title", "short_desc", "long_desc", "author", "image_url", "category", "timestamp", "published", "source_url"]
+
+# Scrapers name the same things differently
+_ALIASES = {
+    "short_desc": ("short_desc", "short_description", "summary"),
+    "url": ("anchor_link", "article_url", "link"),
+    "source_url": ("source",),
+}
+
+# CSV archive -> source name, for the importer
+CSV_SOURCES = {
+    "deepmind.csv": "deepmind",
+    "wired.csv": "wired",
+    "zdnet_ai_carousels.csv": "zdnet",
+    "nvidia_blogs.csv": "nvidia",
+    "forbes_ai.csv": "forbes",
+    "thegradient.csv": "thegradient",
+    "ainews.csv": "ainews",
+    "marktechpost.csv": "marktechpost",
+    "towardsdatascience.csv": "datascience",
+    "cyberexpress.csv": "cyberexpress",
+    "arstechnica.csv": "arstechnica",
+    "infosecurity.csv": "infosecurity",
+    "cyberscoop.csv": "cyberscoop",
+    "gbhackers.csv": "gbhackers",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT,
+    short_desc TEXT,
+    long_desc TEXT,
+    author TEXT,
+    image_url TEXT,
+    category TEXT,
+    timestamp TEXT,
+    published INTEGER NOT NULL DEFAULT 0,
+    source_url TEXT,
+    extra TEXT,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS articles_source_url ON articles (source, url);
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+CREATE INDEX IF NOT EXISTS articles_source_first_seen ON articles (source, first_seen);
+CREATE TABLE IF NOT EXISTS article_signatures (
+    id INTEGER PRIMARY KEY,
+    signature BLOB NOT NULL
+);
+"""
+
+# Columns added after the first release: (name, type), added on connect when missing
+_MIGRATIONS = [("cluster_id", "INTEGER"), ("timestamp_epoch", "INTEGER")]
+
+# Indexes over migrated columns, and the text-timestamp ones they replace
+_MIGRATION_INDEXES = """
+DROP INDEX IF EXISTS articles_timestamp;
+DROP INDEX IF EXISTS articles_source_timestamp;
+DROP INDEX IF EXISTS articles_source_page;
+DROP INDEX IF EXISTS articles_page;
+CREATE INDEX IF NOT EXISTS articles_cluster ON articles (cluster_id);
+CREATE INDEX IF NOT EXISTS articles_source_epoch ON articles (source, COALESCE(timestamp_epoch, 0), id);
+CREATE INDEX IF NOT EXISTS articles_epoch ON articles (COALESCE(timestamp_epoch, 0), id);
+"""
+
+# --- Full-text index ---
+# articles_fts is an external-content FTS5 index over title / short_desc /
+# long_desc, kept in step with the table by triggers, so every upsert in
+# save_articles() updates it in the same transaction.  Re-saving an article
+# only touches the index when one of the indexed texts changed.  search()
+# ranks with BM25 (title weighted over the descriptions).
+#
+# Scoring is the expensive part for common terms, so search() scores at most
+# SEARCH_CANDIDATES hits: the newest ones (highest rowid), bounded by a rowid
+# that FTS5 applies while it reads the posting lists.  Two- and three-letter
+# prefixes are indexed (prefix='2 3') so "ran*" reads one list instead of
+# merging every term that starts that way; one-letter prefixes are refused.
+_FTS_DROP = """
+DROP TRIGGER IF EXISTS articles_fts_insert;
+DROP TRIGGER IF EXISTS articles_fts_delete;
+DROP TRIGGER IF EXISTS articles_fts_update;
+DROP TABLE IF EXISTS articles_fts;
+"""
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE articles_fts USING fts5(
+    title, short_desc, long_desc,
+    content='articles', content_rowid='id',
+    tokenize='porter unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+CREATE TRIGGER articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, short_desc, long_desc)
+    VALUES (new.id, new.title, new.short_desc, new.long_desc);
+END;
+CREATE TRIGGER articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, short_desc, long_desc)
+    VALUES ('delete', old.id, old.title, old.short_desc, old.long_desc);
+END;
+CREATE TRIGGER articles_fts_update AFTER UPDATE OF title, short_desc, long_desc ON articles
+WHEN old.title IS NOT new.title OR old.short_desc IS NOT new.short_desc OR old.long_desc IS NOT new.long_desc
+BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, short_desc, long_desc)
+    VALUES ('delete', old.id, old.title, old.short_desc, old.long_desc);
+    INSERT INTO articles_fts (rowid, title, short_desc, long_desc)
+    VALUES (new.id, new.title, new.short_desc, new.long_desc);
+END;
+INSERT INTO articles_fts (articles_fts) VALUES ('rebuild');
+"""
+
+# bm25() column weights: title, short_desc, long_desc
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+SNIPPET_TOKENS = int(os.environ.get("SEARCH_SNIPPET_TOKENS", "24"))
+SEARCH_CANDIDATES = int(os.environ.get("SEARCH_CANDIDATES", "2000"))
+
+_UPSERT = f"""
+INSERT INTO articles (source, url, {", ".join(COLUMNS)}, timestamp_epoch, extra, first_seen, updated_at)
+VALUES (?, ?, {", ".join("?" for _ in COLUMNS)}, ?, ?, ?, ?)
+ON CONFLICT (source, url) DO UPDATE SET
+    {", ".join(f"{col} = COALESCE(NULLIF(articles.{col}, ''), excluded.{col})" for col in COLUMNS if col != "published")},
+    published = MAX(articles.published, excluded.published),
+    -- follows the timestamp text kept above
+    timestamp_epoch = CASE WHEN NULLIF(articles.timestamp, '') IS NULL
+                           THEN excluded.timestamp_epoch ELSE articles.timestamp_epoch END,
+    extra = COALESCE(excluded.extra, articles.extra),
+    updated_at = excluded.updated_at
+"""
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_schema_ready = False
+
+
+def connection():
+    global _schema_ready
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not _schema_ready:
+            with _write_lock:
+                conn.executescript(_SCHEMA)
+                existing = {row["name"] for row in conn.execute("PRAGMA table_info(articles)")}
+                for name, kind in _MIGRATIONS:
+                    if name not in existing:
+                        conn.execute(f"ALTER TABLE articles ADD COLUMN {name} {kind}")
+                conn.commit()
+                if "timestamp_epoch" not in existing:
+                    _fill_epochs(conn)
+                conn.executescript(_MIGRATION_INDEXES)
+                fts = conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'").fetchone()
+                if fts is None or "prefix=" not in fts["sql"]:
+                    # First run on this database, or an index from before the prefix
+                    # option: (re)create and fill it from the existing rows
+                    if fts is not None:
+                        print("[DB] Rebuilding the full-text index with prefix indexes")
+                    conn.executescript("BEGIN;" + _FTS_DROP + _FTS_SCHEMA + "COMMIT;")
+                _schema_ready = True
+        _local.conn = conn
+    return conn
+
+
+def _fill_epochs(conn):
+    # Rows stored before timestamp_epoch existed; relative times count from first_seen
+    rows = conn.execute(
+        "SELECT id, source, timestamp, first_seen FROM articles "
+        "WHERE timestamp IS NOT NULL AND timestamp != '' ORDER BY source").fetchall()
+    updates = []
+    for source in dict.fromkeys(row["source"] for row in rows):
+        batch = [row for row in rows if row["source"] == source]
+        epochs = timestamps.epoch_ints([row["timestamp"] for row in batch], source,
+                                       now=[row["first_seen"] for row in batch])
+        updates.extend((epoch, row["id"]) for epoch, row in zip(epochs, batch) if epoch is not None)
+    with conn:
+        conn.executemany("UPDATE articles SET timestamp_epoch = ? WHERE id = ?", updates)
+    if updates:
+        print(f"[DB] Filled timestamp_epoch for {len(updates)} stored articles")
+
+
+def canonical_url(url):
+    # Lower-case scheme/host, drop the fragment and utm_* tracking parameters
+    parts = urlsplit(url.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not k.lower().startswith("utm_")])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def _first(row, names):
+    for name in names:
+        value = _clean(row.get(name))
+        if value is not None:
+            return value
+    return None
+
+
+def row_key(row):
+    """The url column value a scraper row is stored under, or None."""
+    url = _first(row, _ALIASES["url"])
+    if url:
+        return canonical_url(url)
+    title = _clean(row.get("title"))
+    if title:
+        # Nvidia / CyberExpress cards carry no link: key them on the title
+        return "title:" + " ".join(title.lower().split())
+    return None
+
+
+def normalize(row):
+    """Map a scraper row onto the table columns; None if it has no usable key."""
+    key = row_key(row)
+    if key is None:
+        return None
+    record = {"url": key}
+    for col in COLUMNS:
+        names = _ALIASES.get(col, (col,))
+        record[col] = _first(row, names)
+    published = record["published"]
+    record["published"] = 1 if published in (True, 1, "True", "true", "1") else 0
+    known = {"title", "long_desc", "author", "image_url", "category", "timestamp", "published"}
+    for names in _ALIASES.values():
+        known.update(names)
+    extra = {k: v for k, v in row.items() if k not in known and _clean(v) is not None}
+    record["extra"] = json.dumps(extra, ensure_ascii=False, default=str) if extra else None
+    return record
+
+
+def save_articles(source, rows):
+    """Upsert scraper rows for one source; returns the number of rows written."""
+    now = time.time()
+    records = [record for record in map(normalize, rows or []) if record is not None]
+    if not records:
+        return 0
+    epochs = timestamps.epoch_ints([record["timestamp"] for record in records], source, now)
+    params = [(source, record["url"], *[record[col] for col in COLUMNS], epoch, record["extra"], now, now)
+              for record, epoch in zip(records, epochs)]
+    conn = connection()
+    with _write_lock:
+        try:
+            with conn:
+                _upsert(conn, source, params)
+        except Exception:
+            # Rolled back: the in-memory index may hold clusters the database never got
+            near_dup.reset()
+            raise
+    return len(params)
+
+
+def _upsert(conn, source, params):
+    conn.executemany(_UPSERT, params)
+    # Re-cluster what was saved, in the same transaction
+    keys = [param[1] for param in params]
+    saved = []
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        saved.extend(conn.execute(
+            f"SELECT id, title, short_desc, long_desc FROM articles WHERE source = ? "
+            f"AND url IN ({', '.join('?' for _ in chunk)})", [source, *chunk]))
+    near_dup.update(conn, saved)
+
+
+def cluster_ids(keys):
+    """{(source, canonical url): cluster_id} for the given (source, url) pairs."""
+    found = {}
+    keys = list(keys)
+    for start in range(0, len(keys), 400):
+        chunk = keys[start:start + 400]
+        sql = ("SELECT source, url, cluster_id FROM articles WHERE "
+               + " OR ".join("(source = ? AND url = ?)" for _ in chunk))
+        for row in connection().execute(sql, [value for key in chunk for value in key]):
+            found[(row["source"], row["url"])] = row["cluster_id"]
+    return found
+
+
+def _to_dict(row):
+    item = {key: row[key] for key in row.keys() if key not in ("extra", "url")}
+    if not row["url"].startswith("title:"):
+        item["anchor_link"] = row["url"]
+    if "published" in item:
+        item["published"] = bool(item["published"])
+    if row["extra"]:
+        for key, value in json.loads(row["extra"]).items():
+            item.setdefault(key, value)
+    return item
+
+
+def query(source=None, limit=None, offset=0, published=None):
+    sql = "SELECT * FROM articles"
+    where, args = [], []
+    if source:
+        where.append("source = ?")
+        args.append(source)
+    if published is not None:
+        where.append("published = ?")
+        args.append(1 if published else 0)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY COALESCE(timestamp_epoch, 0) DESC, id DESC"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        args.extend([int(limit), int(offset)])
+    return [_to_dict(row) for row in connection().execute(sql, args)]
+
+
+def project(items, fields=None):
+    """Apply a fields= projection to article dicts; None drops LIST_OMIT."""
+    if fields is None:
+        return [{k: v for k, v in item.items() if k not in LIST_OMIT} for item in items]
+    if "*" in fields:
+        return items
+    return [{k: v for k, v in item.items() if k in fields} for item in items]
+
+
+def parse_fields(value):
+    # "title,timestamp" -> {"title", "timestamp"}; "all" / "*" -> everything
+    if not value:
+        return None
+    fields = {name.strip() for name in value.split(",") if name.strip()}
+    return {"*"} if fields & {"*", "all"} else fields
+
+
+def parse_since(value):
+    """Epoch seconds or an ISO date / datetime (UTC when no offset) -> epoch."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def encode_cursor(row):
+    raw = json.dumps([row["timestamp_epoch"] or 0, row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        epoch, row_id = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return int(epoch), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"invalid cursor: {token!r}") from e
+
+
+def page(source=None, limit=None, cursor=None, offset=0, since=None, fields=None, seen_since=None):
+    """One page of articles, newest first; returns (items, next_cursor).
+
+    ``cursor`` is the next_cursor of the previous page (keyset, stable while
+    rows are added); ``offset`` is the plain alternative.  ``since`` keeps
+    articles published at or after that epoch, ``seen_since`` those first
+    stored at or after it.  ``fields`` (a set, see parse_fields) selects the
+    keys returned; the default omits LIST_OMIT.
+    """
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    if fields is None:
+        columns = [col for col in COLUMNS if col not in LIST_OMIT]
+    elif "*" in fields:
+        columns = COLUMNS
+    else:
+        columns = [col for col in COLUMNS if col in fields]
+    sql = (f"SELECT id, source, url, extra, cluster_id, timestamp_epoch, first_seen, updated_at"
+           f"{''.join(', ' + col for col in columns)} FROM articles")
+    where, args = [], []
+    if source:
+        where.append("source = ?")
+        args.append(source)
+    if since is not None:
+        # Same expression as the index, so the bound is part of the range scan
+        where.append("COALESCE(timestamp_epoch, 0) >= ?")
+        args.append(math.ceil(float(since)))
+    if seen_since is not None:
+        where.append("first_seen >= ?")
+        args.append(float(seen_since))
+    if cursor:
+        epoch, row_id = decode_cursor(cursor)
+        # The first term lets SQLite seek the index instead of scanning from the top
+        where.append("COALESCE(timestamp_epoch, 0) <= ? AND (COALESCE(timestamp_epoch, 0), id) < (?, ?)")
+        args.extend([epoch, epoch, row_id])
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY COALESCE(timestamp_epoch, 0) DESC, id DESC LIMIT ? OFFSET ?"
+    # One extra row tells whether there is a next page
+    args.extend([limit + 1, int(offset or 0)])
+    rows = connection().execute(sql, args).fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1]) if more else None
+    items = [_to_dict(row) for row in rows]
+    if fields is not None:
+        items = project(items, fields)
+    return items, next_cursor
+
+
+def match_query(text):
+    """Free text -> FTS5 query: every word must match, "word*" is a prefix, "quoted words" a phrase."""
+    terms = []
+    for phrase, term in re.findall(r'"([^"]*)"|(\w+\*?)', text or ""):
+        if phrase:
+            words = re.findall(r"\w+", phrase)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+        elif term.endswith("*"):
+            if len(term) < 3:
+                raise ValueError("prefix searches need at least 2 characters")
+            terms.append(f'"{term.rstrip("*")}"*')
+        elif term:
+            terms.append(f'"{term}"')
+    if not terms:
+        raise ValueError("empty search query")
+    return " ".join(terms)
+
+
+def _marked(text):
+    # snippet()/highlight() wrap hits in \x02...\x03; escape the page text, then mark
+    if text is None:
+        return None
+    return html.escape(text).replace("\x02", "<mark>").replace("\x03", "</mark>")
+
+
+def search(text, sources=None, since=None, until=None, limit=20, offset=0, seen_since=None):
+    """BM25-ranked articles matching ``text``, best first, with highlighted snippets.
+
+    ``sources`` restricts to those source names; ``since`` / ``until`` are
+    epochs compared with the publish time (timestamp_epoch), ``seen_since``
+    with first_seen.  A query matching more than SEARCH_CANDIDATES articles
+    ranks the newest SEARCH_CANDIDATES of them.
+    """
+    limit = max(1, min(int(limit or 20), MAX_LIMIT))
+    where, args = ["articles_fts MATCH ?"], [match_query(text)]
+    if sources:
+        where.append(f"a.source IN ({', '.join('?' for _ in sources)})")
+        args.extend(sources)
+    if since is not None:
+        where.append("a.timestamp_epoch >= ?")
+        args.append(math.ceil(float(since)))
+    if until is not None:
+        where.append("a.timestamp_epoch < ?")
+        args.append(math.ceil(float(until)))
+    if seen_since is not None:
+        where.append("a.first_seen >= ?")
+        args.append(float(seen_since))
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    # The articles row is only needed for the filters
+    join = " JOIN articles a ON a.id = articles_fts.rowid" if len(where) > 1 else ""
+    conn = connection()
+    candidates = max(SEARCH_CANDIDATES, limit + int(offset or 0))
+    try:
+        # Walking the matches newest first is cheap; scoring all of them is not
+        cutoff = conn.execute(
+            f"SELECT articles_fts.rowid FROM articles_fts{join} WHERE {' AND '.join(where)} "
+            f"ORDER BY articles_fts.rowid DESC LIMIT 1 OFFSET ?", [*args, candidates - 1]).fetchone()
+    except sqlite3.OperationalError as e:
+        raise ValueError(f"bad search query: {e}") from e
+    if cutoff is not None:
+        where.append("articles_fts.rowid >= ?")
+        args.append(cutoff[0])
+    # Rank first, then build highlights / snippets for the returned page only:
+    # the CROSS JOINs make SQLite look those rows up by rowid instead of
+    # running the MATCH (and snippet()) over every hit again.
+    sql = f"""
+        WITH top AS (
+            SELECT articles_fts.rowid AS id, bm25(articles_fts, {weights}) AS score
+            FROM articles_fts{join}
+            WHERE {" AND ".join(where)}
+            ORDER BY score LIMIT ? OFFSET ?
+        )
+        SELECT a.id, a.source, a.url, a.image_url, a.timestamp, a.timestamp_epoch, a.first_seen, top.score,
+               highlight(articles_fts, 0, char(2), char(3)) AS title,
+               snippet(articles_fts, -1, char(2), char(3), '…', {SNIPPET_TOKENS}) AS snippet
+        FROM top CROSS JOIN articles_fts CROSS JOIN articles a
+        WHERE articles_fts MATCH ? AND articles_fts.rowid = top.id AND a.id = top.id
+        ORDER BY top.score
+    """
+    args.extend([limit, int(offset or 0), args[0]])
+    try:
+        rows = conn.execute(sql, args).fetchall()
+    except sqlite3.OperationalError as e:
+        raise ValueError(f"bad search query: {e}") from e
+    results = []
+    for row in rows:
+        item = {
+            "id": row["id"],
+            "source": row["source"],
+            "title": _marked(row["title"]),
+            "snippet": _marked(row["snippet"]),
+            "image_url": row["image_url"],
+            "timestamp": row["timestamp"],
+            "timestamp_epoch": row["timestamp_epoch"],
+            "first_seen": row["first_seen"],
+            "score": round(-row["score"], 4),
+        }
+        if not row["url"].startswith("title:"):
+            item["anchor_link"] = row["url"]
+        results.append(item)
+    return results
+
+
+def latest(source, limit=20):
+    return query(source=source, limit=limit)
+
+
+def counts():
+    return {row["source"]: row["n"] for row in connection().execute(
+        "SELECT source, COUNT(*) AS n FROM articles GROUP BY source")}
+
+
+def import_csvs(csv_dir="assets/csv", chunksize=5000):
+    """One-shot import of the existing CSV archives."""
+    imported = {}
+    for filename, source in CSV_SOURCES.items():
+        path = os.path.join(csv_dir, filename)
+        if not os.path.exists(path):
+            continue
+        total = 0
+        for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False):
+            total += save_articles(source, chunk.to_dict(orient="records"))
+        imported[source] = total
+        print(f"Imported {total} rows from {path} as '{source}'")
+
+    # Full texts kept separately for The Gradient: attach them by title
+    desc_path = os.path.join(csv_dir, "thegradient_descriptions.csv")
+    if os.path.exists(desc_path):
+        conn = connection()
+        df = pd.read_csv(desc_path, dtype=str, keep_default_na=False)
+        with _write_lock, conn:
+            conn.executemany(
+                "UPDATE articles SET long_desc = ? WHERE source = 'thegradient' AND title = ? "
+                "AND (long_desc IS NULL OR long_desc = '')",
+                [(row["long_desc"], row["title"]) for row in df.to_dict(orient="records") if row.get("long_desc")],
+            )
+        print(f"Attached descriptions from {desc_path}")
+    return imported
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "import":
+        import_csvs(sys.argv[2] if len(sys.argv) >= 3 else "assets/csv")
+        print(counts())
+    else:
+        print("Usage: python article_db.py import [csv_dir]")
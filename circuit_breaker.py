@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+
+import metrics
+
+# --- Per-source circuit breaker ---
+# A source whose scrape fails FAILURES times in a row is skipped for
+# COOL_OFF seconds: scrape_engine raises CircuitOpen straight away instead
+# of tying up a worker on a site that is down.  After the cool-off a single
+# trial run is let through; success closes the circuit, another failure
+# opens it for a further COOL_OFF.  Detail-page errors and deadline
+# cut-offs do not count, only runs that produced no listing; a trial that
+# ends in neither success() nor failure() (deadline, client disconnect) is
+# handed back with release() so the next run can try again.
+
+FAILURES = int(os.environ.get("CIRCUIT_FAILURES", "3"))
+COOL_OFF = float(os.environ.get("CIRCUIT_COOL_OFF", "300"))
+
+
+class CircuitOpen(Exception):
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} is failing; skipped for another {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+_lock = threading.Lock()
+_circuits = {}   # name -> {"failures", "opened_at", "trial"}
+
+
+def _circuit(name):
+    circuit = _circuits.get(name)
+    if circuit is None:
+        circuit = _circuits[name] = {"failures": 0, "opened_at": None, "trial": False}
+    return circuit
+
+
+def allow(name):
+    """Raise CircuitOpen if ``name`` is in its cool-off (or its trial run is in flight).
+
+    Returns True when this run is the half-open trial; the caller must then
+    end it with success(), failure() or release().
+    """
+    with _lock:
+        circuit = _circuit(name)
+        if circuit["opened_at"] is None:
+            return False
+        retry_after = circuit["opened_at"] + COOL_OFF - time.monotonic()
+        if retry_after <= 0 and not circuit["trial"]:
+            circuit["trial"] = True
+            return True
+    metrics.inc("scrape_circuit_open_total", source=name)
+    raise CircuitOpen(name, max(retry_after, 0.0))
+
+
+def release(name):
+    # The trial run ended without a verdict: let the next run be the trial
+    with _lock:
+        _circuit(name)["trial"] = False
+
+
+def success(name):
+    with _lock:
+        circuit = _circuit(name)
+        if circuit["opened_at"] is not None:
+            print(f"[CIRCUIT] {name} recovered")
+        circuit.update(failures=0, opened_at=None, trial=False)
+
+
+def failure(name):
+    with _lock:
+        circuit = _circuit(name)
+        circuit["failures"] += 1
+        if circuit["trial"] or circuit["failures"] >= FAILURES:
+            circuit.update(opened_at=time.monotonic(), trial=False)
+            print(f"[CIRCUIT] {name} open for {COOL_OFF:.0f}s after {circuit['failures']} failures")
+
+
+def states():
+    now = time.monotonic()
+    with _lock:
+        return {
+            name: {
+                "state": "closed" if c["opened_at"] is None else ("half-open" if c["trial"] else "open"),
+                "failures": c["failures"],
+                "retry_after": round(max(c["opened_at"] + COOL_OFF - now, 0.0), 1) if c["opened_at"] is not None else None,
+            }
+            for name, c in _circuits.items()
+        }
@@ -0,0 +1,121 @@
+import csv
+import hashlib
+import math
+import os
+import threading
+
+import pandas as pd
+
+# --- Append-only CSV archive ---
+# The history CSVs used to be re-read, concatenated, de-duplicated over every
+# column and rewritten on each save, i.e. O(total history) per scrape.
+# append_rows() only appends the rows whose dedup key has not been seen.  The
+# keys live in a sidecar "<csv>.keys" file (one hash per line) that is loaded
+# once per process and appended to alongside the CSV, so a save costs
+# O(new rows) no matter how big the archive gets.
+
+_lock = threading.Lock()
+_path_locks = {}
+_indexes = {}
+
+
+def _path_lock(path):
+    with _lock:
+        lock = _path_locks.get(path)
+        if lock is None:
+            lock = _path_locks[path] = threading.Lock()
+    return lock
+
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+def make_key(row, key_fields, normalize=None):
+    values = [_clean(row.get(field)) for field in key_fields]
+    if normalize:
+        values = [normalize(v) for v in values]
+    return hashlib.blake2b("\x1f".join(values).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _read_header(csv_path):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def _load_index(csv_path, key_fields, normalize):
+    index_path = csv_path + ".keys"
+    index = _indexes.get(csv_path)
+    if index is not None:
+        return index
+    if os.path.exists(index_path):
+        with open(index_path, encoding="utf-8") as f:
+            index = set(line.strip() for line in f if line.strip())
+    else:
+        # One-off bootstrap for archives written before the index existed
+        index = set()
+        if os.path.exists(csv_path) and os.path.getsize(csv_path) > 0:
+            header = _read_header(csv_path)
+            usecols = [field for field in key_fields if field in header]
+            if usecols:
+                df = pd.read_csv(csv_path, usecols=usecols, dtype=str, keep_default_na=False)
+                for row in df.to_dict(orient="records"):
+                    index.add(make_key(row, key_fields, normalize))
+        with open(index_path, "w", encoding="utf-8") as f:
+            f.writelines(key + "\n" for key in index)
+    _indexes[csv_path] = index
+    return index
+
+
+def _widen(csv_path, header, extra):
+    # Rare schema change (a scraper grew a column): rewrite once with the new header
+    df = pd.read_csv(csv_path)
+    for col in extra:
+        df[col] = None
+    df.to_csv(csv_path, index=False)
+    return header + extra
+
+
+def append_rows(csv_path, rows, key_fields, columns=None, normalize=None):
+    """Append the rows not already archived in csv_path; returns (appended, total)."""
+    os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+    with _path_lock(csv_path):
+        if not os.path.exists(csv_path):
+            # Archive deleted/moved away: start a fresh index with it
+            _indexes.pop(csv_path, None)
+            if os.path.exists(csv_path + ".keys"):
+                os.remove(csv_path + ".keys")
+        index = _load_index(csv_path, key_fields, normalize)
+
+        new_rows = []
+        new_keys = []
+        for row in rows:
+            key = make_key(row, key_fields, normalize)
+            if key in index:
+                continue
+            index.add(key)
+            new_rows.append(row)
+            new_keys.append(key)
+
+        wanted = list(columns or [])
+        for row in new_rows:
+            wanted.extend(col for col in row if col not in wanted)
+
+        exists = os.path.exists(csv_path) and os.path.getsize(csv_path) > 0
+        if exists:
+            header = _read_header(csv_path)
+            extra = [col for col in wanted if col not in header]
+            if extra:
+                header = _widen(csv_path, header, extra)
+        else:
+            header = wanted
+
+        if new_rows or not exists:
+            df = pd.DataFrame(new_rows).reindex(columns=header)
+            df.to_csv(csv_path, mode="a" if exists else "w", header=not exists, index=False)
+        if new_keys:
+            with open(csv_path + ".keys", "a", encoding="utf-8") as f:
+                f.writelines(key + "\n" for key in new_keys)
+        return len(new_rows), len(index)
@@ -0,0 +1,97 @@
+import contextlib
+import contextvars
+import os
+import time
+
+# --- Request deadlines ---
+# A deadline is set once per HTTP request (REQUEST_DEADLINE seconds) and
+# carried in a context variable, so it reaches every fetch made on behalf of
+# that request without being passed around: http_client caps each request's
+# timeout at the time left, fetch_pool and aggregate copy the context into
+# their worker threads, and a fetch that would start past the deadline
+# raises DeadlineExceeded.  Sources that run out of time in the detail phase
+# return the cards they already parsed and are recorded with mark_partial(),
+# which the endpoints report as X-Partial.  Without a deadline every fetch
+# still gets DEFAULT_TIMEOUT, so a hung site cannot block a worker forever.
+
+REQUEST_DEADLINE = float(os.environ.get("REQUEST_DEADLINE", "20"))
+DEFAULT_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "15"))
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class _Budget:
+    __slots__ = ("expires", "partial")
+
+    def __init__(self, expires, partial):
+        self.expires = expires
+        self.partial = partial   # source names cut short, shared with enclosing budgets
+
+
+_current = contextvars.ContextVar("deadline", default=None)
+
+
+def start(seconds):
+    """Set a deadline ``seconds`` from now (never later than an enclosing one); returns a token for end()."""
+    parent = _current.get()
+    expires = time.monotonic() + seconds
+    if parent is not None:
+        return _current.set(_Budget(min(expires, parent.expires), parent.partial))
+    return _current.set(_Budget(expires, set()))
+
+
+def end(token):
+    if token is not None:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def within(seconds):
+    token = start(seconds)
+    try:
+        yield
+    finally:
+        end(token)
+
+
+def remaining():
+    """Seconds left before the current deadline, or None when there is none."""
+    budget = _current.get()
+    if budget is None:
+        return None
+    return max(0.0, budget.expires - time.monotonic())
+
+
+def check():
+    if remaining() == 0.0:
+        raise DeadlineExceeded("request deadline exceeded")
+
+
+def timeout(requested=None):
+    """The timeout for one fetch: ``requested`` (or DEFAULT_TIMEOUT) capped at the time left."""
+    left = remaining()
+    wanted = DEFAULT_TIMEOUT if requested is None else requested
+    if left is None:
+        return wanted
+    if left == 0.0:
+        raise DeadlineExceeded("request deadline exceeded")
+    return min(wanted, left)
+
+
+def mark_partial(name):
+    budget = _current.get()
+    if budget is not None:
+        budget.partial.add(name)
+
+
+def partial():
+    """Names of the sources cut short by the current deadline."""
+    budget = _current.get()
+    return sorted(budget.partial) if budget is not None else []
+
+
+def submit(pool, fn, *args):
+    # Run fn in a worker thread under the caller's deadline
+    return pool.submit(contextvars.copy_context().run, fn, *args)
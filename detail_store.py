@@ -0,0 +1,85 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# --- Article detail store ---
+# Parsed detail-page fields (long_desc, author, image_url, ...) keyed by
+# source + article URL.  Published articles almost never change, so
+# fetch_details() answers from here and only fetches URLs it has not seen
+# (or whose entry is older than the TTL).  DETAIL_CACHE_TTL is in seconds;
+# 0 / unset keeps entries forever.
+
+STORE_PATH = os.environ.get("DETAIL_CACHE_PATH", "assets/cache/details.sqlite")
+DEFAULT_TTL = int(os.environ.get("DETAIL_CACHE_TTL", "0")) or None
+ENABLED = os.environ.get("DETAIL_CACHE", "1") != "0"
+
+_lock = threading.Lock()
+_conn = None
+stats = {"hits": 0, "misses": 0, "stores": 0}
+
+
+def _connection():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(STORE_PATH) or ".", exist_ok=True)
+        _conn = sqlite3.connect(STORE_PATH, check_same_thread=False, isolation_level=None)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS details (
+                namespace TEXT NOT NULL,
+                url TEXT NOT NULL,
+                data TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (namespace, url)
+            )
+        """)
+    return _conn
+
+
+def get_many(namespace, urls, ttl=None):
+    """Return {url: detail} for every url with a usable stored entry."""
+    urls = [url for url in dict.fromkeys(urls) if url]
+    if not ENABLED or not urls:
+        return {}
+    ttl = ttl if ttl is not None else DEFAULT_TTL
+    oldest = time.time() - ttl if ttl else 0
+    found = {}
+    with _lock:
+        conn = _connection()
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT url, data FROM details WHERE namespace = ? AND stored_at >= ? AND url IN ({placeholders})",
+                [namespace, oldest, *chunk],
+            ).fetchall()
+            for url, data in rows:
+                found[url] = json.loads(data)
+        stats["hits"] += len(found)
+        stats["misses"] += len(urls) - len(found)
+    return found
+
+
+def put_many(namespace, details):
+    """Store {url: detail}; empty/failed details are skipped so they get retried."""
+    rows = [(namespace, url, json.dumps(detail, ensure_ascii=False), time.time())
+            for url, detail in details.items() if url and detail]
+    if not ENABLED or not rows:
+        return
+    with _lock:
+        _connection().executemany(
+            "INSERT OR REPLACE INTO details (namespace, url, data, stored_at) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        stats["stores"] += len(rows)
+
+
+def forget(namespace, url=None):
+    with _lock:
+        if url is None:
+            _connection().execute("DELETE FROM details WHERE namespace = ?", (namespace,))
+        else:
+            _connection().execute("DELETE FROM details WHERE namespace = ? AND url = ?", (namespace, url))
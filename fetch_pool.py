@@ -0,0 +1,113 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from urllib.parse import urlparse
+
+import deadline
+import detail_store
+import metrics
+
+# --- Detail page worker pool ---
+# Every listing scraper collects its cards first and then hands the detail
+# URLs to fetch_details(), which fetches/parses them in parallel.  The pool is
+# bounded per call (MAX_WORKERS) and per host across the whole process
+# (PER_HOST_LIMIT), so two listings on the same site never hammer it together.
+# MAX_IN_FLIGHT caps detail fetches across all listings running at once
+# (e.g. the /all aggregate).  Workers run under the caller's deadline; when
+# it passes, iteration stops with DeadlineExceeded without waiting for the
+# pages still in flight.
+
+MAX_WORKERS = int(os.environ.get("DETAIL_MAX_WORKERS", "16"))
+PER_HOST_LIMIT = int(os.environ.get("DETAIL_PER_HOST", "8"))
+MAX_IN_FLIGHT = int(os.environ.get("DETAIL_MAX_IN_FLIGHT", "32"))
+
+_in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+# work() result for a page given up on because the deadline passed
+_EXPIRED = object()
+
+
+def host_of(url):
+    return urlparse(url).netloc.lower()
+
+
+def host_semaphore(url):
+    host = host_of(url)
+    with _host_semaphores_lock:
+        sem = _host_semaphores.get(host)
+        if sem is None:
+            sem = threading.BoundedSemaphore(PER_HOST_LIMIT)
+            _host_semaphores[host] = sem
+    return sem
+
+
+def iter_details(urls, parse_detail, max_workers=None, cache_as=None, ttl=None):
+    """Yield (url, detail) for every distinct url as soon as it is ready.
+
+    Detail-store hits come first, then fetched pages in completion order;
+    failed calls give None.  Fetched results are saved to the detail store
+    when the iteration ends, also when the caller stops early or the
+    deadline (see deadline.py) passes.
+    """
+    pending = [url for url in dict.fromkeys(urls) if url]
+    if not pending:
+        return
+
+    known = detail_store.get_many(cache_as, pending, ttl=ttl) if cache_as else {}
+    yield from known.items()
+    pending = [url for url in pending if url not in known]
+    if not pending:
+        return
+
+    def work(url):
+        with host_semaphore(url), _in_flight:
+            metrics.inc("scrape_detail_pages_total", source=cache_as or host_of(url))
+            try:
+                return parse_detail(url)
+            except Exception as e:
+                if isinstance(e, deadline.DeadlineExceeded) or deadline.remaining() == 0.0:
+                    return _EXPIRED
+                metrics.inc("scrape_errors_total", source=cache_as or host_of(url), stage="detail_page")
+                print(f"[DETAIL ERROR] {url}: {e}")
+                return None
+
+    fetched = {}
+    expired = False
+    workers = max(1, min(max_workers or MAX_WORKERS, len(pending)))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="detail")
+    try:
+        futures = {deadline.submit(pool, work, url): url for url in pending}
+        try:
+            for future in as_completed(futures, timeout=deadline.remaining()):
+                url = futures[future]
+                detail = future.result()
+                if detail is _EXPIRED:
+                    # Keep collecting what still arrives in time
+                    continue
+                fetched[url] = detail
+                yield url, detail
+        except FuturesTimeout:
+            expired = True
+        if expired or len(fetched) < len(pending):
+            raise deadline.DeadlineExceeded(f"{len(pending) - len(fetched)} detail pages unfinished")
+    finally:
+        # A consumer that stops early (closed stream) cancels what has not
+        # started; past the deadline the running fetches are not waited for
+        pool.shutdown(wait=not expired, cancel_futures=True)
+        if cache_as:
+            detail_store.put_many(cache_as, fetched)
+
+
+def fetch_details(urls, parse_detail, max_workers=None, cache_as=None, ttl=None):
+    """Run parse_detail(url) for every url concurrently.
+
+    Returns a list aligned with ``urls``; empty urls and failed calls give None.
+    With ``cache_as`` (a source name) results are looked up in / saved to the
+    detail store, so already-seen articles are not fetched again.
+    """
+    details = dict(iter_details(urls, parse_detail, max_workers=max_workers, cache_as=cache_as, ttl=ttl))
+    return [details.get(url) if url else None for url in urls]
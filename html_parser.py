@@ -0,0 +1,85 @@
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# --- HTML parsing backend ---
+# make_soup() replaces the BeautifulSoup(text, "html.parser") calls in the
+# scrapers.  It builds the tree with lxml when it is installed (several times
+# faster than the pure-Python html.parser), and with only=(name, attrs) it
+# builds just the container the scraper actually reads (SoupStrainer-style)
+# instead of the whole page.  When selectolax is installed the container is
+# first cut out of the page with its C parser and only that fragment is
+# handed to BeautifulSoup.  HTML_PARSER forces a tree builder.
+
+try:
+    import lxml  # noqa: F401
+    _DEFAULT_PARSER = "lxml"
+except ImportError:
+    _DEFAULT_PARSER = "html.parser"
+
+try:
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+
+PARSER = os.environ.get("HTML_PARSER") or _DEFAULT_PARSER
+USE_SELECTOLAX = _SelectolaxParser is not None and os.environ.get("HTML_SELECTOLAX", "1") != "0"
+
+
+def backend():
+    return {"parser": PARSER, "selectolax": USE_SELECTOLAX}
+
+
+def _css_ident(value):
+    # Tailwind-style classes ("sm:grid-cols-2") need their punctuation escaped
+    return re.sub(r"([^\w-])", r"\\\1", value)
+
+
+def to_css(name, attrs):
+    """CSS selector equivalent to SoupStrainer(name, attrs), or None if there isn't one."""
+    selector = name or ""
+    for key, value in (attrs or {}).items():
+        if not isinstance(value, str):
+            return None
+        if key == "id":
+            selector += "#" + _css_ident(value)
+        elif key == "class":
+            selector += "".join("." + _css_ident(c) for c in value.split())
+        else:
+            selector += f'[{key}="{value}"]'
+    return selector or None
+
+
+def _cut_with_selectolax(markup, css):
+    if isinstance(markup, bytes):
+        markup = markup.decode("utf-8", errors="replace")
+    nodes = _SelectolaxParser(markup).css(css)
+    return "".join(node.html for node in nodes)
+
+
+def _class_matcher(wanted):
+    # While parsing, the strainer sees the raw class="a b" string rather than
+    # the split list find() uses, so give a single class find()'s semantics.
+    def match(value):
+        return value is not None and (value == wanted or wanted in value.split())
+    return match
+
+
+def _strainer(name, attrs):
+    attrs = dict(attrs or {})
+    if isinstance(attrs.get("class"), str):
+        attrs["class"] = _class_matcher(attrs["class"])
+    return SoupStrainer(name, attrs)
+
+
+def make_soup(markup, only=None, parser=None):
+    """Parse markup; only=(name, attrs) restricts the tree to matching subtrees."""
+    parser = parser or PARSER
+    if only is None:
+        return BeautifulSoup(markup, parser)
+    name, attrs = only
+    css = to_css(name, attrs) if USE_SELECTOLAX else None
+    if css:
+        markup = _cut_with_selectolax(markup, css)
+    return BeautifulSoup(markup, parser, parse_only=_strainer(name, attrs))
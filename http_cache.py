@@ -0,0 +1,174 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# --- On-disk HTTP cache ---
+# Used by http_client.get() for every listing and article fetch.  Bodies are
+# stored zlib-compressed in a single SQLite file together with their
+# validators; repeat fetches send If-None-Match / If-Modified-Since and a 304
+# is answered from the local copy.  Responses with a Cache-Control max-age
+# are served without touching the network while they are fresh.  The file is
+# kept under MAX_BYTES by evicting the least recently used entries.
+
+CACHE_PATH = os.environ.get("HTTP_CACHE_PATH", "assets/cache/http_cache.sqlite")
+MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+ENABLED = os.environ.get("HTTP_CACHE", "1") != "0"
+
+# Headers that describe the transfer, not the (already decoded) body we store
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+_lock = threading.Lock()
+_conn = None
+stats = {"fresh_hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+class CacheEntry:
+    def __init__(self, url, headers, body, encoding, etag, last_modified, stored_at, max_age):
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.max_age = max_age
+
+    def is_fresh(self):
+        return self.max_age is not None and time.time() - self.stored_at < self.max_age
+
+    def validators(self):
+        conditional = {}
+        if self.etag:
+            conditional["If-None-Match"] = self.etag
+        if self.last_modified:
+            conditional["If-Modified-Since"] = self.last_modified
+        return conditional
+
+
+def _connection():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(CACHE_PATH) or ".", exist_ok=True)
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False, isolation_level=None)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                max_age INTEGER,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        _conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+    return _conn
+
+
+def _max_age(headers):
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control or "private" in cache_control:
+        return None
+    for directive in cache_control.split(","):
+        name, _, value = directive.strip().partition("=")
+        if name == "max-age" and value.isdigit():
+            return int(value)
+    return None
+
+
+def count(name):
+    with _lock:
+        stats[name] += 1
+
+
+def lookup(url):
+    if not ENABLED:
+        return None
+    with _lock:
+        row = _connection().execute(
+            "SELECT headers, body, encoding, etag, last_modified, stored_at, max_age FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        _connection().execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+    headers, body, encoding, etag, last_modified, stored_at, max_age = row
+    return CacheEntry(url, json.loads(headers), zlib.decompress(body), encoding, etag, last_modified, stored_at, max_age)
+
+
+def store(url, response):
+    if not ENABLED or response.status_code != 200:
+        return
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    max_age = _max_age(response.headers)
+    if not (etag or last_modified or max_age):
+        # Nothing to revalidate against and no freshness lifetime: not worth keeping
+        return
+    headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS}
+    body = zlib.compress(response.content, 6)
+    now = time.time()
+    with _lock:
+        conn = _connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (url, headers, body, size, encoding, etag, last_modified, max_age, stored_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, json.dumps(headers), body, len(body), response.encoding, etag, last_modified, max_age, now, now),
+        )
+        stats["stores"] += 1
+        _evict(conn)
+
+
+def refresh(entry, not_modified):
+    # A 304 may carry updated validators / Cache-Control
+    etag = not_modified.headers.get("ETag") or entry.etag
+    last_modified = not_modified.headers.get("Last-Modified") or entry.last_modified
+    max_age = _max_age(not_modified.headers) if "Cache-Control" in not_modified.headers else entry.max_age
+    now = time.time()
+    with _lock:
+        _connection().execute(
+            "UPDATE responses SET etag = ?, last_modified = ?, max_age = ?, stored_at = ?, accessed_at = ? WHERE url = ?",
+            (etag, last_modified, max_age, now, now, entry.url),
+        )
+
+
+def _evict(conn):
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total <= MAX_BYTES:
+        return
+    # Evict down to 90% so we don't evict again on the very next store
+    target = int(MAX_BYTES * 0.9)
+    for url, size in conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall():
+        if total <= target:
+            break
+        conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+        total -= size
+        stats["evictions"] += 1
+
+
+def to_response(entry, request=None):
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = entry.url
+    response.headers = CaseInsensitiveDict(entry.headers)
+    response._content = entry.body
+    response.encoding = entry.encoding
+    response.request = request
+    response.from_cache = True
+    return response
+
+
+def clear():
+    with _lock:
+        _connection().execute("DELETE FROM responses")
@@ -0,0 +1,349 @@
+import collections
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import deadline
+import fetch_pool
+import http_cache
+import metrics
+import rate_limit
+
+# --- Shared HTTP client ---
+# One process-wide requests.Session so every scraper reuses keep-alive
+# connections instead of doing a fresh TCP+TLS handshake per article.
+# urllib3 keeps one connection pool per host; POOL_CONNECTIONS is how many
+# host pools are kept alive and POOL_MAXSIZE how many idle connections each
+# pool holds (keep it >= fetch_pool.PER_HOST_LIMIT).
+
+POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", "32"))
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "16"))
+
+# --- Hedged requests ---
+# get(..., hedge=True) (detail pages) sends a second copy of a request that
+# has not answered within the host's observed HEDGE_QUANTILE latency and
+# returns whichever answers first; the slower response is closed when it
+# arrives.  Latency is the time session().get() takes: the whole body, or
+# up to the headers for stream=True.  Hedging starts once a host has
+# HEDGE_MIN_SAMPLES timings, skips rate-limited hosts (the copy would only
+# queue behind the limiter), and is capped by a global budget: every request
+# earns HEDGE_BUDGET of a hedge, up to HEDGE_BURST saved up.  The copy also
+# needs a free slot of the host's fetch_pool semaphore (taken without
+# waiting, held until both copies finish), so hedging never exceeds
+# DETAIL_PER_HOST requests to a host.
+
+# --- Pinned requests ---
+# get(..., address=ip) dials that address instead of resolving the URL's host
+# again (image_store checks where a host resolves, then fetches from exactly
+# that address, so a DNS answer that changes in between cannot redirect the
+# connection).  The Host header, TLS SNI and certificate check still use the
+# host name.  Pinned requests are never hedged and never follow redirects.
+
+HEDGE = os.environ.get("HTTP_HEDGE", "1") == "1"
+HEDGE_QUANTILE = float(os.environ.get("HEDGE_QUANTILE", "0.9"))
+HEDGE_MIN_SAMPLES = int(os.environ.get("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_BUDGET = float(os.environ.get("HEDGE_BUDGET", "0.1"))
+HEDGE_BURST = float(os.environ.get("HEDGE_BURST", "10"))
+HEDGE_WORKERS = int(os.environ.get("HEDGE_WORKERS", "64"))
+LATENCY_WINDOW = int(os.environ.get("HTTP_LATENCY_WINDOW", "200"))
+
+BROWSER_UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
+
+# Header profiles, formerly the per-module headers / headers_zdnet /
+# headers_forbes / headers_gradient dicts.
+PROFILES = {
+    "default": {
+        "User-Agent": BROWSER_UA,
+        "Accept-Language": "en-US,en;q=0.9",
+        "Referer": "https://www.google.com/"
+    },
+    "zdnet": {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+    },
+    "forbes": {
+        "User-Agent": BROWSER_UA,
+        "Accept-Language": "en-US,en;q=0.9",
+        "Referer": "https://www.google.com/"
+    },
+    "gradient": {
+        "User-Agent": BROWSER_UA,
+        "Accept-Language": "en-US,en;q=0.9",
+        "Referer": "https://www.google.com/"
+    },
+    "basic": {
+        "User-Agent": "Mozilla/5.0",
+        "Accept-Language": "en-US,en;q=0.9",
+    },
+    # requests' own defaults, for sites we never sent custom headers to
+    "plain": {},
+}
+
+_stats_lock = threading.Lock()
+_pool_stats = {}
+
+
+def _count(host, field):
+    with _stats_lock:
+        counters = _pool_stats.setdefault(host, {"requests": 0, "new_connections": 0})
+        counters[field] += 1
+
+
+class _CountingPoolMixin:
+    # _get_conn runs once per request attempt, _new_conn only when the pool
+    # had no idle keep-alive connection to hand out.
+    def _get_conn(self, timeout=None):
+        _count(self.host, "requests")
+        return super()._get_conn(timeout)
+
+    def _new_conn(self):
+        _count(self.host, "new_connections")
+        return super()._new_conn()
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _CountingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+class _PinnedAdapter(_CountingAdapter):
+    # The request URL holds the pinned IP; TLS is checked against the host name
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        if host_params["scheme"] == "https":
+            pool_kwargs["server_hostname"] = pool_kwargs["assert_hostname"] = request.pinned_host
+        return host_params, pool_kwargs
+
+
+_session = None
+_pinned = None
+_session_lock = threading.Lock()
+
+
+def _build_session(pool_connections, pool_maxsize):
+    session = requests.Session()
+    adapter = _CountingAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session(POOL_CONNECTIONS, POOL_MAXSIZE)
+    return _session
+
+
+def configure(pool_connections=None, pool_maxsize=None):
+    global _session, POOL_CONNECTIONS, POOL_MAXSIZE
+    with _session_lock:
+        POOL_CONNECTIONS = pool_connections or POOL_CONNECTIONS
+        POOL_MAXSIZE = pool_maxsize or POOL_MAXSIZE
+        old, _session = _session, _build_session(POOL_CONNECTIONS, POOL_MAXSIZE)
+    if old is not None:
+        old.close()
+
+
+_latency_lock = threading.Lock()
+_latencies = {}   # (host, stream) -> recent request seconds
+_hedge_tokens = HEDGE_BURST
+_hedge_pool = None
+hedge_stats = {"requests": 0, "hedged": 0, "wins": 0, "over_budget": 0, "host_busy": 0}
+
+
+def _pinned_get(url, address, headers, kwargs):
+    global _pinned
+    parts = urlparse(url)
+    host = f"[{address}]" if ":" in address else address
+    netloc = f"{host}:{parts.port}" if parts.port else host
+    prepared = requests.Request("GET", parts._replace(netloc=netloc).geturl(),
+                                headers=dict(headers, Host=parts.netloc.rpartition("@")[2])).prepare()
+    prepared.pinned_host = parts.hostname
+    with _session_lock:
+        if _pinned is None:
+            _pinned = _PinnedAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    return _pinned.send(prepared, stream=kwargs.get("stream", False), timeout=kwargs.get("timeout"),
+                        verify=kwargs.get("verify", True), cert=kwargs.get("cert"))
+
+
+def _send(url, headers, kwargs, address=None):
+    rate_limit.acquire(url, max_wait=deadline.remaining())
+    started = time.perf_counter()
+    if address is None:
+        response = session().get(url, headers=headers, **kwargs)
+    else:
+        response = _pinned_get(url, address, headers, kwargs)
+    elapsed = time.perf_counter() - started
+    host = urlparse(url).netloc.lower()
+    with _latency_lock:
+        key = (host, bool(kwargs.get("stream")))
+        window = _latencies.get(key)
+        if window is None:
+            window = _latencies[key] = collections.deque(maxlen=LATENCY_WINDOW)
+        window.append(elapsed)
+    metrics.observe("http_request_seconds", elapsed, host=host)
+    return response
+
+
+def hedge_delay(url, stream=False):
+    """Seconds after which a request to ``url`` is hedged, or None (too few samples)."""
+    with _latency_lock:
+        window = _latencies.get((urlparse(url).netloc.lower(), bool(stream)))
+        if window is None or len(window) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(window)
+    return ordered[min(len(ordered) - 1, int(HEDGE_QUANTILE * len(ordered)))]
+
+
+def _spend_hedge():
+    with _latency_lock:
+        global _hedge_tokens
+        if _hedge_tokens < 1:
+            hedge_stats["over_budget"] += 1
+            return False
+        _hedge_tokens -= 1
+        hedge_stats["hedged"] += 1
+        return True
+
+
+def _close_loser(future):
+    if future.exception() is None:
+        future.result().close()
+
+
+def _hedged_send(url, headers, kwargs, delay):
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _session_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+    primary = deadline.submit(_hedge_pool, _send, url, headers, kwargs)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+    slot = fetch_pool.host_semaphore(url)
+    if not slot.acquire(blocking=False):
+        with _latency_lock:
+            hedge_stats["host_busy"] += 1
+        return primary.result()
+    if not _spend_hedge():
+        slot.release()
+        return primary.result()
+    host = urlparse(url).netloc.lower()
+    metrics.inc("http_hedges_total", host=host)
+    backup = deadline.submit(_hedge_pool, _send, url, headers, kwargs)
+    # The caller's own slot is freed as soon as it returns, so the extra slot
+    # stays taken until both copies are finished (whichever one loses)
+    wait_for_both = [2]
+    def release(future):
+        with _latency_lock:
+            wait_for_both[0] -= 1
+            last = not wait_for_both[0]
+        if last:
+            slot.release()
+    primary.add_done_callback(release)
+    backup.add_done_callback(release)
+    done, _ = wait([primary, backup], return_when=FIRST_COMPLETED)
+    winner = primary if primary in done else backup
+    if winner.exception() is not None:
+        # The first answer failed: the other copy is the result (or the error)
+        winner = backup if winner is primary else primary
+    loser = backup if winner is primary else primary
+    loser.add_done_callback(_close_loser)
+    if winner is backup:
+        metrics.inc("http_hedge_wins_total", host=host)
+        with _latency_lock:
+            hedge_stats["wins"] += 1
+    return winner.result()
+
+
+def profile_headers(profile="default", headers=None):
+    merged = dict(PROFILES[profile])
+    if headers:
+        merged.update(headers)
+    return merged
+
+
+def get(url, profile="default", headers=None, cache=True, hedge=False, address=None, **kwargs):
+    request_headers = profile_headers(profile, headers)
+    use_cache = cache and http_cache.ENABLED and not kwargs.get("stream")
+    entry = http_cache.lookup(url) if use_cache else None
+    if entry is not None:
+        if entry.is_fresh():
+            http_cache.count("fresh_hits")
+            return http_cache.to_response(entry)
+        request_headers.update(entry.validators())
+
+    # Every request gets a timeout, capped at what is left of the deadline
+    kwargs["timeout"] = deadline.timeout(kwargs.get("timeout"))
+    delay = None
+    if hedge and HEDGE and address is None:
+        with _latency_lock:
+            global _hedge_tokens
+            _hedge_tokens = min(HEDGE_BURST, _hedge_tokens + HEDGE_BUDGET)
+            hedge_stats["requests"] += 1
+        if not rate_limit.rate_for(url):
+            delay = hedge_delay(url, kwargs.get("stream"))
+    if delay is not None:
+        response = _hedged_send(url, request_headers, kwargs, delay)
+    else:
+        response = _send(url, request_headers, kwargs, address)
+
+    if entry is not None and response.status_code == 304:
+        http_cache.refresh(entry, response)
+        http_cache.count("revalidated")
+        return http_cache.to_response(entry, response.request)
+    if not kwargs.get("stream"):
+        # Streamed bodies are counted by stream_extract as they are read
+        metrics.inc("http_downloaded_bytes_total", len(response.content), host=urlparse(url).netloc.lower())
+    if use_cache:
+        http_cache.count("misses")
+        http_cache.store(url, response)
+    return response
+
+
+def pool_stats():
+    with _stats_lock:
+        hosts = {host: dict(counters) for host, counters in _pool_stats.items()}
+    for counters in hosts.values():
+        counters["hits"] = max(counters["requests"] - counters["new_connections"], 0)
+        counters["misses"] = counters["new_connections"]
+    return {
+        "pool_connections": POOL_CONNECTIONS,
+        "pool_maxsize": POOL_MAXSIZE,
+        "hits": sum(c["hits"] for c in hosts.values()),
+        "misses": sum(c["misses"] for c in hosts.values()),
+        "hosts": hosts,
+        "hedging": hedge_summary(),
+    }
+
+
+def hedge_summary():
+    with _latency_lock:
+        summary = dict(hedge_stats, enabled=HEDGE, budget_tokens=round(_hedge_tokens, 2))
+    summary["delays"] = {
+        f"{host}{' (stream)' if stream else ''}": round(delay, 3)
+        for host, stream in list(_latencies)
+        if (delay := hedge_delay(f"https://{host}/", stream)) is not None
+    }
+    return summary
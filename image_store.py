@@ -0,0 +1,325 @@
+import hashlib
+import ipaddress
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urljoin, urlparse
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+import fetch_pool
+import http_client
+import metrics
+import parse_pool
+
+# --- Local image cache ---
+# Article images used to be hotlinked: every render made the browser pull
+# full-size files from a dozen CDNs.  attach() now gives each row whose
+# image_url is cached an "image" field, /img/<hash>, served by this app with
+# a one-year immutable Cache-Control; images not cached yet are queued for
+# download and the row keeps its hotlink until they are.
+#
+# Downloads run in a small background thread pool (outside any request
+# deadline) and are stored by the SHA-256 of their bytes under IMAGE_DIR, so
+# the same picture behind several URLs is kept once.  prefetch(root=...)
+# stores new files under another directory (scrape_zdnet_ai_carousels'
+# image_dir); each blob remembers its root.  When Pillow is
+# installed a THUMB_SIZE JPEG thumbnail is cut from each new file in
+# parse_pool's worker processes (decoding and resizing is CPU-bound, and one
+# CPU-sized pool per process is enough) and /img/<hash> serves
+# that; /img/<hash>?size=full always serves the original.  A URL only gets
+# its /img link once its thumbnail is settled, so the bytes behind a link
+# never change.  Pillow is in requirements.txt; without it the first
+# prefetch prints that thumbnails are off and /img serves the originals.
+# Failed downloads are retried after RETRY_AFTER seconds.
+#
+# The URLs come from scraped pages, so every hop (redirects are followed by
+# hand, at most MAX_REDIRECTS) must be http(s) to a host that resolves only
+# to public addresses: nothing on loopback, private, link-local or reserved
+# networks is ever fetched on a page's behalf.  The connection is pinned to
+# the address that was checked (http_client.get(address=...)), and each hop
+# takes its own host's fetch_pool slot.  Hosts listed in IMAGE_ALLOW_HOSTS
+# (comma separated, e.g. a local stand-in image server for testing) skip the
+# address check.
+
+IMAGE_DIR = os.environ.get("IMAGE_DIR", "assets/images/img")
+INDEX_PATH = os.environ.get("IMAGE_INDEX_PATH", "assets/cache/images.sqlite")
+ENABLED = os.environ.get("IMAGE_CACHE", "1") != "0"
+WORKERS = int(os.environ.get("IMAGE_WORKERS", "8"))
+THUMB_SIZE = int(os.environ.get("IMAGE_THUMB_SIZE", "256"))   # square, twice the 128px the pages show
+THUMB_QUALITY = int(os.environ.get("IMAGE_THUMB_QUALITY", "82"))
+MAX_BYTES = int(os.environ.get("IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+MAX_REDIRECTS = 3
+ALLOW_HOSTS = {host.strip().lower() for host in os.environ.get("IMAGE_ALLOW_HOSTS", "").split(",") if host.strip()}
+RETRY_AFTER = int(os.environ.get("IMAGE_RETRY_AFTER", str(24 * 3600)))
+MAX_AGE = 365 * 24 * 3600
+
+_lock = threading.Lock()
+_conn = None
+_known = None        # url -> hash, for URLs whose image is ready to serve
+_pending = set()     # urls queued or downloading
+_downloads = None
+_resumed = False
+stats = {"queued": 0, "downloaded": 0, "deduplicated": 0, "failed": 0, "thumbnails": 0, "thumbnail_errors": 0}
+
+
+def _connection():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(INDEX_PATH) or ".", exist_ok=True)
+        _conn = sqlite3.connect(INDEX_PATH, check_same_thread=False, isolation_level=None)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.executescript("""
+            CREATE TABLE IF NOT EXISTS images (
+                url TEXT PRIMARY KEY,
+                hash TEXT,              -- NULL: the download failed
+                stored_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                content_type TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                thumb INTEGER,          -- 1: has a thumbnail, 0: serve the original, NULL: pending
+                root TEXT               -- directory the files are under, NULL: IMAGE_DIR
+            );
+        """)
+        if "root" not in {row[1] for row in _conn.execute("PRAGMA table_info(blobs)")}:
+            _conn.execute("ALTER TABLE blobs ADD COLUMN root TEXT")
+    return _conn
+
+
+def _load_known():
+    # Called with _lock held
+    global _known
+    if _known is None:
+        rows = _connection().execute("""
+            SELECT i.url, i.hash FROM images i JOIN blobs b ON b.hash = i.hash
+            WHERE b.thumb IS NOT NULL
+        """).fetchall()
+        _known = dict(rows)
+    return _known
+
+
+def path(digest, thumb=False, root=None):
+    return os.path.join(root or IMAGE_DIR, digest[:2], digest + (".thumb.jpg" if thumb else ""))
+
+
+def _write(target, data):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+    os.replace(temp, target)
+
+
+def _make_thumbnail(source, target, size, quality):
+    # Runs in the process pool
+    with Image.open(source) as image:
+        image.draft("RGB", (size, size))   # JPEG: decode at a reduced scale
+        image = ImageOps.exif_transpose(image)
+        thumb = ImageOps.fit(image.convert("RGB"), (size, size), Image.LANCZOS)
+    temp = f"{target}.{os.getpid()}.tmp"
+    thumb.save(temp, "JPEG", quality=quality, optimize=True)
+    os.replace(temp, target)
+
+
+def _thumbnail_done(digest, pool, future):
+    error = future.exception()
+    if error is not None:
+        print(f"[IMAGE] thumbnail {digest[:12]}: {error}")
+        if isinstance(error, BrokenProcessPool):
+            # A worker died (e.g. the decoder crashed)
+            parse_pool.discard(pool)
+    _settle(digest, thumb=error is None)
+
+
+def _settle(digest, thumb):
+    with _lock:
+        conn = _connection()
+        conn.execute("UPDATE blobs SET thumb = ? WHERE hash = ?", (int(thumb), digest))
+        urls = [url for (url,) in conn.execute("SELECT url FROM images WHERE hash = ?", (digest,))]
+        known = _load_known()
+        for url in urls:
+            known[url] = digest
+        stats["thumbnails" if thumb else "thumbnail_errors"] += 1
+
+
+def _thumbnail_later(digest, root=None):
+    if Image is None:
+        _settle(digest, thumb=False)
+        return
+    pool = parse_pool.executor()
+    future = pool.submit(_make_thumbnail, path(digest, root=root), path(digest, thumb=True, root=root),
+                         THUMB_SIZE, THUMB_QUALITY)
+    future.add_done_callback(lambda f: _thumbnail_done(digest, pool, f))
+
+
+def _check_target(url):
+    """The address to fetch ``url`` from; ValueError unless it is http(s) to a host with only public addresses."""
+    parts = urlparse(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("not an http(s) URL")
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = socket.getaddrinfo(parts.hostname, port, proto=socket.IPPROTO_TCP)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"cannot resolve {parts.hostname}: {e}") from None
+    addresses = [ipaddress.ip_address(info[4][0].split("%")[0]) for info in infos]
+    if parts.hostname.lower() not in ALLOW_HOSTS:
+        for address in addresses:
+            if not address.is_global or address.is_multicast:
+                raise ValueError(f"{parts.hostname} resolves to non-public address {address}")
+    return str(addresses[0])
+
+
+def _fetch(url):
+    for _ in range(MAX_REDIRECTS + 1):
+        address = _check_target(url)
+        with fetch_pool.host_semaphore(url):
+            response = http_client.get(url, cache=False, stream=True, address=address)
+            if not response.is_redirect:
+                return _read(url, response)
+            response.close()
+        url = urljoin(url, response.headers["Location"])
+    raise ValueError(f"more than {MAX_REDIRECTS} redirects")
+
+
+def _read(url, response):
+    try:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if not content_type.startswith("image/"):
+            raise ValueError(f"not an image ({content_type or 'no Content-Type'})")
+        chunks, size = [], 0
+        for chunk in response.iter_content(64 * 1024):
+            size += len(chunk)
+            if size > MAX_BYTES:
+                raise ValueError(f"larger than {MAX_BYTES} bytes")
+            chunks.append(chunk)
+    finally:
+        response.close()
+    metrics.inc("http_downloaded_bytes_total", size, host=fetch_pool.host_of(url))
+    return b"".join(chunks), content_type
+
+
+def _download(url, root=None):
+    digest = None
+    try:
+        data, content_type = _fetch(url)
+        digest = hashlib.sha256(data).hexdigest()
+        with _lock:
+            conn = _connection()
+            new = conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone() is None
+            if new:
+                # File first: a blobs row always has its file
+                _write(path(digest, root=root), data)
+                conn.execute("INSERT INTO blobs (hash, content_type, size, root) VALUES (?, ?, ?, ?)",
+                             (digest, content_type, len(data), root))
+            conn.execute("INSERT OR REPLACE INTO images (url, hash, stored_at) VALUES (?, ?, ?)", (url, digest, time.time()))
+            thumb = conn.execute("SELECT thumb FROM blobs WHERE hash = ?", (digest,)).fetchone()[0]
+            if thumb is not None:
+                _load_known()[url] = digest
+            stats["downloaded" if new else "deduplicated"] += 1
+        metrics.inc("image_downloads_total", result="stored" if new else "duplicate")
+        if new:
+            _thumbnail_later(digest, root)
+    except Exception as e:
+        print(f"[IMAGE] {url}: {e}")
+        metrics.inc("image_downloads_total", result="failed")
+        with _lock:
+            if digest is None:
+                _connection().execute(
+                    "INSERT OR REPLACE INTO images (url, hash, stored_at) VALUES (?, NULL, ?)", (url, time.time()))
+            stats["failed"] += 1
+    finally:
+        with _lock:
+            _pending.discard(url)
+
+
+def _resume():
+    # Thumbnails an earlier process queued but never finished
+    global _resumed
+    with _lock:
+        if _resumed:
+            return
+        _resumed = True
+        if Image is None:
+            print("[IMAGE] Pillow is not installed: thumbnails are off, /img serves the original files")
+        pending = _connection().execute("SELECT hash, root FROM blobs WHERE thumb IS NULL").fetchall()
+    for digest, root in pending:
+        _thumbnail_later(digest, root)
+
+
+def prefetch(urls, root=None):
+    """Queue the http(s) ``urls`` not cached (or recently failed) for download; returns how many.
+
+    New files are stored under ``root`` (default IMAGE_DIR); an image that is
+    already stored stays where it is.
+    """
+    global _downloads
+    if not ENABLED:
+        return 0
+    _resume()
+    urls = [url for url in dict.fromkeys(urls) if isinstance(url, str) and url.startswith(("http://", "https://"))]
+    with _lock:
+        known = _load_known()
+        urls = [url for url in urls if url not in known and url not in _pending]
+        if not urls:
+            return 0
+        conn = _connection()
+        placeholders = ",".join("?" * len(urls))
+        # Downloaded (thumbnail still pending) or failed too recently to retry
+        skip = {url for (url,) in conn.execute(
+            f"SELECT url FROM images WHERE url IN ({placeholders}) AND (hash IS NOT NULL OR stored_at >= ?)",
+            [*urls, time.time() - RETRY_AFTER],
+        )}
+        urls = [url for url in urls if url not in skip]
+        _pending.update(urls)
+        stats["queued"] += len(urls)
+        if _downloads is None:
+            _downloads = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="image")
+    for url in urls:
+        # Not deadline.submit(): downloads outlive the request that found them
+        _downloads.submit(_download, url, root)
+    return len(urls)
+
+
+def attach(rows):
+    """Copy of ``rows`` with image=/img/<hash> where image_url is cached; queues the rest."""
+    if not ENABLED:
+        return rows
+    with _lock:
+        known = _load_known()
+        digests = [known.get(row.get("image_url")) if isinstance(row, dict) else None for row in rows]
+    missing = [row["image_url"] for row, digest in zip(rows, digests)
+               if digest is None and isinstance(row, dict) and row.get("image_url")]
+    if missing:
+        prefetch(missing)
+    return [dict(row, image=f"/img/{digest}") if digest else row for row, digest in zip(rows, digests)]
+
+
+def lookup(digest, full=False):
+    """(file path, content type) to serve for ``digest``, or None."""
+    with _lock:
+        row = _connection().execute("SELECT content_type, thumb, root FROM blobs WHERE hash = ?", (digest,)).fetchone()
+    if row is None:
+        return None
+    content_type, thumb, root = row
+    if thumb and not full:
+        return path(digest, thumb=True, root=root), "image/jpeg"
+    return path(digest, root=root), content_type
+
+
+def summary():
+    with _lock:
+        conn = _connection()
+        blobs, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        urls = conn.execute("SELECT COUNT(*) FROM images WHERE hash IS NOT NULL").fetchone()[0]
+        return dict(stats, pending=len(_pending), urls=urls, blobs=blobs, bytes=size, thumbnails_enabled=Image is not None)
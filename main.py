@@ -1,8 +1,94 @@
-from flask import Flask, render_template_string, redirect, url_for
+from flask import Flask, Response, abort, g, jsonify, render_template_string, redirect, send_file, url_for, request
+import atexit
+import json
+import os
+import re
 import sys
+from urllib.parse import urlencode
+
+import requests
 
 app = Flask(__name__)
 
+# Shared by both news pages: reads /stream/<source> (NDJSON) and renders each
+# article as soon as its card arrives, filling in details as they stream in.
+# Browsers without fetch streams fall back to the plain JSON endpoint.
+NEWS_SCRIPT = """
+        function renderItem(item, index) {
+            return `
+                <div id="item-${index}" class="bg-white rounded-lg shadow p-5">
+                    <div class="flex flex-col md:flex-row gap-4">
+                        ${item.image || item.image_url ? `<img src="${item.image || item.image_url}" alt="image" class="w-32 h-32 object-cover rounded-md border">` : ''}
+                        <div>
+                            <h2 class="text-xl font-bold mb-2">${item.title || item.short_description || item.summary || ''}</h2>
+                            <p class="text-gray-700 mb-2">${item.short_desc || item.short_description || item.summary || item.long_desc || ''}</p>
+                            <div class="text-sm text-gray-500 mb-1">${item.timestamp || item.date || ''}</div>
+                            ${item.anchor_link ? `<a href="${item.anchor_link}" target="_blank" class="text-blue-600 hover:underline">Read more</a>` : ''}
+                            ${item.article_url ? `<a href="${item.article_url}" target="_blank" class="text-blue-600 hover:underline">Read more</a>` : ''}
+                            ${item.link ? `<a href="${item.link}" target="_blank" class="text-blue-600 hover:underline">Read more</a>` : ''}
+                        </div>
+                    </div>
+                </div>
+            `;
+        }
+        let currentStream = null;
+        function streamNews(endpoint, container, loadingHtml) {
+            if (currentStream) currentStream.abort();
+            const controller = currentStream = new AbortController();
+            container.innerHTML = loadingHtml;
+            const items = [];
+            let loading = true;
+            function show(message, cls) {
+                container.innerHTML = `<div class="${cls}">${message}</div>`;
+            }
+            function handle(msg) {
+                if (msg.event === 'article') {
+                    if (loading) { container.innerHTML = ''; loading = false; }
+                    items[msg.index] = msg.article;
+                    container.insertAdjacentHTML('beforeend', renderItem(msg.article, msg.index));
+                } else if (msg.event === 'detail') {
+                    Object.assign(items[msg.index], msg.fields);
+                    const card = document.getElementById('item-' + msg.index);
+                    if (card) card.outerHTML = renderItem(items[msg.index], msg.index);
+                } else if (msg.event === 'drop') {
+                    const card = document.getElementById('item-' + msg.index);
+                    if (card) card.remove();
+                } else if (msg.event === 'done') {
+                    if (msg.count === 0) show('No news found.', 'text-gray-500');
+                } else if (msg.event === 'error') {
+                    if (loading || !items.length) show('Error loading news.', 'text-red-500');
+                }
+            }
+            fetch('/stream/' + endpoint, {signal: controller.signal})
+                .then(resp => {
+                    if (!resp.ok) throw new Error(resp.status);
+                    if (!resp.body || !window.TextDecoder) {
+                        return fetch('/api/' + endpoint + '?fields=all').then(r => r.json()).then(data => {
+                            if (!Array.isArray(data)) throw new Error('bad response');
+                            data.forEach((article, index) => handle({event: 'article', index, article}));
+                            handle({event: 'done', count: data.length});
+                        });
+                    }
+                    const reader = resp.body.getReader();
+                    const decoder = new TextDecoder();
+                    let buffer = '';
+                    function pump() {
+                        return reader.read().then(({done, value}) => {
+                            buffer += decoder.decode(value || new Uint8Array(), {stream: !done});
+                            const lines = buffer.split('\\n');
+                            buffer = done ? '' : lines.pop();
+                            lines.filter(line => line.trim()).forEach(line => handle(JSON.parse(line)));
+                            if (!done) return pump();
+                        });
+                    }
+                    return pump();
+                })
+                .catch(err => {
+                    if (err.name !== 'AbortError') show('Failed to load news.', 'text-red-500');
+                });
+        }
+"""
+
 @app.route('/')
 def landing():
     return render_template_string('''
@@ -48,6 +134,7 @@ def ainews_page():
         <button id=\"btn-datascience\" onclick=\"fetchNews('datascience')\" class=\"px-6 py-3 bg-blue-600 text-white rounded-lg shadow hover:bg-blue-700 transition font-semibold\">Towards Data Science</button>
     </div>
     <div id=\"news-container\" class=\"w-full max-w-3xl space-y-6\"></div>
+    <script>{{ news_script|safe }}</script>
     <script>
         let activeBtn = null;
         function setActiveButton(endpoint) {
@@ -67,45 +154,12 @@ def ainews_page():
         }
         function fetchNews(endpoint) {
             setActiveButton(endpoint);
-            const container = document.getElementById('news-container');
-            container.innerHTML = showSpinner();
-            fetch('/' + endpoint)
-                .then(resp => resp.json())
-                .then(data => {
-                    if (Array.isArray(data)) {
-                        if (data.length === 0) {
-                            container.innerHTML = '<div class="text-gray-500">No news found.</div>';
-                            return;
-                        }
-                        container.innerHTML = data.map(item => `
-                            <div class="bg-white rounded-lg shadow p-5">
-                                <div class="flex flex-col md:flex-row gap-4">
-                                    ${item.image_url ? `<img src="${item.image_url}" alt="image" class="w-32 h-32 object-cover rounded-md border">` : ''}
-                                    <div>
-                                        <h2 class="text-xl font-bold mb-2">${item.title || item.short_description || item.summary || ''}</h2>
-                                        <p class="text-gray-700 mb-2">${item.short_desc || item.short_description || item.summary || item.long_desc || ''}</p>
-                                        <div class="text-sm text-gray-500 mb-1">${item.timestamp || item.date || ''}</div>
-                                        ${item.anchor_link ? `<a href="${item.anchor_link}" target="_blank" class="text-blue-600 hover:underline">Read more</a>` : ''}
-                                        ${item.article_url ? `<a href="${item.article_url}" target="_blank" class="text-blue-600 hover:underline">Read more</a>` : ''}
-                                        ${item.link ? `<a href="${item.link}" target="_blank" class="text-blue-600 hover:underline">Read more</a>` : ''}
-                                    </div>
-                                </div>
-                            </div>
-                        `).join('');
-                    } else if (data && data.endpoints) {
-                        container.innerHTML = '<pre class="bg-gray-200 p-4 rounded">' + JSON.stringify(data, null, 2) + '</pre>';
-                    } else {
-                        container.innerHTML = '<div class="text-red-500">Error loading news.</div>';
-                    }
-                })
-                .catch(() => {
-                    container.innerHTML = '<div class="text-red-500">Failed to load news.</div>';
-                });
+            streamNews(endpoint, document.getElementById('news-container'), showSpinner());
         }
     </script>
 </body>
 </html>
-    """)
+    """, news_script=NEWS_SCRIPT)
 
 @app.route('/cybernews')
 def cybernews_page():
@@ -128,6 +182,7 @@ def cybernews_page():
         <button id=\"btn-gbhackers\" onclick=\"fetchNews('gbhackers')\" class=\"px-6 py-3 bg-blue-600 text-white rounded-lg shadow hover:bg-blue-700 transition font-semibold\">GBHackers</button>
     </div>
     <div id=\"news-container\" class=\"w-full max-w-3xl space-y-6\"></div>
+    <script>{{ news_script|safe }}</script>
     <script>
         let activeBtn = null;
         function setActiveButton(endpoint) {
@@ -144,104 +199,358 @@ def cybernews_page():
         }
         function fetchNews(endpoint) {
             setActiveButton(endpoint);
-            const container = document.getElementById('news-container');
-            container.innerHTML = '<div class="text-center text-gray-500">Loading...</div>';
-            fetch('/' + endpoint)
-                .then(resp => resp.json())
-                .then(data => {
-                    if (!Array.isArray(data)) {
-                        container.innerHTML = '<div class="text-red-500">Error loading news.</div>';
-                        return;
-                    }
-                    if (data.length === 0) {
-                        container.innerHTML = '<div class="text-gray-500">No news found.</div>';
-                        return;
-                    }
-                    container.innerHTML = data.map(item => `
-                        <div class="bg-white rounded-lg shadow p-5">
-                            <div class="flex flex-col md:flex-row gap-4">
-                                ${item.image_url ? `<img src="${item.image_url}" alt="image" class="w-32 h-32 object-cover rounded-md border">` : ''}
-                                <div>
-                                    <h2 class="text-xl font-bold mb-2">${item.title || item.short_description || item.summary || ''}</h2>
-                                    <p class="text-gray-700 mb-2">${item.short_desc || item.short_description || item.summary || item.long_desc || ''}</p>
-                                    <div class="text-sm text-gray-500 mb-1">${item.timestamp || item.date || ''}</div>
-                                    ${item.anchor_link ? `<a href="${item.anchor_link}" target="_blank" class="text-blue-600 hover:underline">Read more</a>` : ''}
-                                    ${item.article_url ? `<a href="${item.article_url}" target="_blank" class="text-blue-600 hover:underline">Read more</a>` : ''}
-                                    ${item.link ? `<a href="${item.link}" target="_blank" class="text-blue-600 hover:underline">Read more</a>` : ''}
-                                </div>
-                            </div>
-                        </div>
-                    `).join('');
-                })
-                .catch(() => {
-                    container.innerHTML = '<div class="text-red-500">Failed to load news.</div>';
-                });
+            streamNews(endpoint, document.getElementById('news-container'), '<div class="text-center text-gray-500">Loading...</div>');
         }
     </script>
 </body>
 </html>
-    """)
+    """, news_script=NEWS_SCRIPT)
 
 import ainews_scraper
 import cybernews_scraper
+import http_client
+import aggregate
+import article_db
+import circuit_breaker
+import deadline
+import image_store
+import metrics
+import parse_pool
+import response_cache
+import scrape_engine
+import sources
+import stream_extract
+from scheduler import Scheduler
+
+response_cache.install_json(app)
+
+# Background refresher; when it is running the routes below only read its
+# snapshots.  Started from __main__ for the dev server; under another WSGI
+# server call main.scheduler.start() from the server's startup hook.
+scheduler = Scheduler(aggregate.SOURCES)
+scheduler.on_update.append(lambda name: (response_cache.invalidate('/' + name), response_cache.invalidate('/api/' + name),
+                                          response_cache.invalidate('/all')))
+scheduler.on_update.append(lambda name: image_store.prefetch(a.get('image_url') for a in scheduler.latest(name).articles))
+
+# --- Deadlines ---
+# Every request gets REQUEST_DEADLINE seconds for the scraping it triggers
+# (see deadline.py).  Sources cut short are listed in X-Partial; a source
+# whose circuit breaker is open answers 503 with Retry-After.
+
+@app.before_request
+def start_deadline():
+    g.deadline = deadline.start(deadline.REQUEST_DEADLINE)
+
+@app.after_request
+def flag_partial(response):
+    partial = deadline.partial()
+    if partial:
+        response.headers['X-Partial'] = ', '.join(partial)
+    return response
+
+@app.teardown_request
+def end_deadline(exc):
+    deadline.end(g.pop('deadline', None))
+
+@app.errorhandler(circuit_breaker.CircuitOpen)
+def circuit_open(e):
+    return jsonify({"error": str(e)}), 503, {'Retry-After': str(int(e.retry_after) + 1)}
+
+@app.errorhandler(deadline.DeadlineExceeded)
+@app.errorhandler(requests.Timeout)
+def deadline_exceeded(e):
+    return jsonify({"error": f"timed out: {e}"}), 504
+
+# Any of these switches a source endpoint from "latest scrape" to a page of
+# the article store: ?limit=20&cursor=<X-Next-Cursor>&since=2025-06-01
+# (since: published at or after; seen_since: first stored at or after)
+PAGE_ARGS = ('limit', 'cursor', 'offset', 'since', 'seen_since')
+
+def page_response(source):
+    try:
+        since, seen_since = request.args.get('since'), request.args.get('seen_since')
+        items, next_cursor = article_db.page(
+            source=source,
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            offset=request.args.get('offset', default=0, type=int),
+            since=article_db.parse_since(since) if since else None,
+            seen_since=article_db.parse_since(seen_since) if seen_since else None,
+            fields=article_db.parse_fields(request.args.get('fields')),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    response = jsonify(image_store.attach(items))
+    if next_cursor:
+        args = {k: v for k, v in request.args.items() if k not in ('offset', 'refresh')}
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+    return response
+
+def with_cluster_ids(name, articles):
+    return [dict(article, cluster_id=cluster) for article, cluster in zip(articles, aggregate.cluster_ids(articles, name))]
+
+def serve_source(name, live_view):
+    if any(request.args.get(arg) for arg in PAGE_ARGS):
+        return page_response(name)
+    fields = article_db.parse_fields(request.args.get('fields'))
+    if scheduler.running:
+        articles = scheduler.latest(name).articles
+    else:
+        response = live_view()
+        articles = response.get_json(silent=True)
+        if not isinstance(articles, list):
+            return response
+    # The list view leaves long_desc out unless fields= asks for it
+    return jsonify(image_store.attach(article_db.project(with_cluster_ids(name, articles), fields)))
 
 # --- AI News Endpoints ---
 @app.route('/deepmind')
+@response_cache.cached()
 def deepmind_api():
-    return ainews_scraper.deepmind_api()
+    return serve_source('deepmind', ainews_scraper.deepmind_api)
 
 @app.route('/wired')
+@response_cache.cached()
 def wired_api():
-    return ainews_scraper.wired_api()
+    return serve_source('wired', ainews_scraper.wired_api)
 
 @app.route('/zdnet')
+@response_cache.cached()
 def zdnet_api():
-    return ainews_scraper.zdnet_api()
+    return serve_source('zdnet', ainews_scraper.zdnet_api)
 
 @app.route('/nvidia')
+@response_cache.cached()
 def nvidia_api():
-    return ainews_scraper.nvidia_api()
+    return serve_source('nvidia', ainews_scraper.nvidia_api)
 
 @app.route('/forbes')
+@response_cache.cached()
 def forbes_api():
-    return ainews_scraper.forbes_api()
+    return serve_source('forbes', ainews_scraper.forbes_api)
 
 @app.route('/thegradient')
+@response_cache.cached()
 def thegradient_api():
-    return ainews_scraper.thegradient_api()
+    return serve_source('thegradient', ainews_scraper.thegradient_api)
 
 @app.route('/ainews')
+@response_cache.cached()
 def ainews_api():
-    return ainews_scraper.ainews_api()
+    return serve_source('ainews', ainews_scraper.ainews_api)
 
 @app.route('/marktechpost')
+@response_cache.cached()
 def marktechpost_api():
-    return ainews_scraper.marktechpost_api()
+    return serve_source('marktechpost', ainews_scraper.marktechpost_api)
 
 @app.route('/datascience')
+@response_cache.cached()
 def datascience_api():
-    return ainews_scraper.datascience_api()
+    return serve_source('datascience', ainews_scraper.datascience_api)
 
 # --- Cyber News Endpoints ---
 @app.route('/cyberexpress')
+@response_cache.cached()
 def cyberexpress_api():
-    return cybernews_scraper.cyberexpress_endpoint()
+    return serve_source('cyberexpress', cybernews_scraper.cyberexpress_endpoint)
 
 @app.route('/arstechnica')
+@response_cache.cached()
 def arstechnica_api():
-    return cybernews_scraper.arstechnica_endpoint()
+    return serve_source('arstechnica', cybernews_scraper.arstechnica_endpoint)
 
 @app.route('/infosecurity')
+@response_cache.cached()
 def infosecurity_api():
-    return cybernews_scraper.infosecurity_endpoint()
+    return serve_source('infosecurity', cybernews_scraper.infosecurity_endpoint)
 
 @app.route('/cyberscoop')
+@response_cache.cached()
 def cyberscoop_api():
-    return cybernews_scraper.cyberscoop_endpoint()
+    return serve_source('cyberscoop', cybernews_scraper.cyberscoop_endpoint)
 
 @app.route('/gbhackers')
+@response_cache.cached()
 def gbhackers_api():
-    return cybernews_scraper.gbhackers_endpoint()
+    return serve_source('gbhackers', cybernews_scraper.gbhackers_endpoint)
+
+# /api/<name> is the same JSON as /<name>; it is what scripts should use,
+# since /ainews is taken by the AI News page
+@app.route('/api/<name>')
+def source_api(name):
+    view = app.view_functions.get(name + '_api') if name in sources.REGISTRY else None
+    if view is None:
+        return jsonify({"error": f"unknown source {name}"}), 404
+    return view()
+
+# --- Streaming Endpoints ---
+def _stream_events(name):
+    if scheduler.running:
+        articles = scheduler.latest(name).articles
+        for index, article in enumerate(image_store.attach(with_cluster_ids(name, articles))):
+            yield {"event": "article", "index": index, "article": article}
+        yield {"event": "done", "count": len(articles)}
+        return
+    unclustered = {}   # index -> article not stored yet, so without a cluster_id
+    try:
+        for kind, index, payload in scrape_engine.scrape_events(sources.REGISTRY[name], save_csv=True):
+            if kind == "article":
+                article = with_cluster_ids(name, [payload])[0]
+                if article["cluster_id"] is None:
+                    unclustered[index] = payload
+                yield {"event": "article", "index": index, "article": image_store.attach([article])[0]}
+            elif kind == "detail":
+                yield {"event": "detail", "index": index, "fields": image_store.attach([payload])[0]}
+            elif kind == "drop":
+                unclustered.pop(index, None)
+                yield {"event": "drop", "index": index}
+            else:
+                # The scrape has saved its rows: new articles have a cluster now
+                clusters = aggregate.cluster_ids(list(unclustered.values()), name) if unclustered else []
+                for article_index, cluster in zip(unclustered, clusters):
+                    if cluster is not None:
+                        yield {"event": "detail", "index": article_index, "fields": {"cluster_id": cluster}}
+                response_cache.invalidate('/' + name)
+                response_cache.invalidate('/api/' + name)
+                # Headers are long gone: a deadline cut-off is reported here instead of X-Partial
+                yield {"event": "done", "count": index, "partial": name in deadline.partial()}
+    except Exception as e:
+        yield {"event": "error", "error": f"{type(e).__name__}: {e}"}
+
+@app.route('/stream/<name>')
+def stream_api(name):
+    # /stream/wired (NDJSON, one event per line) or /stream/wired?format=sse
+    if name not in sources.REGISTRY:
+        return jsonify({"error": f"unknown source {name}"}), 404
+    sse = request.args.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    def body():
+        # Runs after the request's teardown has ended its deadline, so it sets its own
+        with deadline.within(deadline.REQUEST_DEADLINE):
+            for event in _stream_events(name):
+                data = json.dumps(event, ensure_ascii=False, default=str)
+                yield f"event: {event['event']}\ndata: {data}\n\n" if sse else data + "\n"
+    mimetype = 'text/event-stream' if sse else 'application/x-ndjson'
+    return Response(body(), mimetype=mimetype, headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# --- Aggregate Endpoint ---
+@app.route('/all')
+@response_cache.cached()
+def all_api():
+    # /all?feed=ai,cyber&source=wired,gbhackers&dedupe=1
+    feeds = [f for f in request.args.get('feed', '').split(',') if f] or None
+    names = [n for n in request.args.get('source', '').split(',') if n] or None
+    if scheduler.running:
+        result = scheduler.merged(feeds=feeds, names=names)
+    else:
+        result = aggregate.run_all(feeds=feeds, names=names)
+    result = aggregate.with_clusters(result, dedupe=request.args.get('dedupe') == '1')
+    return jsonify(dict(result, articles=image_store.attach(result['articles'])))
+
+# --- Cached Images ---
+# /img/<sha256> (thumbnail) or /img/<sha256>?size=full; see image_store.py.
+# The bytes behind a hash never change, so they may be cached forever.
+IMAGE_HASH = re.compile(r'[0-9a-f]{64}')
+
+@app.route('/img/<digest>')
+def image_api(digest):
+    found = IMAGE_HASH.fullmatch(digest) and image_store.lookup(digest, full=request.args.get('size') == 'full')
+    if not found or not os.path.exists(found[0]):
+        abort(404)
+    response = send_file(os.path.abspath(found[0]), mimetype=found[1], etag=digest, max_age=image_store.MAX_AGE, conditional=True)
+    response.headers['Cache-Control'] = f'public, max-age={image_store.MAX_AGE}, immutable'
+    # Originals may be SVG: never let them run script on this origin
+    response.headers['Content-Security-Policy'] = "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+# --- Stored Articles ---
+@app.route('/articles')
+def articles_api():
+    # /articles?source=wired&limit=20&cursor=...&since=...&fields=title,long_desc
+    return page_response(request.args.get('source'))
+
+@app.route('/search')
+def search_api():
+    # /search?q=ransomware&source=gbhackers,infosecurity&since=2025-06-01&until=...&limit=20&offset=0
+    # (q: every word must match; ransom* is a prefix, "zero day" a phrase)
+    # (since / until: publish time; seen_since: first stored at or after)
+    sources_arg = [n for n in request.args.get('source', '').split(',') if n] or None
+    try:
+        since, until = request.args.get('since'), request.args.get('until')
+        seen_since = request.args.get('seen_since')
+        results = article_db.search(
+            request.args.get('q', ''),
+            sources=sources_arg,
+            since=article_db.parse_since(since) if since else None,
+            until=article_db.parse_since(until) if until else None,
+            seen_since=article_db.parse_since(seen_since) if seen_since else None,
+            limit=request.args.get('limit', default=20, type=int),
+            offset=request.args.get('offset', default=0, type=int),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"query": request.args.get('q', ''), "results": results})
+
+# --- Diagnostics ---
+@app.route('/stats/http')
+def http_stats():
+    return jsonify(http_client.pool_stats())
+
+@app.route('/stats/cache')
+def cache_stats():
+    return jsonify(response_cache.stats)
+
+@app.route('/stats/scrape')
+def scrape_stats():
+    return jsonify(scrape_engine.stats)
+
+@app.route('/stats/circuits')
+def circuit_stats():
+    return jsonify(circuit_breaker.states())
+
+@app.route('/stats/parse')
+def parse_stats():
+    return jsonify(parse_pool.summary())
+
+@app.route('/stats/images')
+def image_stats():
+    return jsonify(image_store.summary())
+
+@app.route('/stats/stream')
+def stream_stats():
+    return jsonify(stream_extract.stats())
+
+@app.route('/metrics')
+def metrics_api():
+    # Prometheus scrape target
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/stats/scheduler')
+def scheduler_stats():
+    return jsonify({"running": scheduler.running, "sources": scheduler.status()})
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5002)
+    if len(sys.argv) >= 2 and sys.argv[1].lower() == "all":
+        # python main.py all [ai|cyber ...] [--json]
+        args = [a.lower() for a in sys.argv[2:]]
+        feeds = [a for a in args if a in ("ai", "cyber")] or None
+        result = aggregate.run_all(feeds=feeds)
+        if "--json" in args:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        else:
+            for name, status in result["sources"].items():
+                line = f"{name:<14} {status['status']:<6} {status['count']:>4} articles  {status['elapsed']:>7.2f}s"
+                if status["error"]:
+                    line += f"  {status['error']}"
+                print(line)
+            print(f"{len(result['articles'])} articles from {result['ok']} sources ({result['failed']} failed) in {result['elapsed']:.2f}s")
+    else:
+        # The debug reloader runs this module twice; only the serving child
+        # (WERKZEUG_RUN_MAIN) should scrape.  SCRAPE_SCHEDULER=0 disables it.
+        if os.environ.get("SCRAPE_SCHEDULER", "1") != "0" and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            scheduler.start()
+            atexit.register(scheduler.stop, wait=False)
+        app.run(debug=True, port=5002)
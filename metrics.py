@@ -0,0 +1,144 @@
+import bisect
+import contextlib
+import os
+import threading
+import time
+
+# --- Prometheus metrics ---
+# Per-stage timings for every scrape: fetch (listing and detail downloads),
+# parse (subtree parse + field extraction) and persist (CSV / SQLite writes)
+# are recorded as histograms labelled by source, next to counters for bytes
+# downloaded, articles found, detail pages fetched and errors.  render()
+# writes them in the Prometheus text exposition format for /metrics, adding
+# the counters the caches already keep (http_cache, detail_store,
+# response_cache, connection pool) and their hit ratios.  Kept dependency
+# free: a scrape only does a bisect and a dict update per observation.
+
+BUCKETS = tuple(float(b) for b in os.environ.get(
+    "METRICS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60").split(","))
+
+_HELP = {
+    "scrape_fetch_seconds": ("histogram", "Time spent downloading pages, by source and page kind."),
+    "scrape_parse_seconds": ("histogram", "Time spent parsing pages and extracting fields, by source and page kind."),
+    "scrape_persist_seconds": ("histogram", "Time spent writing scraped rows to CSV and SQLite, by source."),
+    "scrape_runs_total": ("counter", "Completed scrape runs, by source."),
+    "scrape_articles_total": ("counter", "Articles returned by scrape runs, by source."),
+    "scrape_detail_pages_total": ("counter", "Detail pages fetched (detail cache misses), by source."),
+    "scrape_errors_total": ("counter", "Scrape failures, by source and stage."),
+    "scrape_partial_total": ("counter", "Scrapes cut short by the request deadline, by source."),
+    "scrape_circuit_open_total": ("counter", "Scrapes skipped while the source's circuit breaker was open, by source."),
+    "http_downloaded_bytes_total": ("counter", "Response body bytes read from the network, by host."),
+    "http_rate_limit_wait_seconds": ("histogram", "Time requests waited for their host's rate limit, by host."),
+    "http_request_seconds": ("histogram", "Time from sending a request to its response (headers only when streamed), by host."),
+    "http_hedges_total": ("counter", "Duplicate requests sent for slow detail fetches, by host."),
+    "http_hedge_wins_total": ("counter", "Hedged fetches answered first by the duplicate, by host."),
+    "image_downloads_total": ("counter", "Article image downloads, by result (stored, duplicate, failed)."),
+}
+
+_lock = threading.Lock()
+_histograms = {}   # (name, labels) -> [bucket counts, sum, count]
+_counters = {}     # (name, labels) -> value
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def observe(name, seconds, **labels):
+    index = bisect.bisect_left(BUCKETS, seconds)
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * len(BUCKETS), 0.0, 0]
+        if index < len(BUCKETS):
+            histogram[0][index] += 1
+        histogram[1] += seconds
+        histogram[2] += 1
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+@contextlib.contextmanager
+def timer(name, **labels):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def _cache_counters():
+    # Imported here so metrics stays importable from the low-level modules
+    import detail_store
+    import http_cache
+    import http_client
+    import response_cache
+
+    pool = http_client.pool_stats()
+    return {
+        "http": (http_cache.stats["fresh_hits"] + http_cache.stats["revalidated"], http_cache.stats["misses"]),
+        "detail": (detail_store.stats["hits"], detail_store.stats["misses"]),
+        "response": (response_cache.stats["hits"] + response_cache.stats["stale"], response_cache.stats["misses"]),
+        "connection_pool": (pool["hits"], pool["misses"]),
+    }
+
+
+def render():
+    """All metrics in Prometheus text format (version 0.0.4)."""
+    with _lock:
+        histograms = {key: (list(buckets), total, count) for key, (buckets, total, count) in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = []
+    for name, (kind, text) in _HELP.items():
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (metric, labels), (buckets, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, hits in zip(BUCKETS, buckets):
+                    cumulative += hits
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        else:
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    caches = _cache_counters()
+    lines.append("# HELP cache_requests_total Cache lookups, by cache and result.")
+    lines.append("# TYPE cache_requests_total counter")
+    for cache, (hits, misses) in caches.items():
+        lines.append(f"cache_requests_total{_labels((('cache', cache), ('result', 'hit')))} {hits}")
+        lines.append(f"cache_requests_total{_labels((('cache', cache), ('result', 'miss')))} {misses}")
+    lines.append("# HELP cache_hit_ratio Share of cache lookups answered from the cache.")
+    lines.append("# TYPE cache_hit_ratio gauge")
+    for cache, (hits, misses) in caches.items():
+        ratio = hits / (hits + misses) if hits + misses else 0.0
+        lines.append(f"cache_hit_ratio{_labels((('cache', cache),))} {_number(ratio)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,281 @@
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# --- Near-duplicate story clustering ---
+# The same story is scraped from several sites (CyberScoop / InfoSecurity /
+# GBHackers, Wired / ZDNet / AI News) under different URLs and titles.  Each
+# article's title + description text is cut into word shingles and reduced
+# to a MinHash signature (NUM_PERM multiply-shift hashes, computed for all
+# shingles at once with numpy).  Signatures are split into BANDS bands;
+# articles sharing any band bucket are candidates (locality-sensitive
+# hashing), and a candidate joins the cluster when the signatures agree on
+# at least THRESHOLD of their hashes (the MinHash estimate of Jaccard
+# similarity).  Lookups touch only
+# the matching buckets, so adding an article does not compare it with every
+# stored one.  article_db calls update() inside its write transaction and
+# keeps the result in articles.cluster_id (the smallest article id in the
+# cluster); signatures are stored so the index is rebuilt without re-reading
+# article text.
+
+NUM_PERM = 128
+# 42 bands of 3 rows: a pair at similarity 0.4 shares a bucket ~93% of the
+# time, one at 0.2 only ~29%
+ROWS = int(os.environ.get("NEARDUP_ROWS", "3"))
+BANDS = NUM_PERM // ROWS
+THRESHOLD = float(os.environ.get("NEARDUP_THRESHOLD", "0.4"))
+SHINGLE = 3
+# Only this much of long_desc is used: enough to tell stories apart, and the
+# cost stays flat for very long articles.
+MAX_WORDS = int(os.environ.get("NEARDUP_MAX_WORDS", "400"))
+# Buckets added since the last rebuild live in a dict; past this many keys
+# they are merged into the sorted arrays.
+PENDING_KEYS = 1 << 16
+
+# Multiply-shift hashing: h(x) = high 32 bits of (a * x + b) mod 2^64, with
+# odd random a.  uint64 arithmetic wraps, so this is exact in numpy.
+_rng = np.random.default_rng(0x5EED)  # fixed seed: stored signatures must stay comparable
+_A = _rng.integers(1, 1 << 63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 1 << 63, size=NUM_PERM, dtype=np.uint64)
+_EMPTY = np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_BAND_SALT = (np.arange(BANDS, dtype=np.uint64) + np.uint64(1)) * np.uint64(0xC2B2AE3D27D4EB4F)
+
+_WORD = re.compile(r"\w+")
+
+
+def text_of(title, short_desc=None, long_desc=None):
+    return " ".join(part for part in (title, short_desc, long_desc) if part)
+
+
+def signature(text):
+    """MinHash signature (uint32[NUM_PERM]) of the word shingles of ``text``."""
+    words = _WORD.findall((text or "").lower())[:MAX_WORDS]
+    if not words:
+        return _EMPTY.copy()
+    tokens = np.fromiter(map(zlib.crc32, map(str.encode, words)), dtype=np.uint64, count=len(words))
+    size = min(SHINGLE, len(tokens))
+    # Rolling combination of `size` consecutive word hashes -> one shingle hash
+    shingles = np.zeros(len(tokens) - size + 1, dtype=np.uint64)
+    for offset in range(size):
+        shingles = shingles * _MIX + tokens[offset:len(tokens) - size + 1 + offset]
+    shingles = np.unique(shingles)
+    hashed = np.multiply.outer(_A, shingles)
+    hashed += _B[:, None]
+    # The shift is monotonic, so it can be applied to the minima only
+    return (hashed.min(axis=1) >> np.uint64(32)).astype(np.uint32)
+
+
+def similarity(a, b):
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def band_keys(signatures):
+    """One uint64 bucket key per band for each row of an (n, NUM_PERM) matrix."""
+    rows = signatures[:, :BANDS * ROWS].reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    keys = np.broadcast_to(_BAND_SALT, (len(signatures), BANDS)).copy()
+    for row in range(ROWS):
+        keys = (keys ^ rows[:, :, row]) * _MIX
+    return keys
+
+
+class Index:
+    """LSH buckets plus union-find over article ids.
+
+    Buckets are a sorted array of band keys with the matching article ids
+    (searched with np.searchsorted), plus a dict for keys added since the
+    last rebuild.  A re-signed article is not taken out of its old buckets:
+    candidates are always checked against their current signature, so a
+    stale entry only costs a comparison.  Clusters only ever merge: an
+    article whose text changes keeps the cluster it was in and may pull in
+    new neighbours.
+    """
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.pending = {}
+        self.signatures = {}
+        self.parent = {}
+        self.clusters = {}   # root -> member ids
+        self.lock = threading.Lock()
+
+    def find(self, item):
+        root = item
+        while self.parent.get(root, root) != root:
+            root = self.parent[root]
+        while item != root:
+            item, self.parent[item] = self.parent[item], root
+        return root
+
+    def _union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # The smaller id is the root, so cluster ids are stable as articles arrive
+            a, b = min(a, b), max(a, b)
+            self.parent[b] = a
+            self.clusters[a] |= self.clusters.pop(b)
+        return a
+
+    def _join(self, article_id):
+        if article_id not in self.parent:
+            self.parent[article_id] = article_id
+            self.clusters[article_id] = {article_id}
+
+    def build(self, ids, signatures):
+        """Bulk-load an (n, NUM_PERM) signature matrix, e.g. on startup."""
+        ids = np.asarray(ids, dtype=np.int64)
+        for article_id, sig in zip(ids.tolist(), signatures):
+            self._join(article_id)
+            self.signatures[article_id] = sig
+        keys = band_keys(signatures).ravel()
+        owners = np.repeat(ids, BANDS)
+        order = np.argsort(keys, kind="stable")
+        keys, owners = keys[order], owners[order]
+        # Only buckets holding more than one article need comparing
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(keys)])
+        for start, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+            self._link(owners[start:start + size].tolist())
+        self._merge(keys, owners)
+
+    def _link(self, members):
+        # Compare each member with one representative per cluster seen in the
+        # bucket so far; a bucket of identical texts costs O(n), not O(n^2)
+        representatives = []
+        for member in members:
+            sig = self.signatures[member]
+            for rep in representatives:
+                if self.find(rep) == self.find(member):
+                    break
+                if similarity(sig, self.signatures[rep]) >= THRESHOLD:
+                    self._union(rep, member)
+                    break
+            else:
+                representatives.append(member)
+
+    def _merge(self, keys, owners):
+        keys = np.concatenate([self.keys, keys])
+        owners = np.concatenate([self.ids, owners])
+        order = np.argsort(keys, kind="stable")
+        self.keys, self.ids = keys[order], owners[order]
+
+    def _flush(self):
+        pending = [(key, owner) for key, owners in self.pending.items() for owner in owners]
+        self.pending = {}
+        self._merge(np.fromiter((key for key, _ in pending), dtype=np.uint64, count=len(pending)),
+                    np.fromiter((owner for _, owner in pending), dtype=np.int64, count=len(pending)))
+
+    def add(self, article_id, sig, keys=None):
+        """Index one signature; returns the article's cluster root."""
+        self._join(article_id)
+        if keys is None:
+            keys = band_keys(sig[None, :])[0]
+        candidates = set()
+        lo = np.searchsorted(self.keys, keys, "left")
+        hi = np.searchsorted(self.keys, keys, "right")
+        for start, end in zip(lo[hi > lo].tolist(), hi[hi > lo].tolist()):
+            candidates.update(self.ids[start:end].tolist())
+        keys = keys.tolist()
+        for key in keys:
+            candidates.update(self.pending.get(key, ()))
+        candidates.discard(article_id)
+        self.signatures[article_id] = sig
+        for other in candidates:
+            if self.find(other) != self.find(article_id) and similarity(sig, self.signatures[other]) >= THRESHOLD:
+                self._union(article_id, other)
+        for key in keys:
+            self.pending.setdefault(key, []).append(article_id)
+        if len(self.pending) > PENDING_KEYS:
+            self._flush()
+        return self.find(article_id)
+
+    def members(self, root):
+        return self.clusters.get(root, ())
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _sign_rows(rows):
+    """[(id, signature)] for rows with any text; empty texts would all match."""
+    signed = []
+    for row in rows:
+        text = text_of(*row[1:])
+        if text.strip():
+            signed.append((row[0], signature(text)))
+    return signed
+
+
+def _load(conn, batch=()):
+    global _index
+    with _index_lock:
+        if _index is None:
+            # Articles stored before clustering existed (or imported): sign them once
+            # (the batch being saved is signed by the caller)
+            missing = conn.execute(
+                "SELECT id, title, short_desc, long_desc FROM articles "
+                "WHERE id NOT IN (SELECT id FROM article_signatures) ORDER BY id").fetchall()
+            batch = set(batch)
+            signed = _sign_rows(row for row in missing if row[0] not in batch)
+            if signed:
+                print(f"[NEARDUP] Signing {len(signed)} stored articles")
+                conn.executemany("INSERT OR REPLACE INTO article_signatures (id, signature) VALUES (?, ?)",
+                                 [(article_id, sig.tobytes()) for article_id, sig in signed])
+            stored = conn.execute("SELECT id, signature FROM article_signatures ORDER BY id").fetchall()
+            index = Index()
+            if stored:
+                matrix = np.frombuffer(b"".join(blob for _, blob in stored), dtype=np.uint32)
+                index.build([article_id for article_id, _ in stored], matrix.reshape(len(stored), NUM_PERM))
+            # Bring articles.cluster_id in line with the rebuilt clusters
+            relabel = [(index.find(article_id), article_id)
+                       for article_id, cluster in conn.execute("SELECT id, cluster_id FROM articles")
+                       if article_id in index.parent and index.find(article_id) != cluster]
+            conn.executemany("UPDATE articles SET cluster_id = ? WHERE id = ?", relabel)
+            _index = index
+    return _index
+
+
+def _update(conn, index, rows):
+    signatures = [(article_id, sig) for article_id, sig in _sign_rows(rows)
+                  if index.signatures.get(article_id) is None
+                  or not np.array_equal(index.signatures[article_id], sig)]
+    if not signatures:
+        return {}
+    conn.executemany("INSERT OR REPLACE INTO article_signatures (id, signature) VALUES (?, ?)",
+                     [(article_id, sig.tobytes()) for article_id, sig in signatures])
+    keys = band_keys(np.stack([sig for _, sig in signatures]))
+    changed = {}
+    with index.lock:
+        for (article_id, sig), sig_keys in zip(signatures, keys):
+            index.add(article_id, sig, sig_keys)
+        # Every cluster the batch touched, including ones it merged into others
+        for root in {index.find(article_id) for article_id, _ in signatures}:
+            for member in index.members(root):
+                changed[member] = root
+    conn.executemany("UPDATE articles SET cluster_id = ? WHERE id = ? AND cluster_id IS NOT ?",
+                     [(root, article_id, root) for article_id, root in changed.items()])
+    return changed
+
+
+def update(conn, rows):
+    """(id, title, short_desc, long_desc) rows were saved: re-sign and re-cluster them.
+
+    Runs inside the caller's transaction, and updates the in-memory index
+    before it commits: a caller whose transaction rolls back must reset().
+    Articles whose text did not change are skipped.  Returns {article id:
+    cluster id} for every re-labelled one.
+    """
+    rows = list(rows)
+    return _update(conn, _load(conn, [row[0] for row in rows]), rows)
+
+
+def reset():
+    # Forget the in-memory index (tests / after the database file is replaced)
+    global _index
+    with _index_lock:
+        _index = None
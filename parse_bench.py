@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+import html_parser
+import http_client
+from sources import REGISTRY
+
+# --- Per-source parse benchmark ---
+# Parses each source's listing page three ways and reports best-of-N time and
+# tracemalloc peak:
+#   full_html_parser  BeautifulSoup(text, "html.parser") of the whole page (the old code)
+#   full              whole page with the configured backend (lxml when installed)
+#   subtree           only the container the scraper reads (make_soup(only=...))
+# Sources and containers come from the sources.py registry.  Pages are read
+# from --html-dir/<source>.html when present, otherwise fetched.
+#
+#   python parse_bench.py [--html-dir DIR] [--repeat N] [--save] [--json] [source ...]
+
+
+def load_page(name, html_dir=None, save=False):
+    path = os.path.join(html_dir, f"{name}.html") if html_dir else None
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    spec = REGISTRY[name]
+    text = http_client.get(spec.url, profile=spec.profile, cache=False, timeout=30).text
+    if save and path:
+        os.makedirs(html_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
+
+
+def measure(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": round(best * 1000, 2), "peak_kb": round(peak / 1024, 1)}
+
+
+def bench_source(name, text, repeat=5):
+    only = REGISTRY[name].parse_only
+    result = {
+        "bytes": len(text.encode("utf-8")),
+        "full_html_parser": measure(lambda: html_parser.make_soup(text, parser="html.parser"), repeat),
+        "full": measure(lambda: html_parser.make_soup(text), repeat),
+        "subtree": measure(lambda: html_parser.make_soup(text, only=only), repeat),
+    }
+    base = result["full_html_parser"]
+    result["speedup"] = round(base["ms"] / result["subtree"]["ms"], 1) if result["subtree"]["ms"] else None
+    result["memory_saved_pct"] = round(100 * (1 - result["subtree"]["peak_kb"] / base["peak_kb"]), 1) if base["peak_kb"] else None
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-source HTML parse benchmark")
+    parser.add_argument("sources", nargs="*", help="sources to run (default: all)")
+    parser.add_argument("--html-dir", help="directory with saved <source>.html pages")
+    parser.add_argument("--save", action="store_true", help="save fetched pages into --html-dir")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.sources or REGISTRY:
+        try:
+            text = load_page(name, args.html_dir, args.save)
+        except Exception as e:
+            print(f"[BENCH ERROR] {name}: {e}")
+            continue
+        results[name] = bench_source(name, text, args.repeat)
+
+    if args.json:
+        print(json.dumps({"backend": html_parser.backend(), "results": results}, indent=2))
+        return results
+    print(f"Backend: {html_parser.backend()}")
+    print(f"{'source':<14}{'KB':>8}{'html.parser ms':>16}{'full ms':>10}{'subtree ms':>12}{'peak KB old/new':>20}{'speedup':>9}")
+    for name, r in results.items():
+        peaks = f"{r['full_html_parser']['peak_kb']:.0f}/{r['subtree']['peak_kb']:.0f}"
+        print(f"{name:<14}{r['bytes'] / 1024:>8.0f}{r['full_html_parser']['ms']:>16}{r['full']['ms']:>10}"
+              f"{r['subtree']['ms']:>12}{peaks:>20}{str(r['speedup']) + 'x':>9}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import deadline
+
+# --- Parse worker processes ---
+# Building a BeautifulSoup tree and walking it is pure-Python CPU work, so the
+# fetch threads of a multi-source refresh all queue on the GIL to parse.
+# scrape_engine therefore ships each listing and (non-streamed) detail page to
+# a pool of PROCESSES worker processes, one per usable core by default: the
+# raw body bytes and the source name go in, and only the extracted fields
+# come back.  Specs hold compiled selectors and lambdas that do not pickle, so
+# a worker looks the spec up by name in sources.REGISTRY (imported once per
+# worker at start-up).  Pages smaller than MIN_BYTES, specs that are not in
+# the registry, and PARSE_POOL=0 / single-core machines parse in the calling
+# thread as before.
+#
+# executor() is the process's one CPU pool: image_store's thumbnails run in
+# it too rather than in a second pool competing for the same cores.
+
+PROCESSES = int(os.environ.get("PARSE_PROCESSES", "0")) or (
+    len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1)
+ENABLED = os.environ.get("PARSE_POOL", "1") != "0" and PROCESSES > 1
+MIN_BYTES = int(os.environ.get("PARSE_POOL_MIN_BYTES", "16384"))
+
+_lock = threading.Lock()
+_pool = None
+stats = {"pooled": 0, "inline": 0, "broken": 0}
+
+
+def _warm():
+    # Worker start-up: pay for the sources / bs4 / soupsieve imports once
+    import sources  # noqa: F401
+
+
+def executor():
+    global _pool
+    with _lock:
+        if _pool is None:
+            # Not fork: the web server's threads may hold locks at fork time
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=PROCESSES, mp_context=multiprocessing.get_context(method),
+                                        initializer=_warm)
+        return _pool
+
+
+def discard(pool):
+    # A worker died: drop the pool so the next task gets a fresh one
+    global _pool
+    with _lock:
+        stats["broken"] += 1
+        if _pool is pool:
+            _pool = None
+
+
+def wanted(size):
+    return ENABLED and size >= MIN_BYTES
+
+
+def run(fn, *args):
+    """fn(*args) in a worker process, waiting at most until the request deadline.
+
+    ``fn`` must be a module-level function and its arguments picklable.
+    """
+    pool = executor()
+    future = pool.submit(fn, *args)
+    with _lock:
+        stats["pooled"] += 1
+    try:
+        return future.result(timeout=deadline.remaining())
+    except FuturesTimeout:
+        future.cancel()
+        raise deadline.DeadlineExceeded("request deadline exceeded while parsing") from None
+    except BrokenProcessPool:
+        discard(pool)
+        raise
+
+
+def count_inline():
+    with _lock:
+        stats["inline"] += 1
+
+
+def summary():
+    with _lock:
+        return dict(stats, enabled=ENABLED, processes=PROCESSES, min_bytes=MIN_BYTES)
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import deadline
+import metrics
+
+# --- Per-host rate limiting ---
+# Politeness used to be a time.sleep() after every MarkTechPost / The
+# Gradient article, which idled the worker thread whatever it would have
+# fetched next.  Now http_client.get() takes a token from the host's bucket
+# before each network request: a host with a rate gets at most that many
+# requests per second (after a burst of HOST_BURST), hosts without one are
+# not limited, and waiting for one host never delays requests to another.
+# A caller that has to wait reserves its slot first (the bucket goes
+# negative), so concurrent callers queue in order instead of polling.
+#
+# With ROBOTS_CRAWL_DELAY=1 each host's robots.txt is read once and its
+# Crawl-delay / Request-rate lowers the host's rate further.
+
+DEFAULT_RATE = float(os.environ.get("HOST_RATE_DEFAULT", "0"))  # requests/second, 0 = unlimited
+BURST = float(os.environ.get("HOST_BURST", "1"))
+RESPECT_ROBOTS = os.environ.get("ROBOTS_CRAWL_DELAY", "0") == "1"
+ROBOTS_TIMEOUT = float(os.environ.get("ROBOTS_TIMEOUT", "5"))
+
+# Sites the scrapers used to sleep between detail pages on (requests/second);
+# HOST_RATES="host=rate,host=rate" adds to or overrides these
+HOST_RATES = {
+    "www.marktechpost.com": 2.0,
+    "thegradient.pub": 1.0,
+}
+for _pair in filter(None, os.environ.get("HOST_RATES", "").split(",")):
+    _host, _, _rate = _pair.partition("=")
+    HOST_RATES[_host.strip().lower()] = float(_rate)
+
+_lock = threading.Lock()
+_buckets = {}          # host -> [tokens, last refill (monotonic)]
+_robots = {}           # host -> robots.txt requests/second limit, None when it sets none
+_robots_locks = {}
+stats = {"requests": 0, "waits": 0, "wait_seconds": 0.0}
+
+
+def _robots_rate(scheme, host):
+    with _lock:
+        if host in _robots:
+            return _robots[host]
+        host_lock = _robots_locks.setdefault(host, threading.Lock())
+    with host_lock:
+        if host not in _robots:
+            # Imported here: http_client imports this module
+            import http_client
+
+            rate = None
+            parser = RobotFileParser()
+            try:
+                response = http_client.session().get(
+                    f"{scheme}://{host}/robots.txt", headers=http_client.profile_headers("basic"),
+                    timeout=ROBOTS_TIMEOUT)
+                if response.status_code == 200:
+                    parser.parse(response.text.splitlines())
+                    delay = parser.crawl_delay("*")
+                    request_rate = parser.request_rate("*")
+                    if delay:
+                        rate = 1.0 / float(delay)
+                    if request_rate and request_rate.requests:
+                        limit = request_rate.requests / request_rate.seconds
+                        rate = min(rate, limit) if rate else limit
+            except Exception as e:
+                print(f"[ROBOTS] {host}: {e}")
+            _robots[host] = rate
+    return _robots[host]
+
+
+def rate_for(url):
+    """Requests per second allowed to ``url``'s host (0: unlimited)."""
+    parts = urlparse(url)
+    host = parts.netloc.lower()
+    rate = HOST_RATES.get(host, DEFAULT_RATE)
+    if RESPECT_ROBOTS:
+        robots = _robots_rate(parts.scheme or "https", host)
+        if robots:
+            rate = min(rate, robots) if rate else robots
+    return rate
+
+
+def acquire(url, max_wait=None):
+    """Wait until ``url``'s host may be sent another request; returns the seconds waited.
+
+    Raises deadline.DeadlineExceeded, without taking the slot, when that
+    would be more than ``max_wait`` seconds.
+    """
+    rate = rate_for(url)
+    if not rate:
+        return 0.0
+    host = urlparse(url).netloc.lower()
+    with _lock:
+        now = time.monotonic()
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = _buckets[host] = [BURST, now]
+        tokens = min(BURST, bucket[0] + (now - bucket[1]) * rate) - 1
+        bucket[0], bucket[1] = tokens, now
+        wait = -tokens / rate if tokens < 0 else 0.0
+        if max_wait is not None and wait > max_wait:
+            bucket[0] += 1
+            raise deadline.DeadlineExceeded(f"{host} rate limit: next slot in {wait:.1f}s")
+        stats["requests"] += 1
+        if wait:
+            stats["waits"] += 1
+            stats["wait_seconds"] += wait
+    if wait:
+        metrics.observe("http_rate_limit_wait_seconds", wait, host=host)
+        time.sleep(wait)
+    return wait
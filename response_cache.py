@@ -0,0 +1,204 @@
+import functools
+import gzip
+import hashlib
+import os
+import threading
+import time
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+import deadline
+
+# --- Endpoint response cache ---
+# @cached(ttl) keeps the last response of an endpoint (per query string).
+# Fresh entries are served straight from memory; stale ones are served
+# immediately while a single background refresh runs.  Only a cold miss (or
+# an entry older than MAX_STALE) makes the caller wait, and concurrent
+# callers of the same key wait on one scrape instead of starting their own.
+# Responses carry X-Cache (HIT / STALE / MISS) and Age headers; ?refresh=1
+# forces a synchronous refresh.
+#
+# Each entry is encoded once when it is stored: a content-hash ETag and
+# gzip (and brotli, when installed) copies of the body.  A request whose
+# If-None-Match matches gets a 304, otherwise the best compressed copy its
+# Accept-Encoding allows, so a hit never re-serializes or re-compresses.
+# JSON is encoded with orjson (install_json) and bodies are also kept as
+# brotli; both are in requirements.txt.  Without them the app falls back to
+# Flask's encoder and gzip only.
+
+DEFAULT_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", "300"))
+MAX_STALE = int(os.environ.get("RESPONSE_CACHE_MAX_STALE", str(24 * 3600)))
+
+_lock = threading.Lock()
+_entries = {}
+_key_locks = {}
+_refreshing = set()
+COMPRESS_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.environ.get("RESPONSE_GZIP_LEVEL", "9"))
+BROTLI_QUALITY = int(os.environ.get("RESPONSE_BROTLI_QUALITY", "9"))
+
+stats = {"hits": 0, "stale": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0, "not_modified": 0}
+
+
+class _Entry:
+    def __init__(self, body, status, headers):
+        self.body = body
+        self.status = status
+        self.headers = headers
+        self.created = time.time()
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.encoded = {}
+        if len(body) >= COMPRESS_MIN_BYTES:
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+            self.encoded["gzip"] = gzip.compress(body, GZIP_LEVEL, mtime=0)
+
+    def age(self):
+        return time.time() - self.created
+
+
+def _key_lock(key):
+    with _lock:
+        lock = _key_locks.get(key)
+        if lock is None:
+            lock = _key_locks[key] = threading.Lock()
+    return lock
+
+
+def _count(name):
+    with _lock:
+        stats[name] += 1
+
+
+def _render(app, view, args, kwargs):
+    response = app.make_response(view(*args, **kwargs))
+    if response.status_code != 200 or response.is_streamed or deadline.partial():
+        # Partial results (cut short by the request deadline) are served once, not cached
+        return None, response
+    headers = [(k, v) for k, v in response.headers.items() if k.lower() not in ("content-length", "set-cookie")]
+    return _Entry(response.get_data(), response.status_code, headers), response
+
+
+def _compute(app, key, view, args, kwargs):
+    entry, response = _render(app, view, args, kwargs)
+    if entry is not None:
+        with _lock:
+            _entries[key] = entry
+    return entry, response
+
+
+def _serve(app, entry, state, ttl):
+    if request.if_none_match.contains_weak(entry.etag):
+        _count("not_modified")
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(entry.body, status=entry.status, headers=entry.headers)
+        # Preference order: brotli, then gzip (entry.encoded is built in that order)
+        for encoding, body in entry.encoded.items():
+            if request.accept_encodings[encoding]:
+                response.set_data(body)
+                response.headers["Content-Encoding"] = encoding
+                break
+    response.set_etag(entry.etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Cache"] = state
+    response.headers["Age"] = str(int(entry.age()))
+    response.headers["X-Cache-TTL"] = str(ttl)
+    return response
+
+
+def _refresh_in_background(app, key, view, args, kwargs, path):
+    with _lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            with app.test_request_context(path), _key_lock(key):
+                _compute(app, key, view, args, kwargs)
+            _count("refreshes")
+        except Exception as e:
+            _count("refresh_errors")
+            print(f"[CACHE ERROR] Background refresh of {key} failed: {e}")
+        finally:
+            with _lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=run, name=f"refresh:{key}", daemon=True).start()
+
+
+def cached(ttl=None):
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            app = current_app._get_current_object()
+            entry_ttl = ttl if ttl is not None else DEFAULT_TTL
+            params = sorted((k, v) for k, v in request.args.items(multi=True) if k != "refresh")
+            key = request.path + "?" + "&".join(f"{k}={v}" for k, v in params)
+            force = request.args.get("refresh") == "1"
+
+            with _lock:
+                entry = _entries.get(key)
+            if entry is not None and not force:
+                age = entry.age()
+                if age < entry_ttl:
+                    _count("hits")
+                    return _serve(app, entry, "HIT", entry_ttl)
+                if age < entry_ttl + MAX_STALE:
+                    _count("stale")
+                    _refresh_in_background(app, key, view, args, kwargs, request.full_path)
+                    return _serve(app, entry, "STALE", entry_ttl)
+
+            _count("misses")
+            with _key_lock(key):
+                # Another request may have filled the entry while we waited
+                with _lock:
+                    entry = _entries.get(key)
+                if entry is None or force or entry.age() >= entry_ttl:
+                    entry, response = _compute(app, key, view, args, kwargs)
+                    if entry is None:
+                        return response
+            return _serve(app, entry, "MISS", entry_ttl)
+        return wrapper
+    return decorator
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify() through orjson: same output keys and order, several times faster."""
+
+    _options = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install_json(app):
+    # Used when orjson is installed; Flask's own encoder otherwise
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+
+def invalidate(prefix=""):
+    with _lock:
+        for key in [k for k in _entries if k.startswith(prefix)]:
+            del _entries[key]
@@ -0,0 +1,175 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aggregate
+import deadline
+
+# --- Background scrape scheduler ---
+# Refreshes every source on its own interval in background workers and keeps
+# the latest result per source in memory, so HTTP handlers only read
+# snapshots instead of scraping.  Each run is rescheduled with +/- JITTER so
+# sources drift apart instead of all firing at once.  Intervals default to
+# SCRAPE_INTERVAL seconds and can be set per source with
+# SCRAPE_INTERVAL_<NAME> (e.g. SCRAPE_INTERVAL_WIRED=1800).
+#
+# A request that finds no snapshot yet scrapes in its own thread, under its
+# request deadline.  Only a complete run is kept as the snapshot: a run cut
+# short (or failed) there is served to that request alone, so it is not what
+# everyone sees for a whole interval.  A request that finds the source
+# already being scraped waits for that run, at most until its deadline.
+
+DEFAULT_INTERVAL = int(os.environ.get("SCRAPE_INTERVAL", "900"))
+JITTER = float(os.environ.get("SCRAPE_JITTER", "0.1"))
+MAX_WORKERS = int(os.environ.get("SCRAPE_WORKERS", str(aggregate.MAX_CONCURRENCY)))
+
+
+class Snapshot:
+    def __init__(self, name, status, articles):
+        self.name = name
+        self.status = status
+        self.articles = articles
+        self.refreshed_at = time.time()
+
+    def age(self):
+        return time.time() - self.refreshed_at
+
+
+class Scheduler:
+    def __init__(self, sources=None, interval=None, jitter=None, max_workers=None):
+        self.sources = sources if sources is not None else aggregate.SOURCES
+        self.interval = interval or DEFAULT_INTERVAL
+        self.jitter = JITTER if jitter is None else jitter
+        self.max_workers = max_workers or MAX_WORKERS
+        self.on_update = []
+        self._snapshots = {}
+        self._next_run = {}
+        self._source_locks = {name: threading.Lock() for name in self.sources}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def interval_for(self, name):
+        return int(os.environ.get(f"SCRAPE_INTERVAL_{name.upper()}", self.interval))
+
+    def _jittered(self, seconds):
+        return seconds * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scheduled")
+        now = time.time()
+        with self._lock:
+            for name in self.sources:
+                # First runs are spread over the first jitter window
+                self._next_run[name] = now + random.uniform(0, self.jitter * self.interval_for(name))
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+        print(f"[SCHEDULER] Started for {len(self.sources)} sources")
+
+    def stop(self, wait=True):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+        print("[SCHEDULER] Stopped")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            now = time.time()
+            with self._lock:
+                due = [name for name, at in self._next_run.items() if at <= now]
+                for name in due:
+                    # Push the next run out now so a slow scrape is not queued twice
+                    self._next_run[name] = now + self._jittered(self.interval_for(name))
+                wake = min(self._next_run.values(), default=now + 1)
+            for name in due:
+                try:
+                    self._pool.submit(self.refresh, name)
+                except RuntimeError:
+                    # Pool shut down by stop()
+                    return
+            self._stop.wait(max(0.5, min(wake - time.time(), 30)))
+
+    def refresh(self, name):
+        lock = self._source_locks[name]
+        if not lock.acquire(blocking=False):
+            # Already running: wait for that run instead of scraping again
+            left = deadline.remaining()
+            if not lock.acquire(timeout=-1 if left is None else left):
+                raise deadline.DeadlineExceeded(f"{name} is still being refreshed")
+            snapshot = self.snapshot(name)
+            if snapshot is not None:
+                lock.release()
+                return snapshot
+            # That run kept nothing (see below): scrape here
+        try:
+            status, articles = aggregate.run_source(name)
+            previous = self.snapshot(name)
+            if status["status"] != "ok" and previous is not None:
+                # Keep serving the last good articles, but record the failure
+                snapshot = Snapshot(name, status, previous.articles)
+            else:
+                snapshot = Snapshot(name, status, articles)
+            if status["status"] != "ok" and deadline.remaining() is not None:
+                # Cut short or failed under a request deadline: this caller's answer only
+                return snapshot
+            with self._lock:
+                self._snapshots[name] = snapshot
+            for callback in self.on_update:
+                callback(name)
+            return snapshot
+        finally:
+            lock.release()
+
+    def snapshot(self, name):
+        with self._lock:
+            return self._snapshots.get(name)
+
+    def latest(self, name):
+        # Before the first scheduled run has finished, scrape once in the caller
+        return self.snapshot(name) or self.refresh(name)
+
+    def merged(self, feeds=None, names=None):
+        # Same shape as aggregate.run_all(), built from stored snapshots
+        started = time.monotonic()
+        statuses = {}
+        articles = []
+        for name in aggregate.select_sources(feeds, names):
+            try:
+                snapshot = self.latest(name)
+            except deadline.DeadlineExceeded as e:
+                deadline.mark_partial(name)
+                statuses[name] = {"feed": aggregate.SOURCES[name][0], "status": "timeout", "count": 0,
+                                  "error": str(e), "elapsed": round(time.monotonic() - started, 3)}
+                continue
+            status = dict(snapshot.status, age=round(snapshot.age(), 1))
+            statuses[name] = status
+            for item in snapshot.articles:
+                articles.append(dict(item, source_name=name, feed=status["feed"]))
+        return aggregate.summarize(statuses, articles, started)
+
+    def status(self):
+        with self._lock:
+            return {
+                name: {
+                    "interval": self.interval_for(name),
+                    "next_run_in": round(self._next_run.get(name, 0) - time.time(), 1) if self.running else None,
+                    "last_status": snap.status["status"] if snap else None,
+                    "age": round(snap.age(), 1) if snap else None,
+                }
+                for name in self.sources
+                for snap in [self._snapshots.get(name)]
+            }
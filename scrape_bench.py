@@ -0,0 +1,304 @@
+import argparse
+import contextlib
+import gc
+import gzip
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+import detail_store
+import html_parser
+import http_cache
+import http_client
+import parse_pool
+import stream_extract
+from sources import REGISTRY, run
+
+# --- Offline scrape benchmark ---
+# Runs every source's full parse path (listing subtree parse, item
+# extraction, detail pool, streamed detail extraction) against the HTML
+# fixtures in bench_fixtures/<source>/ with the network stubbed out: the
+# shared http_client session is swapped for one that answers from the
+# fixture manifest, and the HTTP / detail caches and politeness sleeps are
+# switched off so every repeat does the same work.  The parse process pool
+# and request hedging are switched off too, so parsing stays in this process
+# (and in its timings, memory and GC counts).  Per source it reports
+# best / median wall time, tracemalloc peak and retained memory, retained
+# allocation blocks and gen-0 GC passes (allocation churn), and writes the
+# whole run as JSON (bench_results/<time>-<commit>.json by default) so runs
+# can be diffed across commits with --compare.
+#
+#   python scrape_bench.py [--repeat N] [--out FILE] [--compare OLD.json] [source ...]
+#   python scrape_bench.py --record [source ...]   # refresh fixtures from the live sites
+#
+# Each manifest.json maps the requested URLs to gzipped page files; a
+# manifest with "synthetic": true holds hand-built pages that mirror the
+# site markup the specs select on, --record replaces them with captures.
+
+FIXTURE_DIR = os.environ.get("BENCH_FIXTURES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures"))
+RESULTS_DIR = os.environ.get("BENCH_RESULTS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results"))
+
+
+def _response(url, body, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response.reason = "OK" if status == 200 else "Not Found"
+    response.url = url
+    response.headers = CaseInsensitiveDict({
+        "Content-Type": "text/html; charset=utf-8",
+        "Content-Length": str(len(body)),
+    })
+    response.encoding = "utf-8"
+    # A real urllib3 body so stream=True / iter_content / raw.tell() behave as on the wire
+    response.raw = HTTPResponse(body=io.BytesIO(body), preload_content=False, status=status)
+    return response
+
+
+def load_fixtures(name, fixture_dir=FIXTURE_DIR):
+    folder = os.path.join(fixture_dir, name)
+    with open(os.path.join(folder, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    pages = {}
+    for url, filename in manifest["pages"].items():
+        with gzip.open(os.path.join(folder, filename), "rb") as f:
+            pages[url] = f.read()
+    return manifest, pages
+
+
+class FixtureSession:
+    """Stand-in for the shared requests.Session that serves fixture pages."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.missing = set()
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, **kwargs):
+        body = self.pages.get(url)
+        with self._lock:
+            self.requests += 1
+            if body is None:
+                self.missing.add(url)
+        if body is None:
+            return _response(url, b"", status=404)
+        return _response(url, body)
+
+    def close(self):
+        pass
+
+
+class RecordingSession:
+    """Wraps the real session and keeps every fetched page for the fixtures."""
+
+    def __init__(self, session):
+        self.session = session
+        self.pages = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, **kwargs):
+        kwargs.pop("stream", None)
+        response = self.session.get(url, headers=headers, **kwargs)
+        body = response.content
+        if response.status_code == 200:
+            with self._lock:
+                self.pages[url] = body
+        return _response(url, body, status=response.status_code)
+
+    def close(self):
+        self.session.close()
+
+
+@contextlib.contextmanager
+def offline(session, sleep=False):
+    """Route http_client through ``session`` with caches, parse pool, hedging (and sleeps) disabled."""
+    saved = (http_client._session, http_cache.ENABLED, detail_store.ENABLED, parse_pool.ENABLED,
+             http_client.HEDGE, time.sleep)
+    http_client._session = session
+    http_cache.ENABLED = False
+    detail_store.ENABLED = False
+    parse_pool.ENABLED = False
+    http_client.HEDGE = False
+    if not sleep:
+        time.sleep = lambda seconds: None
+    try:
+        yield session
+    finally:
+        (http_client._session, http_cache.ENABLED, detail_store.ENABLED, parse_pool.ENABLED,
+         http_client.HEDGE, time.sleep) = saved
+
+
+def _quiet_run(name):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run(name)
+
+
+def bench_source(name, repeat=5, fixture_dir=FIXTURE_DIR):
+    manifest, pages = load_fixtures(name, fixture_dir)
+    session = FixtureSession(pages)
+    with offline(session):
+        items = len(_quiet_run(name))  # warm-up: imports, compiled selectors, parser caches
+        requests_per_run = session.requests
+
+        times = []
+        gc_passes = []
+        for _ in range(repeat):
+            gc.collect()
+            before = gc.get_stats()[0]["collections"]
+            start = time.perf_counter()
+            _quiet_run(name)
+            times.append(time.perf_counter() - start)
+            gc_passes.append(gc.get_stats()[0]["collections"] - before)
+
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.take_snapshot()
+        _quiet_run(name)
+        peak = tracemalloc.get_traced_memory()[1]
+        gc.collect()  # bs4 trees are cyclic; count only what survives a collection
+        current = tracemalloc.get_traced_memory()[0]
+        retained = tracemalloc.take_snapshot().compare_to(baseline, "filename")
+        tracemalloc.stop()
+
+    return {
+        "synthetic": manifest.get("synthetic", False),
+        "pages": len(pages),
+        "fixture_kb": round(sum(len(body) for body in pages.values()) / 1024, 1),
+        "requests": requests_per_run,
+        "missing": sorted(session.missing),
+        "items": items,
+        "best_ms": round(min(times) * 1000, 2),
+        "median_ms": round(statistics.median(times) * 1000, 2),
+        "peak_kb": round(peak / 1024, 1),
+        "retained_kb": round(current / 1024, 1),
+        "retained_blocks": sum(stat.count_diff for stat in retained if stat.count_diff > 0),
+        "gc_gen0": max(gc_passes) if gc_passes else 0,
+    }
+
+
+def record(names, fixture_dir=FIXTURE_DIR):
+    # Full pages are needed for the fixtures, so turn off the early stop
+    saved_stream = stream_extract.ENABLED
+    stream_extract.ENABLED = False
+    try:
+        for name in names:
+            session = RecordingSession(http_client._build_session(http_client.POOL_CONNECTIONS, http_client.POOL_MAXSIZE))
+            # Live sites: keep the politeness delays
+            with offline(session, sleep=True):
+                try:
+                    items = len(run(name))
+                except Exception as e:
+                    print(f"[BENCH ERROR] {name}: {e}")
+                    continue
+            folder = os.path.join(fixture_dir, name)
+            os.makedirs(folder, exist_ok=True)
+            manifest = {"source": name, "synthetic": False,
+                        "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"), "pages": {}}
+            listing = REGISTRY[name].url
+            for index, (url, body) in enumerate(sorted(session.pages.items(), key=lambda page: page[0] != listing)):
+                filename = "listing.html.gz" if url == listing else f"detail-{index:02d}.html.gz"
+                with gzip.open(os.path.join(folder, filename), "wb", compresslevel=9) as f:
+                    f.write(body)
+                manifest["pages"][url] = filename
+            with open(os.path.join(folder, "manifest.json"), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            print(f"[BENCH] Recorded {name}: {len(manifest['pages'])} pages, {items} items")
+    finally:
+        stream_extract.ENABLED = saved_stream
+
+
+def _git_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        return sha, bool(dirty)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def compare(old, new):
+    print(f"{'source':<14}{'best ms old/new':>20}{'Δ%':>8}{'peak KB old/new':>20}{'Δ%':>8}")
+    for name, result in new["sources"].items():
+        before = old.get("sources", {}).get(name)
+        if not before:
+            continue
+        ms = f"{before['best_ms']:.1f}/{result['best_ms']:.1f}"
+        kb = f"{before['peak_kb']:.0f}/{result['peak_kb']:.0f}"
+        ms_delta = 100 * (result["best_ms"] / before["best_ms"] - 1) if before["best_ms"] else 0
+        kb_delta = 100 * (result["peak_kb"] / before["peak_kb"] - 1) if before["peak_kb"] else 0
+        print(f"{name:<14}{ms:>20}{ms_delta:>+8.1f}{kb:>20}{kb_delta:>+8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline per-source scrape benchmark")
+    parser.add_argument("sources", nargs="*", help="sources to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="fixture directory")
+    parser.add_argument("--out", help="write results JSON here (default: bench_results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    parser.add_argument("--record", action="store_true", help="fetch live pages into the fixtures instead")
+    args = parser.parse_args(argv)
+    names = args.sources or list(REGISTRY)
+
+    if args.record:
+        record(names, args.fixtures)
+        return None
+
+    sha, dirty = _git_commit()
+    results = {
+        "commit": sha,
+        "dirty": dirty,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "backend": html_parser.backend(),
+        "stream_details": stream_extract.ENABLED,
+        "repeat": args.repeat,
+        "sources": {},
+    }
+    for name in names:
+        try:
+            results["sources"][name] = bench_source(name, args.repeat, args.fixtures)
+        except Exception as e:
+            print(f"[BENCH ERROR] {name}: {e}")
+    measured = results["sources"].values()
+    results["totals"] = {
+        "best_ms": round(sum(r["best_ms"] for r in measured), 2),
+        "peak_kb_max": max((r["peak_kb"] for r in measured), default=0),
+        "items": sum(r["items"] for r in measured),
+    }
+
+    print(f"Backend: {results['backend']}  commit: {sha}{' (dirty)' if dirty else ''}")
+    print(f"{'source':<14}{'pages':>6}{'items':>6}{'best ms':>10}{'median ms':>11}{'peak KB':>10}{'retained KB':>13}{'gc0':>6}")
+    for name, r in results["sources"].items():
+        print(f"{name:<14}{r['pages']:>6}{r['items']:>6}{r['best_ms']:>10}{r['median_ms']:>11}{r['peak_kb']:>10}"
+              f"{r['retained_kb']:>13}{r['gc_gen0']:>6}")
+        if r["missing"]:
+            print(f"{'':<14}no fixture for: {', '.join(r['missing'])}")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{sha or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,483 @@
+import functools
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+import requests
+import soupsieve
+
+import article_db
+import circuit_breaker
+import csv_store
+import deadline
+import http_client
+import metrics
+import parse_pool
+import stream_extract
+from fetch_pool import iter_details
+from html_parser import make_soup
+
+# --- Declarative scrape engine ---
+# A Source describes one site: listing URL, header profile, the container and
+# item selectors, one extractor per output field, the detail-page extractor
+# and how rows are archived.  Selectors are compiled with soupsieve when the
+# spec is built (i.e. once, at import of sources.py) and scrape() runs every
+# spec the same way: fetch -> subtree parse -> extract -> detail pool ->
+# save.  Concurrency (fetch_pool), detail caching (detail_store) and timing
+# (stats) therefore live here once instead of in every scraper.
+#
+# A run is refused while the source's circuit breaker is open.  When the
+# request deadline passes during the detail phase the listing cards are
+# returned as they are (details that arrived in time included), marked
+# partial and not archived: the next complete run stores them.
+#
+# Listing and detail pages are parsed in parse_pool's worker processes
+# (see parse_pool.py); streamed detail pages are parsed as they download.
+
+
+class ScrapeError(Exception):
+    def __init__(self, message, **extra):
+        super().__init__(message)
+        self.extra = extra
+
+    def __reduce__(self):
+        # Keep extra when raised in a parse worker
+        return functools.partial(type(self), **self.extra), self.args
+
+
+def _compile(css):
+    if css is None or callable(css):
+        return css
+    return soupsieve.compile(css)
+
+
+def absolute(value, base):
+    if value and base and not value.startswith("http"):
+        return base + value
+    return value
+
+
+class Select:
+    """Value of the first element matched by ``css``.
+
+    ``css`` may be a list of alternatives tried in order; an alternative can
+    also be a callable tag -> element.  None selects the item itself.  The
+    value is the first non-empty attribute in ``attr``, else the element's
+    text (joined with ``sep``) unless ``text=False``; ``extract`` replaces
+    both with a callable element -> value.
+    """
+
+    def __init__(self, css=None, attr=None, text=None, sep="", base=None, extract=None, transform=None):
+        alternatives = css if isinstance(css, (list, tuple)) else [css]
+        self.selectors = [_compile(alt) for alt in alternatives]
+        self.attrs = list(attr) if isinstance(attr, (list, tuple)) else ([attr] if attr else [])
+        self.text = (not self.attrs) if text is None else text
+        self.sep = sep
+        self.base = base
+        self.extract = extract
+        self.transform = transform
+
+    def element(self, tag):
+        for selector in self.selectors:
+            if selector is None:
+                return tag
+            found = selector(tag) if callable(selector) else selector.select_one(tag)
+            if found is not None:
+                return found
+        return None
+
+    def __call__(self, tag):
+        element = self.element(tag)
+        if element is None:
+            return None
+        if self.extract:
+            value = self.extract(element)
+        else:
+            value = next((element[name] for name in self.attrs if element.get(name)), None)
+            if value is None and self.text:
+                value = element.get_text(self.sep, strip=True)
+        value = absolute(value, self.base) if isinstance(value, str) else value
+        if value is not None and self.transform:
+            value = self.transform(value)
+        return value
+
+
+def Const(value):
+    return lambda tag: value
+
+
+def largest_div(tag):
+    # Fallback for pages without a known content block: the div with most text
+    divs = tag.find_all("div")
+    return max(divs, key=lambda d: len(d.get_text(strip=True))) if divs else None
+
+
+class Detail:
+    """Detail-page extractor: parse the article page (or stream it) into fields.
+
+    ``fields`` maps output names to Select over the (subtree-parsed) page;
+    ``stream`` maps them to stream_extract.Field instead.  ``finish`` can
+    post-process the dict.  Per-host politeness is rate_limit's job.
+    """
+
+    def __init__(self, fields=None, stream=None, only=None, profile="default", timeout=None,
+                 base=None, finish=None, check_status=False, source=None):
+        self.fields = fields or {}
+        self.stream = stream
+        self.only = only
+        self.profile = profile
+        self.timeout = timeout
+        self.base = base
+        self.finish = finish
+        self.check_status = check_status
+        self.source = source
+
+    def parse(self, markup):
+        soup = make_soup(markup, only=self.only)
+        return {name: select(soup) for name, select in self.fields.items()}
+
+    def _pooled(self):
+        # Workers can only rebuild a Detail that is some registered spec's detail
+        import sources
+        spec = sources.REGISTRY.get(self.source)
+        return spec is not None and spec.detail is self
+
+    def __call__(self, url):
+        url = absolute(url, self.base)
+        # Detail pages are the long tail of a scrape, so they are hedged
+        kwargs = {"hedge": True, "timeout": self.timeout} if self.timeout else {"hedge": True}
+        if self.stream is not None:
+            page = stream_extract.fetch_fields(url, self.stream, source=self.source, profile=self.profile, **kwargs)
+            detail = dict(page.values)
+        else:
+            with metrics.timer("scrape_fetch_seconds", source=self.source, page="detail"):
+                response = http_client.get(url, profile=self.profile, **kwargs)
+                content = response.content
+            if self.check_status:
+                response.raise_for_status()
+            with metrics.timer("scrape_parse_seconds", source=self.source, page="detail"):
+                if parse_pool.wanted(len(content)) and self._pooled():
+                    detail = parse_pool.run(_parse_detail, self.source, content, response.encoding)
+                else:
+                    parse_pool.count_inline()
+                    detail = self.parse(response.text)
+        if self.finish:
+            detail = self.finish(detail)
+        # Nothing found: return None so the miss is not cached as a result
+        return detail if any(value is not None for value in detail.values()) else None
+
+
+class Source:
+    def __init__(self, name, url, items, fields, profile="default", parse_only=None, container=None,
+                 all_containers=False, group_fields=None, require=None, require_fields=(), unique=None,
+                 limit=None, detail=None, detail_url="anchor_link", detail_into=None, keep=None, check_status=False,
+                 container_required=False, timeout=None, csv_path=None, csv_columns=None, csv_key=None,
+                 csv_normalize=None, csv_mode="append", on_save=None):
+        self.name = name
+        self.url = url
+        self.profile = profile
+        self.parse_only = parse_only
+        self.container = _compile(container)
+        self.all_containers = all_containers
+        self.group_fields = group_fields or {}
+        self.items = _compile(items)
+        self.fields = fields
+        self.require = _compile(require)
+        self.require_fields = tuple(require_fields)
+        self.unique = unique
+        self.limit = limit
+        self.detail = detail
+        self.detail_url = detail_url
+        self.detail_into = detail_into
+        self.keep = keep
+        self.check_status = check_status
+        self.container_required = container_required
+        self.timeout = timeout
+        self.csv_path = csv_path
+        self.csv_columns = csv_columns
+        self.csv_key = csv_key
+        self.csv_normalize = csv_normalize
+        self.csv_mode = csv_mode
+        self.on_save = on_save
+        if isinstance(detail, Detail) and detail.source is None:
+            detail.source = name
+
+    def containers(self, soup):
+        if self.container is None:
+            return [soup]
+        if self.all_containers:
+            return self.container.select(soup)
+        found = self.container.select_one(soup)
+        return [found] if found is not None else []
+
+    def extract(self, soup):
+        rows = []
+        seen = set()
+        for container in self.containers(soup):
+            group = {name: select(container) for name, select in self.group_fields.items()}
+            if self.group_fields and not all(group.values()):
+                continue
+            for item in self.items.select(container):
+                if self.require is not None and self.require.select_one(item) is None:
+                    continue
+                row = {name: select(item) for name, select in self.fields.items()}
+                row.update(group)
+                if any(not row.get(name) for name in self.require_fields):
+                    continue
+                if self.unique:
+                    if row.get(self.unique) in seen:
+                        continue
+                    seen.add(row.get(self.unique))
+                rows.append(row)
+                if self.limit and len(rows) >= self.limit:
+                    return rows
+        return rows
+
+
+_stats_lock = threading.Lock()
+stats = {}
+
+
+def _record(name, **values):
+    with _stats_lock:
+        counters = stats.setdefault(name, {"runs": 0, "errors": 0, "items": 0, "listing_s": 0.0, "detail_s": 0.0, "total_s": 0.0})
+        for key, value in values.items():
+            counters[key] = round(counters[key] + value, 3) if isinstance(value, float) else counters[key] + value
+
+
+def fetch_listing(spec):
+    kwargs = {"timeout": spec.timeout} if spec.timeout else {}
+    with metrics.timer("scrape_fetch_seconds", source=spec.name, page="listing"):
+        response = http_client.get(spec.url, profile=spec.profile, **kwargs)
+    if spec.check_status and response.status_code >= 400:
+        raise ScrapeError(f"Failed to fetch {spec.name} page, status code: {response.status_code}")
+    return response
+
+
+def _detail_fields(spec, detail):
+    # What a detail result adds to its row ({} when nothing)
+    if detail is not None and not isinstance(detail, dict):
+        detail = {spec.detail_into: detail}
+    if spec.detail_into and not detail:
+        detail = {spec.detail_into: None}
+    return detail or {}
+
+
+def _detail_updates(spec, rows):
+    # Fill rows in place from their detail pages, yielding (index, fields) as pages land
+    positions = {}
+    for index, row in enumerate(rows):
+        positions.setdefault(row.get(spec.detail_url), []).append(index)
+    missing = set(positions)
+    try:
+        for url, detail in iter_details(list(positions), spec.detail, cache_as=spec.name):
+            missing.discard(url)
+            fields = _detail_fields(spec, detail)
+            for index in positions[url]:
+                rows[index].update(fields)
+                yield index, fields
+    finally:
+        # Rows without a detail URL, or cut off by the deadline, get the empty detail
+        for url in missing:
+            for index in positions[url]:
+                rows[index].update(_detail_fields(spec, None))
+
+
+def fill_details(spec, rows):
+    if spec.detail is None or not rows:
+        return
+    for _ in _detail_updates(spec, rows):
+        pass
+
+
+def _cut_short(spec, rows):
+    deadline.mark_partial(spec.name)
+    metrics.inc("scrape_partial_total", source=spec.name)
+    print(f"[{spec.name}] Deadline reached: returning {len(rows)} items, some without detail pages")
+
+
+def save(spec, rows):
+    if not spec.csv_path:
+        return
+    started = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(spec.csv_path), exist_ok=True)
+        if spec.csv_mode == "overwrite":
+            pd.DataFrame(rows).to_csv(spec.csv_path, index=False)
+            print(f"[{spec.name}] Saved {len(rows)} items to {spec.csv_path}")
+        else:
+            key = spec.csv_key or spec.csv_columns or sorted({col for row in rows for col in row})
+            added, total = csv_store.append_rows(spec.csv_path, rows, key_fields=key, columns=spec.csv_columns,
+                                                 normalize=spec.csv_normalize)
+            print(f"[{spec.name}] Saved {added} new items to {spec.csv_path} ({total} unique)")
+        if spec.on_save:
+            spec.on_save(rows)
+        article_db.save_articles(spec.name, rows)
+    except Exception as e:
+        metrics.inc("scrape_errors_total", source=spec.name, stage="persist")
+        print(f"[{spec.name}] Failed to save: {e}")
+    metrics.observe("scrape_persist_seconds", time.perf_counter() - started, source=spec.name)
+
+
+def _listing_rows(spec, text):
+    soup = make_soup(text, only=spec.parse_only)
+    if spec.container is not None and not spec.containers(soup):
+        if spec.container_required:
+            raise ScrapeError(f"Could not find the news container on the {spec.name} page.",
+                              html_snippet=text[:500])
+        print(f"[{spec.name}] News container not found; the page layout may have changed.")
+    return spec.extract(soup)
+
+
+def _decoded(content, encoding):
+    # response.text for a body shipped to a worker as bytes
+    response = requests.Response()
+    response._content = content
+    response.encoding = encoding
+    return response.text
+
+
+def _parse_listing(name, content, encoding):
+    # Runs in a parse_pool worker
+    import sources
+    return _listing_rows(sources.REGISTRY[name], _decoded(content, encoding))
+
+
+def _parse_detail(name, content, encoding):
+    # Runs in a parse_pool worker
+    import sources
+    return sources.REGISTRY[name].detail.parse(_decoded(content, encoding))
+
+
+def parse_listing(spec, response):
+    import sources
+    with metrics.timer("scrape_parse_seconds", source=spec.name, page="listing"):
+        content = response.content
+        if parse_pool.wanted(len(content)) and sources.REGISTRY.get(spec.name) is spec:
+            return parse_pool.run(_parse_listing, spec.name, content, response.encoding)
+        parse_pool.count_inline()
+        return _listing_rows(spec, response.text)
+
+
+def _finished(spec, rows, response, started, listed, detailed):
+    _record(spec.name, runs=1, items=len(rows), listing_s=listed - started,
+            detail_s=detailed - listed, total_s=time.monotonic() - started)
+    metrics.inc("scrape_runs_total", source=spec.name)
+    metrics.inc("scrape_articles_total", len(rows), source=spec.name)
+    print(f"[{spec.name}] {len(rows)} items (HTTP {response.status_code}) in {time.monotonic() - started:.2f}s")
+
+
+def _failed(spec, started, stage, error):
+    _record(spec.name, runs=1, errors=1, total_s=time.monotonic() - started)
+    metrics.inc("scrape_errors_total", source=spec.name, stage=stage)
+    if not isinstance(error, deadline.DeadlineExceeded):
+        # Running out of request time says nothing about the site
+        circuit_breaker.failure(spec.name)
+
+
+def scrape(spec, save_csv=False):
+    """Run one Source spec; returns the list of article dicts."""
+    trial = circuit_breaker.allow(spec.name)
+    try:
+        return _scrape(spec, save_csv)
+    finally:
+        if trial:
+            # No-op after success() / failure(); frees a trial cut off by the deadline
+            circuit_breaker.release(spec.name)
+
+
+def _scrape(spec, save_csv):
+    started = time.monotonic()
+    stage = "fetch"
+    partial = False
+    try:
+        response = fetch_listing(spec)
+        stage = "parse"
+        rows = parse_listing(spec, response)
+        listed = time.monotonic()
+
+        stage = "detail"
+        try:
+            fill_details(spec, rows)
+        except deadline.DeadlineExceeded:
+            partial = True
+            _cut_short(spec, rows)
+        if spec.keep:
+            rows = [row for row in rows if spec.keep(row)]
+        detailed = time.monotonic()
+    except Exception as e:
+        _failed(spec, started, stage, e)
+        raise
+
+    circuit_breaker.success(spec.name)
+    if save_csv and not partial:
+        save(spec, rows)
+    _finished(spec, rows, response, started, listed, detailed)
+    return rows
+
+
+def scrape_events(spec, save_csv=False):
+    """Run one Source spec, yielding progress as soon as it is known.
+
+    Yields ("article", index, row) for every listing card right after the
+    listing parse, ("detail", index, fields) as each detail page completes,
+    ("drop", index, None) for rows ``keep`` rejects once their detail is in,
+    and finally ("done", count, rows) with the same rows scrape() returns.
+    """
+    trial = circuit_breaker.allow(spec.name)
+    try:
+        yield from _scrape_events(spec, save_csv)
+    finally:
+        if trial:
+            # Also runs when the consumer stops early (client disconnect)
+            circuit_breaker.release(spec.name)
+
+
+def _scrape_events(spec, save_csv):
+    started = time.monotonic()
+    stage = "fetch"
+    partial = False
+    try:
+        response = fetch_listing(spec)
+        stage = "parse"
+        rows = parse_listing(spec, response)
+        listed = time.monotonic()
+        for index, row in enumerate(rows):
+            yield "article", index, row
+
+        stage = "detail"
+        if spec.detail is not None and rows:
+            try:
+                for index, fields in _detail_updates(spec, rows):
+                    if fields:
+                        yield "detail", index, fields
+            except deadline.DeadlineExceeded:
+                partial = True
+                _cut_short(spec, rows)
+        if spec.keep:
+            for index, row in enumerate(rows):
+                if not spec.keep(row):
+                    yield "drop", index, None
+            rows = [row for row in rows if spec.keep(row)]
+        detailed = time.monotonic()
+    except Exception as e:
+        _failed(spec, started, stage, e)
+        raise
+
+    circuit_breaker.success(spec.name)
+    if save_csv and not partial:
+        save(spec, rows)
+    _finished(spec, rows, response, started, listed, detailed)
+    yield "done", len(rows), rows
+
+
+def lead_sentence(detail):
+    # short_desc = first sentence of long_desc (Forbes / The Gradient)
+    long_desc = detail.get("long_desc") if detail else None
+    if not long_desc:
+        return dict(detail or {}, short_desc=None)
+    match = re.match(r'(.+?[.!?])(\s|$)', long_desc)
+    detail["short_desc"] = match.group(1).strip() if match else long_desc[:120].strip()
+    return detail
@@ -0,0 +1,425 @@
+import re
+
+import soupsieve
+
+import csv_store
+import stream_extract
+from html_parser import make_soup
+from scrape_engine import Const, Detail, Select, Source, largest_div, lead_sentence, scrape
+
+# --- Source registry ---
+# One Source spec per site, run by scrape_engine.scrape().  The scrape_*
+# functions in ainews_scraper / cybernews_scraper / marktechpost_scraper /
+# datasience_news are thin wrappers around run(name).  Field names and row
+# order are the ones each scraper has always returned.  Only the parts that
+# do not fit a selector are hooks (functions below).
+
+
+# --- Hooks ---
+def _first_lines(text, count=3):
+    # Wired: only the first 3 lines (or sentences) of the article body
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if len(lines) >= count:
+        return "\n".join(lines[:count])
+    sentences = [s.strip() for s in text.split(".") if s.strip()]
+    return ". ".join(sentences[:count]) + ("." if sentences else "")
+
+
+def _paragraphs(content_div):
+    # Towards Data Science: paragraphs and list items for a fuller summary
+    ps = content_div.find_all(["p", "li"])
+    return " ".join(p.get_text(strip=True) for p in ps) if ps else content_div.get_text(" ", strip=True)
+
+
+_FORBES_IMG = soupsieve.compile("img.tBA7tnId")
+_FORBES_LINK = soupsieve.compile("a[href]")
+_IMAGE_URL = re.compile(r'(https?://[^\s"\']+\.(?:jpg|jpeg|png|webp|gif))')
+
+
+def _forbes_image(card):
+    img = _FORBES_IMG.select_one(card)
+    if img is not None and img.get("src"):
+        return img["src"]
+    # Lazy-loaded cards: the image URL is in the link's tracking data
+    link = _FORBES_LINK.select_one(card)
+    if link is not None and link.has_attr("data-ga-track"):
+        match = _IMAGE_URL.search(link["data-ga-track"])
+        if match:
+            return match.group(1)
+    return None
+
+
+def _save_thegradient_descriptions(rows):
+    desc_rows = [{"title": row["title"], "long_desc": row["long_desc"]} for row in rows if row["long_desc"]]
+    desc_csv_path = "assets/csv/thegradient_descriptions.csv"
+    added, total = csv_store.append_rows(desc_csv_path, desc_rows, key_fields=["title", "long_desc"], columns=["title", "long_desc"])
+    print(f"[thegradient] Saved {added} new full descriptions to {desc_csv_path} ({total} total)")
+
+
+# MarkTechPost: stream up to the first paragraph / image / author link; fall
+# back to a soup parse of what was read when the post content block is missing
+_POST_CONTENT = ("div", {"class": "td-post-content tagdiv-type"})
+MARKTECHPOST_FIELDS = {
+    "long_desc": stream_extract.Field("p", inside=_POST_CONTENT, text=True),
+    "image_url": stream_extract.Field("img", inside=_POST_CONTENT, attr="src"),
+    "author": stream_extract.Field("a", inside=("div", {"class": "td-post-author-name"}), text=True, sep=""),
+}
+
+
+def _marktechpost_article(anchor_link):
+    page = stream_extract.fetch_fields(anchor_link, MARKTECHPOST_FIELDS, source="marktechpost", timeout=10)
+    if page.get("long_desc"):
+        return {key: value for key, value in page.values.items() if value}
+    detail = {}
+    article_soup = make_soup(page.text)
+    content_div = article_soup.find("div", class_="td-post-content tagdiv-type")
+    if content_div:
+        detail["long_desc"] = content_div.get_text(separator=" ", strip=True)
+        img_tag = content_div.find("img")
+    else:
+        paragraphs = article_soup.find_all("p")
+        detail["long_desc"] = " ".join(p.get_text(strip=True) for p in paragraphs) if paragraphs else None
+        img_tag = article_soup.find("img")
+    if img_tag and img_tag.has_attr("src"):
+        detail["image_url"] = img_tag["src"]
+    author_a = article_soup.select_one("div.td-post-author-name a")
+    if author_a:
+        detail["author"] = author_a.get_text(strip=True)
+    return detail
+
+
+# --- AI sources ---
+DEEPMIND = Source(
+    "deepmind", "https://deepmind.google/discover/blog/",
+    parse_only=("a", {"class": "glue-card"}),
+    items="a.glue-card.card",
+    fields={
+        "title": Select("p.glue-headline.glue-headline--headline-5"),
+        "short_desc": Select("p.glue-card__description"),
+        "image_url": Select("img.picture__image", attr="src"),
+        "timestamp": Select("time", attr="datetime"),
+        "source": Const("https://deepmind.google/discover/blog/"),
+        "published": Const(False),
+        # Use site root as base, not /discover/blog/
+        "anchor_link": Select(None, attr="href", base="https://deepmind.google"),
+        "long_desc": Const(None),
+    },
+    detail=Detail(fields={"long_desc": Select(["div.post-body", "article", largest_div], sep=" ")}),
+    detail_into="long_desc",
+    csv_path="assets/csv/deepmind.csv", csv_key=["title", "timestamp"],
+    csv_columns=["title", "short_desc", "image_url", "timestamp", "source", "published", "anchor_link", "long_desc"],
+)
+
+WIRED = Source(
+    "wired", "https://www.wired.com/tag/artificial-intelligence/",
+    parse_only=("div", {"class": lambda x: x and "summary-item" in x}),
+    items='div[class*="summary-item"]',
+    fields={
+        "title": Select('a[class*="summary-item__hed-link"][href] h3[class*="summary-item__hed"]'),
+        "image_url": Select('img[class*="responsive-image__image"]', attr="src"),
+        "timestamp": Select(['time[class*="ContentHeaderTitleBlockPublishDate"]', "time"], attr="datetime"),
+        "author": Select(['span[class*="byline__preamble"] ~ span', 'span[class*="byline__name"]']),
+        "source": Const("https://www.wired.com/tag/artificial-intelligence/"),
+        "published": Const(False),
+        "anchor_link": Select('a[class*="summary-item__hed-link"][href]', attr="href", base="https://www.wired.com"),
+        "long_desc": Const(None),
+    },
+    # Untitled cards are dropped before their pages are fetched
+    require_fields=["title"],
+    detail=Detail(
+        fields={"long_desc": Select('div[class*="body__inner-container"]', sep="\n", transform=_first_lines)},
+        only=("div", {"class": lambda x: x and "body__inner-container" in x}),
+    ),
+    detail_into="long_desc",
+    keep=lambda row: row["long_desc"] or row["image_url"] or row["anchor_link"],
+    # Titles already archived are skipped (the first copy is kept)
+    csv_path="assets/csv/wired.csv", csv_key=["title"],
+    csv_columns=["title", "image_url", "timestamp", "author", "source", "published", "anchor_link", "long_desc"],
+)
+
+ZDNET = Source(
+    "zdnet", "https://www.zdnet.com/topic/artificial-intelligence/",
+    profile="zdnet", check_status=True,
+    parse_only=("div", {"class": "c-dynamicCarousel"}),
+    container="div.c-dynamicCarousel", all_containers=True,
+    group_fields={"category": Select("h4.c-sectionHeading")},
+    items=".c-listingCarouselHorizontal_item a",
+    fields={
+        "title": Select(None, attr="title", text=True),
+        "short_desc": Const(None),
+        "image_url": Select("img", attr="src"),
+        "timestamp": Const(None),
+        "author": Const(None),
+        "source": Const("https://www.zdnet.com/topic/artificial-intelligence/"),
+        "published": Const(False),
+        "anchor_link": Select(None, attr="href", base="https://www.zdnet.com"),
+        "long_desc": Const(None),
+    },
+    # Description, timestamp and author sit above the article body, so the
+    # download stops once the body has been read
+    detail=Detail(stream={
+        "short_desc": stream_extract.Field("meta", {"name": "description"}, attr="content"),
+        "timestamp": stream_extract.Field("time", attr="datetime"),
+        "author": stream_extract.Field("span", {"class": "c-byline__authorName"}, text=True, sep=""),
+        "long_desc": stream_extract.Field("div", {"class": "article-body"}, text=True),
+    }, profile="zdnet", timeout=8),
+    csv_path="assets/csv/zdnet_ai_carousels.csv", csv_mode="overwrite",
+)
+
+NVIDIA = Source(
+    "nvidia", "https://developer.nvidia.com/blog/",
+    profile="plain", check_status=True,
+    parse_only=("div", {"class": "carousel-row-slide__inner"}),
+    items="div.carousel-row-slide__inner",
+    fields={
+        "title": Select("div.carousel-row-slide__title h3"),
+        "short_description": Select("div.carousel-row-slide__excerpt div.content-m"),
+        "image_url": Select("div.carousel-row-slide__thumbnail img", attr="src"),
+        "timestamp": Select("span.post-published-date"),
+        "source": Const("https://developer.nvidia.com/blog/"),
+        "published": Const(False),
+    },
+    csv_path="assets/csv/nvidia_blogs.csv", csv_key=["title", "image_url"],
+)
+
+FORBES = Source(
+    "forbes", "https://www.forbes.com/ai/",
+    profile="forbes", timeout=10, check_status=True,
+    parse_only=("div", {"class": "ZQt9W"}),
+    container="div.ZQt9W", container_required=True,
+    items='div[class="TNWax51Q T3-IGTjJ jiKZAfWh"]',
+    fields={
+        "title": Select("h3"),
+        "short_desc": Const(None),
+        "author": Select("p.ujvJmzbB"),
+        "image_url": _forbes_image,
+        "timestamp": Select("div.IE8ecQMQ span"),
+        "source": Const("https://www.forbes.com/ai/"),
+        "published": Const(False),
+        "anchor_link": Select("div.WjVFB823 a[href]", attr="href", base="https://www.forbes.com/ai/"),
+        "long_desc": Const(None),
+    },
+    detail=Detail(
+        fields={"long_desc": Select("div.p5_3X", sep=" ")},
+        only=("div", {"class": "p5_3X"}), profile="forbes", timeout=10, finish=lead_sentence,
+    ),
+    # Titles are compared case- and whitespace-insensitively
+    csv_path="assets/csv/forbes_ai.csv", csv_key=["title"], csv_normalize=lambda v: v.strip().lower(),
+    csv_columns=["title", "short_desc", "author", "image_url", "timestamp", "source", "published", "anchor_link", "long_desc"],
+)
+
+THEGRADIENT = Source(
+    "thegradient", "https://thegradient.pub",
+    profile="gradient",
+    parse_only=("div", {"class": lambda x: x and "c-post-card-wrap" in x}),
+    items='div[class*="c-post-card-wrap"]',
+    fields={
+        "title": Select(["h2", "h3"]),
+        "short_desc": Select("p"),
+        "image_url": Select("img.c-post-card__image", attr="src", base="https://thegradient.pub"),
+        "timestamp": Select("time", attr="datetime"),
+        "source": Const("https://thegradient.pub"),
+        "published": Const(False),
+        "anchor_link": Select("a[href]", attr="href", base="https://thegradient.pub"),
+        "long_desc": Const(None),
+    },
+    detail=Detail(
+        fields={"long_desc": Select(['article[class*="c-post"]', "div.c-content"], sep=" ")},
+        profile="gradient", finish=lead_sentence,
+    ),
+    csv_path="assets/csv/thegradient.csv", csv_key=["title", "timestamp"],
+    csv_columns=["title", "short_desc", "image_url", "timestamp", "source", "published", "anchor_link", "long_desc"],
+    on_save=_save_thegradient_descriptions,
+)
+
+AINEWS = Source(
+    "ainews", "https://www.ainews.com/",
+    parse_only=("div", {"class": "grid grid-cols-1 gap-6 md:grid-cols-2 lg:grid-cols-3"}),
+    container='div[class="grid grid-cols-1 gap-6 md:grid-cols-2 lg:grid-cols-3"]',
+    items='div[class="transparent h-full cursor-pointer overflow-hidden rounded-lg flex flex-col border"]',
+    fields={
+        "title": Select("h2"),
+        "short_desc": Select("p"),
+        "image_url": Select('img[class="absolute inset-0 h-full w-full object-cover"]', attr="src"),
+        "timestamp": Select("time", attr="datetime"),
+        "source": Const("https://www.ainews.com/"),
+        "published": Const(False),
+        "anchor_link": Select("div.space-y-3 a[href]", attr="href", base="https://www.ainews.com"),
+        "long_desc": Const(None),
+    },
+    detail=Detail(fields={"long_desc": Select("div#content-blocks", sep=" ")}, only=("div", {"id": "content-blocks"})),
+    detail_into="long_desc",
+    csv_path="assets/csv/ainews.csv", csv_key=["title", "timestamp"],
+    csv_columns=["title", "short_desc", "image_url", "timestamp", "source", "published", "anchor_link", "long_desc"],
+)
+
+_MTP_META = "div.td-module-meta-info"
+_MTP_TITLE = _MTP_META + ' h3[class="entry-title td-module-title"] a'
+MARKTECHPOST = Source(
+    "marktechpost", "https://www.marktechpost.com/",
+    # Only the top-news block
+    parse_only=("div", {"id": "tdi_86"}),
+    container='div#tdi_86[class="td_block_inner td-mc1-wrap"]',
+    items='div[class="td_module_flex td_module_flex_1 td_module_wrap td-animation-stack td-cpt-post"]',
+    require=_MTP_META,
+    fields={
+        "title": Select(_MTP_TITLE, attr="title", text=True),
+        "anchor_link": Select(_MTP_TITLE, attr="href"),
+        "category": Select(_MTP_META + " div.td-editor-date a.td-post-category"),
+        "timestamp": Select(_MTP_META + ' div.td-editor-date time[class="entry-date updated td-module-date"]', attr="datetime", text=True),
+        "source": Const("https://www.marktechpost.com/"),
+        "author": Const(None),
+        "image_url": Const(None),
+        "long_desc": Const(None),
+    },
+    detail=_marktechpost_article,
+    csv_path="assets/csv/marktechpost.csv", csv_key=["title", "timestamp"],
+    csv_columns=["title", "anchor_link", "category", "timestamp", "source", "author", "image_url", "long_desc"],
+)
+
+_TDS_LIST = "wp-block-post-template is-layout-grid wp-container-core-post-template-is-layout-c37e0d04 wp-block-post-template-is-layout-grid is-entire-card-clickable"
+_TDS_TITLE_GROUP = 'div[class="wp-block-group is-reversed is-vertical is-layout-flex wp-container-core-group-is-layout-ea0cb840 wp-block-group-is-layout-flex"]'
+_TDS_CATEGORY = 'a[class="is-taxonomy-category wp-elements-361e18664420f2745478f0373bcee025 wp-block-tenup-post-primary-term has-text-color has-text-secondary-color has-eyebrow-1-font-size"]'
+_TDS_CONTENT = "entry-content wp-block-post-content has-global-padding is-layout-constrained wp-block-post-content-is-layout-constrained"
+DATASCIENCE = Source(
+    "datascience", "https://towardsdatascience.com/",
+    parse_only=("ul", {"class": _TDS_LIST}),
+    container=f'ul[class="{_TDS_LIST}"]',
+    items=":scope > li",
+    fields={
+        "title": Select(_TDS_TITLE_GROUP + " h2 a"),
+        "anchor_link": Select(_TDS_TITLE_GROUP + " h2 a", attr="href"),
+        "category": Select(_TDS_TITLE_GROUP + " " + _TDS_CATEGORY),
+        "short_desc": Select("p.wp-block-post-excerpt__excerpt"),
+        "author": Select("a.wp-block-post-author-name__link"),
+        "image_url": Select("figure.wp-block-post-featured-image img", attr="src"),
+        "timestamp": Select("time", attr="datetime"),
+        "long_desc": Const(None),
+        "source": Const("https://towardsdatascience.com/"),
+    },
+    detail=Detail(
+        fields={"long_desc": Select(f'div[class="{_TDS_CONTENT}"]', extract=_paragraphs)},
+        only=("div", {"class": _TDS_CONTENT}), timeout=10,
+    ),
+    detail_into="long_desc",
+    csv_path="assets/csv/towardsdatascience.csv", csv_mode="overwrite",
+)
+
+# --- Cyber sources ---
+CYBEREXPRESS = Source(
+    "cyberexpress", "https://thecyberexpress.com/",
+    profile="plain", check_status=True,
+    parse_only=("article", {"class": "jeg_post"}),
+    items="article.jeg_post",
+    fields={
+        "title": Select(".jeg_post_title a"),
+        "short_description": Select(".jeg_post_excerpt p"),
+        "image_url": Select(".jeg_thumb img", attr="src"),
+        "timestamp": Select(".jeg_meta_date"),
+        "source": Const("https://thecyberexpress.com/"),
+        "published": Const(False),
+    },
+    csv_path="assets/csv/cyberexpress.csv", csv_key=["title", "timestamp"],
+    csv_columns=["title", "short_description", "image_url", "timestamp", "source", "published"],
+)
+
+_ARS_GRID = "mx-auto grid grid-cols-1 gap-5 sm:max-w-6xl sm:grid-cols-2 sm:px-5 lg:grid-cols-3 xl:px-0"
+ARSTECHNICA = Source(
+    "arstechnica", "https://arstechnica.com/",
+    parse_only=("div", {"class": _ARS_GRID}),
+    container=f'div[class="{_ARS_GRID}"]',
+    items="article",
+    fields={
+        "title": Select("h2, h3, a"),
+        "short_desc": Select("p"),
+        "image_url": Select("img", attr="src"),
+        "timestamp": Select("time", attr="datetime"),
+        "source": Const("https://arstechnica.com/"),
+        "published": Const(False),
+        "anchor_link": Select("a[href]", attr="href", base="https://arstechnica.com"),
+        "long_desc": Const(None),
+    },
+    detail=Detail(fields={"long_desc": Select("div.article-content", sep=" ")}, only=("div", {"class": "article-content"})),
+    detail_into="long_desc",
+    csv_path="assets/csv/arstechnica.csv", csv_key=["anchor_link"],
+    csv_columns=["title", "short_desc", "image_url", "timestamp", "source", "published", "anchor_link", "long_desc"],
+)
+
+_INFOSEC_HEADLINE = "div.content-info h3.content-headline a"
+INFOSECURITY = Source(
+    "infosecurity", "https://www.infosecurity-magazine.com",
+    profile="basic",
+    parse_only=("div", {"class": "col-1-3"}),
+    container="div.col-1-3", all_containers=True,
+    items="div.content-item",
+    require="div.content-info",
+    fields={
+        "title": Select(_INFOSEC_HEADLINE),
+        "summary": Select("p.content-teaser"),
+        "image_url": Select("img.content-thumb", attr="src"),
+        # The ISO datetime attribute as published; timestamps.py normalizes it
+        "timestamp": Select("div.content-info div.content-meta time", attr="datetime", text=True),
+        "article_url": Select(_INFOSEC_HEADLINE, attr="href", base="https://www.infosecurity-magazine.com"),
+    },
+    # The same story is listed in several columns
+    unique="article_url", limit=8,
+    csv_path="assets/csv/infosecurity.csv", csv_key=["article_url"],
+    csv_columns=["title", "summary", "image_url", "timestamp", "article_url"],
+)
+
+CYBERSCOOP = Source(
+    "cyberscoop", "https://cyberscoop.com/",
+    profile="plain", check_status=True,
+    parse_only=("div", {"class": "latest-posts__items"}),
+    container="div.latest-posts__items",
+    items="article.post-item",
+    fields={
+        "title": Select(["h3.post-item__title a", "h3.post-item__title"]),
+        "link": Select("h3.post-item__title a", attr="href"),
+        "image_url": Select("img", attr="src"),
+        "timestamp": Const(None),
+    },
+    # Stop downloading once the date line has been read
+    detail=Detail(stream={
+        "timestamp": stream_extract.Field("time", inside=("p", {"class": "single-article__date"}), attr="datetime", text=True, sep=""),
+    }, profile="plain", timeout=10, base="https://cyberscoop.com"),
+    detail_url="link", detail_into="timestamp",
+    csv_path="assets/csv/cyberscoop.csv", csv_key=["link"],
+    csv_columns=["title", "link", "image_url", "timestamp"],
+)
+
+_GBH_TITLE = "h3.entry-title.td-module-title a"
+GBHACKERS = Source(
+    "gbhackers", "https://gbhackers.com/",
+    profile="basic", timeout=10, check_status=True,
+    parse_only=("div", {"class": "td_module_10"}),
+    items="div.td_module_10.td_module_wrap.td-animation-stack",
+    fields={
+        "title": Select(_GBH_TITLE, attr="title", text=False),
+        "short_desc": Select("div.td-excerpt"),
+        # Prefer data-img-url (lazy loading) over src
+        "image_url": Select("a.td-image-wrap img", attr=["data-img-url", "src"]),
+        "timestamp": Select("span.td-post-date time"),
+        "source": Const("https://gbhackers.com/"),
+        "published": Const(False),
+        "anchor_link": Select(_GBH_TITLE, attr="href"),
+        "long_desc": Const(None),
+        "author": Select("span.td-post-author-name a"),
+    },
+    detail=Detail(
+        fields={"long_desc": Select(["div.td-post-content", largest_div], sep=" ")},
+        profile="basic", timeout=10, check_status=True,
+    ),
+    detail_into="long_desc",
+    csv_path="assets/csv/gbhackers.csv", csv_key=["anchor_link"],
+    csv_columns=["title", "short_desc", "image_url", "timestamp", "source", "published", "anchor_link", "long_desc", "author"],
+)
+
+REGISTRY = {spec.name: spec for spec in (
+    DEEPMIND, WIRED, ZDNET, NVIDIA, FORBES, THEGRADIENT, AINEWS, MARKTECHPOST, DATASCIENCE,
+    CYBEREXPRESS, ARSTECHNICA, INFOSECURITY, CYBERSCOOP, GBHACKERS,
+)}
+
+
+def run(name, save_csv=False):
+    return scrape(REGISTRY[name], save_csv=save_csv)
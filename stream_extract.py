@@ -0,0 +1,249 @@
+import codecs
+import os
+import threading
+import time
+from html.parser import HTMLParser
+
+import deadline
+import http_client
+import metrics
+from fetch_pool import host_of
+
+# --- Streaming fragment extraction ---
+# Some detail fetches only need a few fields near the top of the page (the
+# CyberScoop date, the first paragraph of a MarkTechPost post, ZDNet's meta
+# description / first <time>).  fetch_fields() streams the response in
+# chunks through an incremental html.parser and closes the download as soon
+# as every requested Field is resolved, or once MAX_BYTES have been read.
+# Per-source byte counts are kept in stats() so the savings are visible.
+# STREAM_DETAILS=0 downloads every page in full (same results, no early stop).
+
+MAX_BYTES = int(os.environ.get("STREAM_MAX_BYTES", str(1024 * 1024)))
+CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", "16384"))
+# When less than this is left of the body, read it anyway so the
+# keep-alive connection goes back to the pool instead of being dropped.
+DRAIN_BYTES = int(os.environ.get("STREAM_DRAIN_BYTES", "32768"))
+ENABLED = os.environ.get("STREAM_DETAILS", "1") != "0"
+
+_SKIP_TEXT = ("script", "style", "noscript", "template")
+_VOID = ("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr")
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def _class_matches(wanted, actual):
+    # Same rule as bs4's class_=: a multi-class string must match the whole
+    # attribute, a single class only has to be one of them.
+    if actual is None:
+        return False
+    if " " in wanted:
+        return actual == wanted
+    return wanted in actual.split()
+
+
+def _matches(tag, attrs, spec_tag, spec_attrs):
+    if spec_tag and tag != spec_tag:
+        return False
+    for key, value in (spec_attrs or {}).items():
+        if key == "class":
+            if not _class_matches(value, attrs.get("class")):
+                return False
+        elif attrs.get(key) != value:
+            return False
+    return True
+
+
+class Field:
+    """First element matching tag/attrs (optionally inside a container).
+
+    The value is the ``attr`` attribute when given and present, otherwise the
+    element's text (joined with ``sep``) when ``text`` is set.  A field with
+    ``inside`` resolves to None once that container closes without a match.
+    """
+
+    def __init__(self, tag, attrs=None, inside=None, attr=None, text=False, sep=" "):
+        self.tag = tag
+        self.attrs = attrs
+        self.inside = inside
+        self.attr = attr
+        self.text = text
+        self.sep = sep
+
+
+class _Extractor(HTMLParser):
+    def __init__(self, fields):
+        super().__init__(convert_charrefs=True)
+        self.fields = fields
+        self.values = {}
+        self.resolved = set()
+        self._open = []          # stack of tag names
+        self._containers = {}    # field name -> depth of its open container
+        self._captures = {}      # field name -> [depth, [strings]]
+        self._skip = 0
+
+    @property
+    def done(self):
+        return len(self.resolved) == len(self.fields)
+
+    def _resolve(self, name, value):
+        if name not in self.resolved:
+            self.values[name] = value
+            self.resolved.add(name)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        self._open.append(tag)
+        depth = len(self._open)
+        if tag in _SKIP_TEXT:
+            self._skip += 1
+        for name, field in self.fields.items():
+            if name in self.resolved or name in self._captures:
+                continue
+            if field.inside is not None and name not in self._containers:
+                if _matches(tag, attrs, *field.inside):
+                    self._containers[name] = depth
+                continue
+            if not _matches(tag, attrs, field.tag, field.attrs):
+                continue
+            if field.attr and attrs.get(field.attr):
+                self._resolve(name, attrs[field.attr])
+            elif field.text:
+                self._captures[name] = [depth, []]
+            else:
+                self._resolve(name, None)
+        if tag in _VOID:
+            # Void elements never get an end tag
+            self.handle_endtag(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag not in self._open:
+            return
+        # Close everything up to the matching open tag (unclosed <p>, <li>, ...)
+        while self._open:
+            depth = len(self._open)
+            closing = self._open.pop()
+            if closing in _SKIP_TEXT:
+                self._skip = max(0, self._skip - 1)
+            for name, (capture_depth, parts) in list(self._captures.items()):
+                if capture_depth == depth:
+                    del self._captures[name]
+                    self._resolve(name, self.fields[name].sep.join(parts))
+            for name, container_depth in list(self._containers.items()):
+                if container_depth == depth:
+                    del self._containers[name]
+                    self._resolve(name, None)
+            if closing == tag:
+                break
+
+    def handle_data(self, data):
+        if self._skip or not self._captures:
+            return
+        data = data.strip()
+        if data:
+            for _, parts in self._captures.values():
+                parts.append(data)
+
+    def finish(self):
+        # Page ended (or was cut off): keep what partial captures collected
+        for name, (_, parts) in list(self._captures.items()):
+            self._resolve(name, self.fields[name].sep.join(parts) or None)
+        self._captures.clear()
+
+
+class Extract:
+    def __init__(self, values, text, complete, stopped_early):
+        self.values = values
+        self.text = text
+        self.complete = complete
+        self.stopped_early = stopped_early
+
+    def get(self, name, default=None):
+        value = self.values.get(name)
+        return default if value is None else value
+
+
+def _record(source, read, total, stopped_early, capped):
+    with _stats_lock:
+        counters = _stats.setdefault(source, {
+            "pages": 0, "early_stops": 0, "capped": 0,
+            "bytes_read": 0, "bytes_total_known": 0, "bytes_saved": 0,
+        })
+        counters["pages"] += 1
+        counters["early_stops"] += int(stopped_early)
+        counters["capped"] += int(capped)
+        counters["bytes_read"] += read
+        if total is not None:
+            counters["bytes_total_known"] += total
+            counters["bytes_saved"] += max(total - read, 0)
+
+
+def fetch_fields(url, fields, source=None, profile="default", max_bytes=None, **kwargs):
+    """Stream url until every field in ``fields`` ({name: Field}) is resolved.
+
+    Returns an Extract; ``text`` is the part of the page that was read, so
+    callers can fall back to a soup parse when a field was not found.
+    """
+    max_bytes = max_bytes or MAX_BYTES
+    started = time.perf_counter()
+    extractor = _Extractor(fields)
+    response = http_client.get(url, profile=profile, stream=True, **kwargs)
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    pieces = []
+    read = 0
+    stopped_early = capped = False
+    complete = True
+    try:
+        response.raise_for_status()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            # The socket timeout is per read; a page that trickles in is cut off here
+            deadline.check()
+            read += len(chunk)
+            text = decoder.decode(chunk)
+            pieces.append(text)
+            extractor.feed(text)
+            if ENABLED and extractor.done:
+                stopped_early = True
+                break
+            if ENABLED and read >= max_bytes:
+                capped = True
+                break
+        else:
+            pieces.append(decoder.decode(b"", final=True))
+        total = response.headers.get("Content-Length")
+        total = int(total) if total and total.isdigit() else None
+        wire = response.raw.tell() if hasattr(response.raw, "tell") else read
+        if stopped_early or capped:
+            complete = False
+            if total is not None and total - wire <= DRAIN_BYTES:
+                for _ in response.iter_content(CHUNK_SIZE):
+                    pass
+                wire = response.raw.tell() if hasattr(response.raw, "tell") else wire
+    finally:
+        response.close()
+    extractor.finish()
+    # Download and parse are interleaved here, so the whole stream counts as fetch
+    metrics.observe("scrape_fetch_seconds", time.perf_counter() - started, source=source or host_of(url), page="detail")
+    metrics.inc("http_downloaded_bytes_total", wire, host=host_of(url))
+    _record(source or host_of(url), wire, total, stopped_early, capped)
+    return Extract(extractor.values, "".join(pieces), complete, stopped_early)
+
+
+def stats():
+    with _stats_lock:
+        sources = {name: dict(counters) for name, counters in _stats.items()}
+    for counters in sources.values():
+        total = counters["bytes_total_known"]
+        counters["saved_pct"] = round(100 * counters["bytes_saved"] / total, 1) if total else None
+    return {
+        "enabled": ENABLED,
+        "max_bytes": MAX_BYTES,
+        "bytes_read": sum(c["bytes_read"] for c in sources.values()),
+        "bytes_saved": sum(c["bytes_saved"] for c in sources.values()),
+        "sources": sources,
+    }
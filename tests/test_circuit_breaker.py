@@ -0,0 +1,121 @@
+import pytest
+
+import circuit_breaker
+import deadline
+import scrape_engine
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuits(monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "_circuits", {})
+    monkeypatch.setattr(circuit_breaker, "FAILURES", 3)
+    monkeypatch.setattr(circuit_breaker, "COOL_OFF", 60)
+    clock = [1000.0]
+    monkeypatch.setattr(circuit_breaker, "time", type("FakeTime", (), {"monotonic": staticmethod(lambda: clock[0])}))
+    return clock
+
+
+def trip(name="site"):
+    for _ in range(circuit_breaker.FAILURES):
+        assert circuit_breaker.allow(name) is False
+        circuit_breaker.failure(name)
+
+
+def test_opens_after_consecutive_failures(fresh_circuits):
+    circuit_breaker.allow("site")
+    circuit_breaker.failure("site")
+    circuit_breaker.success("site")
+    circuit_breaker.failure("site")
+    assert circuit_breaker.states()["site"]["state"] == "closed"
+    circuit_breaker.success("site")
+    trip()
+    assert circuit_breaker.states()["site"]["state"] == "open"
+    with pytest.raises(circuit_breaker.CircuitOpen) as raised:
+        circuit_breaker.allow("site")
+    assert raised.value.retry_after == pytest.approx(60)
+
+
+def test_half_open_trial_closes_on_success(fresh_circuits):
+    trip()
+    fresh_circuits[0] += 61
+    assert circuit_breaker.allow("site") is True
+    assert circuit_breaker.states()["site"]["state"] == "half-open"
+    # Only one trial at a time
+    with pytest.raises(circuit_breaker.CircuitOpen):
+        circuit_breaker.allow("site")
+    circuit_breaker.success("site")
+    assert circuit_breaker.states()["site"] == {"state": "closed", "failures": 0, "retry_after": None}
+    assert circuit_breaker.allow("site") is False
+
+
+def test_failed_trial_reopens_for_another_cool_off(fresh_circuits):
+    trip()
+    fresh_circuits[0] += 61
+    assert circuit_breaker.allow("site") is True
+    circuit_breaker.failure("site")
+    state = circuit_breaker.states()["site"]
+    assert state["state"] == "open" and state["retry_after"] == pytest.approx(60)
+
+
+def test_released_trial_lets_the_next_run_try(fresh_circuits):
+    trip()
+    fresh_circuits[0] += 61
+    assert circuit_breaker.allow("site") is True
+    circuit_breaker.release("site")
+    assert circuit_breaker.allow("site") is True
+
+
+# --- scrape() / scrape_events() hand the trial back on every exit ---
+
+def _spec():
+    return scrape_engine.Source("breaker-test", "http://example.invalid/", items="a", fields={})
+
+
+class _Response:
+    status_code = 200
+    text = "<a></a>"
+
+
+def _in_trial(fresh_circuits, name="breaker-test"):
+    trip(name)
+    fresh_circuits[0] += 61
+
+
+def test_trial_cut_off_by_deadline_is_released(fresh_circuits, monkeypatch):
+    def expired(spec):
+        raise deadline.DeadlineExceeded("request deadline exceeded")
+    monkeypatch.setattr(scrape_engine, "fetch_listing", expired)
+    _in_trial(fresh_circuits)
+    with pytest.raises(deadline.DeadlineExceeded):
+        scrape_engine.scrape(_spec())
+    # Not stuck half-open: the next run is let through as the trial
+    assert circuit_breaker.states()["breaker-test"]["state"] == "open"
+    assert circuit_breaker.allow("breaker-test") is True
+
+
+def test_streamed_trial_cut_off_by_deadline_is_released(fresh_circuits, monkeypatch):
+    def expired(spec):
+        raise deadline.DeadlineExceeded("request deadline exceeded")
+    monkeypatch.setattr(scrape_engine, "fetch_listing", expired)
+    _in_trial(fresh_circuits)
+    with pytest.raises(deadline.DeadlineExceeded):
+        list(scrape_engine.scrape_events(_spec()))
+    assert circuit_breaker.allow("breaker-test") is True
+
+
+def test_abandoned_stream_trial_is_released(fresh_circuits, monkeypatch):
+    monkeypatch.setattr(scrape_engine, "fetch_listing", lambda spec: _Response())
+    monkeypatch.setattr(scrape_engine, "parse_listing", lambda spec, response: [{"title": "a"}, {"title": "b"}])
+    _in_trial(fresh_circuits)
+    events = scrape_engine.scrape_events(_spec())
+    assert next(events)[0] == "article"
+    events.close()   # the client went away mid-stream
+    assert circuit_breaker.allow("breaker-test") is True
+
+
+def test_successful_trial_closes_the_circuit(fresh_circuits, monkeypatch):
+    monkeypatch.setattr(scrape_engine, "fetch_listing", lambda spec: _Response())
+    monkeypatch.setattr(scrape_engine, "parse_listing", lambda spec, response: [{"title": "a"}])
+    _in_trial(fresh_circuits)
+    assert scrape_engine.scrape(_spec()) == [{"title": "a"}]
+    assert circuit_breaker.states()["breaker-test"]["state"] == "closed"
@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import deadline
+
+
+def test_no_deadline_uses_the_default_timeout():
+    assert deadline.remaining() is None
+    assert deadline.timeout() == deadline.DEFAULT_TIMEOUT
+    assert deadline.timeout(3) == 3
+    deadline.check()
+
+
+def test_timeout_is_capped_at_the_time_left():
+    with deadline.within(0.5):
+        assert 0 < deadline.remaining() <= 0.5
+        assert deadline.timeout(30) <= 0.5
+        assert deadline.timeout(0.1) == 0.1
+    assert deadline.remaining() is None
+
+
+def test_expired_deadline_raises():
+    with deadline.within(0.01):
+        time.sleep(0.02)
+        assert deadline.remaining() == 0.0
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.check()
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.timeout(5)
+
+
+def test_nested_deadline_cannot_outlast_its_parent():
+    with deadline.within(0.2):
+        with deadline.within(60):
+            assert deadline.remaining() <= 0.2
+        with deadline.within(0.05):
+            assert deadline.remaining() <= 0.05
+        assert deadline.remaining() > 0.05
+
+
+def test_partial_sources_are_shared_with_the_enclosing_deadline():
+    assert deadline.partial() == []
+    with deadline.within(5):
+        with deadline.within(1):
+            deadline.mark_partial("wired")
+        deadline.mark_partial("forbes")
+        assert deadline.partial() == ["forbes", "wired"]
+    deadline.mark_partial("ignored")   # no deadline: nothing to record on
+    assert deadline.partial() == []
+
+
+def test_submit_carries_the_deadline_into_worker_threads():
+    seen = []
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with deadline.within(0.5):
+            deadline.submit(pool, lambda: seen.append(deadline.remaining())).result()
+            deadline.submit(pool, deadline.mark_partial, "zdnet").result()
+            assert deadline.partial() == ["zdnet"]
+        # A plain submit does not see it
+        pool.submit(lambda: seen.append(deadline.remaining())).result()
+    assert 0 < seen[0] <= 0.5 and seen[1] is None
+
+
+def test_deadlines_are_per_thread():
+    other = []
+    with deadline.within(1):
+        thread = threading.Thread(target=lambda: other.append(deadline.remaining()))
+        thread.start()
+        thread.join()
+    assert other == [None]
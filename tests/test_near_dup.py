@@ -0,0 +1,151 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pytest
+
+import article_db
+import near_dup
+
+STORY = ("Researchers disclosed a critical remote code execution flaw in the popular open source "
+         "web server that lets unauthenticated attackers take over exposed machines; a patch is "
+         "available and administrators are urged to upgrade immediately")
+REWRITE = STORY.replace("Researchers disclosed", "Security researchers have disclosed")
+OTHER = ("The city council approved a new budget for public libraries on Tuesday, adding weekend "
+         "opening hours and funding for a mobile reading van that will visit rural schools")
+
+
+def agreeing(count, base=0):
+    """A signature pair agreeing on exactly their first ``count`` hashes."""
+    a = np.arange(near_dup.NUM_PERM, dtype=np.uint32) + base
+    b = a.copy()
+    b[count:] += 100000
+    return a, b
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    near_dup.reset()
+    yield
+    near_dup.reset()
+
+
+def test_identical_texts_have_identical_signatures():
+    assert near_dup.similarity(near_dup.signature(STORY), near_dup.signature(STORY.upper())) == 1.0
+
+
+def test_similarity_estimates_shingle_overlap():
+    assert near_dup.similarity(near_dup.signature(STORY), near_dup.signature(REWRITE)) >= near_dup.THRESHOLD
+    assert near_dup.similarity(near_dup.signature(STORY), near_dup.signature(OTHER)) < 0.1
+
+
+def test_empty_texts_get_the_sentinel_signature():
+    assert (near_dup.signature("") == 0xFFFFFFFF).all()
+    assert near_dup.signature(None).dtype == np.uint32
+
+
+@pytest.mark.parametrize("count, joined", [
+    (int(np.ceil(near_dup.THRESHOLD * near_dup.NUM_PERM)), True),
+    (int(np.ceil(near_dup.THRESHOLD * near_dup.NUM_PERM)) - 1, False),
+])
+def test_candidates_join_only_at_the_threshold(count, joined):
+    # Both pairs share their first bands, so both are candidates
+    a, b = agreeing(count)
+    assert (near_dup.band_keys(a[None, :])[0][:3] == near_dup.band_keys(b[None, :])[0][:3]).all()
+    index = near_dup.Index()
+    index.add(7, a)
+    index.add(3, b)
+    assert index.find(7) == (3 if joined else 7)
+
+
+def test_bulk_build_matches_incremental_adds():
+    a, b = agreeing(100)
+    c, _ = agreeing(0, base=5000)
+    built = near_dup.Index()
+    built.build([10, 4, 8], np.stack([a, b, c]))
+    assert built.find(10) == built.find(4) == 4
+    assert built.members(4) == {4, 10}
+    assert built.find(8) == 8
+
+    added = near_dup.Index()
+    for article_id, sig in zip([10, 4, 8], [a, b, c]):
+        added.add(article_id, sig)
+    assert {i: added.find(i) for i in (10, 4, 8)} == {i: built.find(i) for i in (10, 4, 8)}
+
+
+def test_clusters_merge_transitively_under_the_smallest_id():
+    # a and b agree on 40 hashes only; the bridge agrees with a on 64, with b on 104
+    a, b = agreeing(40)
+    bridge = np.concatenate([a[:64], b[64:]])
+    index = near_dup.Index()
+    index.add(30, a)
+    index.add(20, b)
+    assert index.find(30) == 30 and index.find(20) == 20
+    assert index.add(25, bridge) == 20
+    assert index.members(20) == {20, 25, 30}
+
+
+def test_index_lookups_see_flushed_and_pending_buckets(monkeypatch):
+    monkeypatch.setattr(near_dup, "PENDING_KEYS", near_dup.BANDS)
+    index = near_dup.Index()
+    a, b = agreeing(near_dup.NUM_PERM)
+    index.add(1, a)
+    c, _ = agreeing(0, base=9000)
+    index.add(2, c)   # past PENDING_KEYS: both are merged into the sorted arrays
+    assert index.pending == {}
+    assert index.add(3, b) == 1
+
+
+def _database(rows):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE articles (id INTEGER PRIMARY KEY, title TEXT, short_desc TEXT, long_desc TEXT, cluster_id INTEGER);
+        CREATE TABLE article_signatures (id INTEGER PRIMARY KEY, signature BLOB NOT NULL);
+    """)
+    conn.executemany("INSERT INTO articles (id, title, short_desc, long_desc) VALUES (?, ?, ?, ?)", rows)
+    return conn
+
+
+def test_update_labels_clusters_and_skips_unchanged_rows():
+    rows = [(1, "Web server flaw", STORY, None), (2, "Budget", OTHER, None), (3, "Server bug", REWRITE, None)]
+    conn = _database(rows)
+    assert near_dup.update(conn, rows) == {1: 1, 3: 1, 2: 2}
+    assert dict(conn.execute("SELECT id, cluster_id FROM articles")) == {1: 1, 2: 2, 3: 1}
+    assert near_dup.update(conn, rows) == {}
+
+    # A fresh process rebuilds the same clusters from the stored signatures
+    near_dup.reset()
+    conn.execute("UPDATE articles SET cluster_id = NULL")
+    assert near_dup.update(conn, rows) == {}
+    assert dict(conn.execute("SELECT id, cluster_id FROM articles")) == {1: 1, 2: 2, 3: 1}
+
+
+def test_update_ignores_rows_without_text():
+    rows = [(1, "", None, None), (2, None, "", None)]
+    conn = _database(rows)
+    assert near_dup.update(conn, rows) == {}
+    assert conn.execute("SELECT COUNT(*) FROM article_signatures").fetchone()[0] == 0
+
+
+def test_rolled_back_save_leaves_no_clusters_behind(tmp_path, monkeypatch):
+    monkeypatch.setattr(article_db, "DB_PATH", str(tmp_path / "articles.sqlite"))
+    monkeypatch.setattr(article_db, "_local", threading.local())
+    monkeypatch.setattr(article_db, "_schema_ready", False)
+    article_db.save_articles("cyberscoop", [{"anchor_link": "https://a.example/1", "title": "Web server flaw", "short_desc": STORY}])
+
+    def update_then_fail(conn, rows):
+        real_update(conn, rows)
+        raise sqlite3.OperationalError("disk I/O error")
+    real_update = near_dup.update
+    monkeypatch.setattr(near_dup, "update", update_then_fail)
+    with pytest.raises(sqlite3.OperationalError):
+        article_db.save_articles("gbhackers", [{"anchor_link": "https://b.example/1", "title": "Server bug", "short_desc": REWRITE}])
+    monkeypatch.setattr(near_dup, "update", real_update)
+    assert near_dup._index is None
+
+    # The next save rebuilds from what was committed.  SQLite hands the rolled-back
+    # row's id to the new article, which must not inherit its signature or cluster.
+    article_db.save_articles("infosecurity", [{"anchor_link": "https://c.example/1", "title": "Budget", "short_desc": OTHER}])
+    assert sorted(near_dup._index.parent) == [1, 2]
+    assert (near_dup._index.signatures[2] == near_dup.signature(near_dup.text_of("Budget", OTHER))).all()
+    assert dict(article_db.connection().execute("SELECT id, cluster_id FROM articles")) == {1: 1, 2: 2}
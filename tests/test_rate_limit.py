@@ -0,0 +1,63 @@
+import pytest
+
+import deadline
+import rate_limit
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    monkeypatch.setattr(rate_limit, "_buckets", {})
+    monkeypatch.setattr(rate_limit, "RESPECT_ROBOTS", False)
+    monkeypatch.setattr(rate_limit, "DEFAULT_RATE", 0.0)
+    monkeypatch.setattr(rate_limit, "BURST", 1.0)
+    monkeypatch.setattr(rate_limit, "HOST_RATES", {"slow.example": 2.0})
+    return fake
+
+
+def test_unlimited_hosts_never_wait(clock):
+    assert rate_limit.rate_for("https://fast.example/a") == 0
+    assert [rate_limit.acquire("https://fast.example/a") for _ in range(5)] == [0.0] * 5
+    assert clock.slept == []
+
+
+def test_requests_are_spaced_at_the_host_rate(clock):
+    waits = [rate_limit.acquire(f"https://slow.example/{i}") for i in range(4)]
+    # The burst of 1 goes straight away, then one slot every 1/rate seconds
+    assert waits == pytest.approx([0.0, 0.5, 0.5, 0.5])
+    assert clock.now == pytest.approx(101.5)
+
+
+def test_idle_time_refills_the_bucket_up_to_the_burst(clock):
+    rate_limit.acquire("https://slow.example/a")
+    clock.now += 10
+    assert rate_limit.acquire("https://slow.example/b") == 0.0
+    assert rate_limit.acquire("https://slow.example/c") == pytest.approx(0.5)
+
+
+def test_hosts_are_limited_independently(clock, monkeypatch):
+    monkeypatch.setitem(rate_limit.HOST_RATES, "other.example", 2.0)
+    rate_limit.acquire("https://slow.example/a")
+    assert rate_limit.acquire("https://other.example/a") == 0.0
+
+
+def test_wait_past_max_wait_raises_without_taking_the_slot(clock):
+    rate_limit.acquire("https://slow.example/a")
+    with pytest.raises(deadline.DeadlineExceeded):
+        rate_limit.acquire("https://slow.example/b", max_wait=0.1)
+    # The refused call left the queue as it was
+    assert rate_limit.acquire("https://slow.example/c", max_wait=1) == pytest.approx(0.5)
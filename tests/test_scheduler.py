@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+import aggregate
+import deadline
+import scheduler
+
+
+def article(n):
+    return {"title": f"Story {n}", "anchor_link": f"https://news.example/{n}"}
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    calls = {"complete": 0, "cut": 0, "slow": 0}
+    release = threading.Event()
+
+    def complete():
+        calls["complete"] += 1
+        return [article(1), article(2)]
+
+    def cut():
+        # Returns its cards but not every detail page before the deadline
+        calls["cut"] += 1
+        deadline.mark_partial("cut")
+        return [article(3)]
+
+    def slow():
+        calls["slow"] += 1
+        release.wait(5)
+        return [article(4)]
+
+    monkeypatch.setattr(aggregate, "SOURCES", {"complete": ("ai", complete), "cut": ("cyber", cut), "slow": ("ai", slow)})
+    yield calls, release
+    release.set()
+
+
+def test_merged_has_the_run_all_shape_and_counts(sources):
+    with deadline.within(5):
+        live = aggregate.run_all(names=["complete", "cut"])
+    with deadline.within(5):
+        merged = scheduler.Scheduler().merged(names=["complete", "cut"])
+    assert set(merged) == set(live)
+    assert (merged["ok"], merged["failed"]) == (live["ok"], live["failed"]) == (2, 0)
+    assert merged["partial"] == live["partial"] == ["cut"]
+    assert merged["sources"]["cut"]["status"] == "partial"
+    assert [a["title"] for a in merged["articles"]] == [a["title"] for a in live["articles"]]
+
+
+def test_a_request_keeps_only_complete_runs(sources):
+    calls, _ = sources
+    jobs = scheduler.Scheduler()
+    with deadline.within(5):
+        assert [a["title"] for a in jobs.latest("cut").articles] == ["Story 3"]
+        jobs.latest("complete")
+    assert jobs.snapshot("cut") is None
+    assert jobs.snapshot("complete").status["status"] == "ok"
+
+    # The next request scrapes again instead of being served the cut run
+    with deadline.within(5):
+        jobs.latest("cut")
+        jobs.latest("complete")
+    assert calls == {"complete": 1, "cut": 2, "slow": 0}
+
+    # A background run (no deadline) stores whatever it got
+    jobs.refresh("cut")
+    assert jobs.snapshot("cut") is not None
+
+
+def test_waiting_for_a_running_refresh_stops_at_the_deadline(sources):
+    calls, release = sources
+    jobs = scheduler.Scheduler()
+    background = threading.Thread(target=jobs.refresh, args=("slow",))
+    background.start()
+    while not calls["slow"]:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    with deadline.within(0.2):
+        with pytest.raises(deadline.DeadlineExceeded):
+            jobs.latest("slow")
+        result = jobs.merged(names=["complete", "slow"])
+    assert time.monotonic() - started < 2
+    assert result["sources"]["slow"]["status"] == "timeout"
+    assert (result["ok"], result["failed"], result["partial"]) == (1, 1, ["slow"])
+
+    release.set()
+    background.join()
+    # Waiters are served the run that finished, not a second scrape
+    with deadline.within(5):
+        assert [a["title"] for a in jobs.latest("slow").articles] == ["Story 4"]
+    assert calls["slow"] == 1
+
+
+def test_a_waiter_scrapes_itself_when_the_run_it_waited_for_kept_nothing(sources):
+    calls, _ = sources
+    jobs = scheduler.Scheduler()
+    lock = jobs._source_locks["cut"]
+    lock.acquire()
+    waiter = []
+    thread = threading.Thread(target=lambda: waiter.append(jobs.refresh("cut")))
+    thread.start()
+    time.sleep(0.05)
+    lock.release()   # the run it waited for stored no snapshot
+    thread.join()
+    assert waiter[0].articles == [article(3)] and calls["cut"] == 1
@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+import article_db
+import near_dup
+
+
+@pytest.fixture(autouse=True)
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(article_db, "DB_PATH", str(tmp_path / "articles.sqlite"))
+    monkeypatch.setattr(article_db, "_local", threading.local())
+    monkeypatch.setattr(article_db, "_schema_ready", False)
+    near_dup.reset()
+    yield
+    near_dup.reset()
+
+
+def article(slug, title, short_desc=None, long_desc=None, timestamp="2025-10-01T00:00:00Z"):
+    return {"anchor_link": f"https://news.example/{slug}", "title": title, "short_desc": short_desc,
+            "long_desc": long_desc, "timestamp": timestamp}
+
+
+def titles(results):
+    return [result["title"] for result in results]
+
+
+def filler(source, count=6):
+    # Unrelated articles, so a term's BM25 weight is not zeroed by appearing everywhere
+    article_db.save_articles(source, [article(f"filler{n}", f"Market update {n}", "Quarterly numbers") for n in range(count)])
+
+
+def plain(results):
+    return [result["title"].replace("<mark>", "").replace("</mark>", "") for result in results]
+
+
+def test_bm25_weights_the_title_over_the_descriptions():
+    filler("gbhackers")
+    article_db.save_articles("gbhackers", [
+        article("body", "Patch Tuesday roundup", "Fixes for Windows", "Includes a ransomware mitigation"),
+        article("title", "Ransomware hits hospitals", "Outage across the region"),
+        article("summary", "Weekly briefing", "A ransomware crew returns"),
+    ])
+    results = article_db.search("ransomware")
+    assert plain(results) == ["Ransomware hits hospitals", "Weekly briefing", "Patch Tuesday roundup"]
+    assert results[0]["score"] > results[1]["score"] > results[2]["score"] > 0
+    assert results[0]["title"] == "<mark>Ransomware</mark> hits hospitals"
+    assert "<mark>ransomware</mark>" in results[1]["snippet"]
+    assert results[0]["anchor_link"] == "https://news.example/title"
+
+
+def test_prefix_and_phrase_queries():
+    article_db.save_articles("infosecurity", [
+        article("a", "Kerberoasting attacks rise", "Zero day exploits in routers"),
+        article("b", "Day one of the conference", "Zero trust and a new exploit kit"),
+    ])
+    assert plain(article_db.search("kerber*")) == ["Kerberoasting attacks rise"]
+    assert article_db.search("kerber") == []
+    assert len(article_db.search("zero day")) == 2
+    assert plain(article_db.search('"zero day" exploit')) == ["Kerberoasting attacks rise"]
+
+
+def test_text_is_escaped_before_it_is_marked():
+    article_db.save_articles("wired", [article("x", "<script>alert(1)</script> botnet takedown")])
+    assert article_db.search("botnet")[0]["title"] == "&lt;script&gt;alert(1)&lt;/script&gt; <mark>botnet</mark> takedown"
+
+
+def test_source_and_publish_date_filters():
+    article_db.save_articles("gbhackers", [article("old", "Old phishing wave", timestamp="2025-01-01T00:00:00Z")])
+    article_db.save_articles("infosecurity", [article("new", "New phishing wave", timestamp="2025-10-01T00:00:00Z")])
+    assert plain(article_db.search("phishing", sources=["gbhackers"])) == ["Old phishing wave"]
+    assert plain(article_db.search("phishing", since=article_db.parse_since("2025-06-01"))) == ["New phishing wave"]
+    assert plain(article_db.search("phishing", until=article_db.parse_since("2025-06-01"))) == ["Old phishing wave"]
+
+
+@pytest.mark.parametrize("text", ["", "   ", "!!", "a*", '""'])
+def test_bad_queries_raise(text):
+    with pytest.raises(ValueError):
+        article_db.search(text)
+
+
+def test_bad_queries_are_a_400():
+    import main
+    client = main.app.test_client()
+    assert client.get("/search?q=").status_code == 400
+    assert client.get("/search?q=a*").status_code == 400
+    assert client.get("/search?q=botnet&since=not-a-date").status_code == 400
+    response = client.get("/search?q=botnet")
+    assert response.status_code == 200
+
+
+def test_index_follows_upserts_and_deletes():
+    article_db.save_articles("arstechnica", [article("x", "Router flaw disclosed")])
+    assert article_db.search("firmware") == []
+
+    # A re-save that fills in the long description indexes it
+    article_db.save_articles("arstechnica", [article("x", "Router flaw disclosed", long_desc="Update the firmware now")])
+    assert plain(article_db.search("firmware")) == ["Router flaw disclosed"]
+
+    conn = article_db.connection()
+    with conn:
+        conn.execute("UPDATE articles SET title = 'Switch flaw disclosed'")
+    assert article_db.search("router") == []
+    assert plain(article_db.search("switch")) == ["Switch flaw disclosed"]
+
+    with conn:
+        conn.execute("DELETE FROM articles")
+    assert article_db.search("firmware") == []
+    conn.execute("INSERT INTO articles_fts (articles_fts, rank) VALUES ('integrity-check', 1)")
+
+
+def test_only_the_newest_candidates_are_ranked(monkeypatch):
+    monkeypatch.setattr(article_db, "SEARCH_CANDIDATES", 2)
+    article_db.save_articles("zdnet", [article("best", "Botnet botnet botnet")])
+    for n in range(3):
+        article_db.save_articles("zdnet", [article(f"n{n}", f"Weekly notes {n}", long_desc="one botnet mention")])
+    assert sorted(plain(article_db.search("botnet", limit=2))) == ["Weekly notes 1", "Weekly notes 2"]
+    # A page past the candidate count widens it
+    assert len(article_db.search("botnet", limit=1, offset=3)) == 1
+    ranked = plain(article_db.search("botnet", limit=4))
+    assert ranked[0] == "Botnet botnet botnet" and len(ranked) == 4
+
+
+def test_an_index_without_prefixes_is_rebuilt(monkeypatch):
+    article_db.save_articles("wired", [article("x", "Kerberoasting explained")])
+    conn = article_db.connection()
+    conn.executescript("BEGIN;" + article_db._FTS_DROP
+                       + article_db._FTS_SCHEMA.replace(",\n    prefix='2 3'", "") + "COMMIT;")
+    assert "prefix=" not in conn.execute("SELECT sql FROM sqlite_master WHERE name = 'articles_fts'").fetchone()[0]
+
+    monkeypatch.setattr(article_db, "_local", threading.local())
+    monkeypatch.setattr(article_db, "_schema_ready", False)
+    assert plain(article_db.search("ke*")) == ["Kerberoasting explained"]
+    assert "prefix=" in article_db.connection().execute(
+        "SELECT sql FROM sqlite_master WHERE name = 'articles_fts'").fetchone()[0]
@@ -0,0 +1,76 @@
+import math
+
+import pytest
+
+import timestamps
+
+# 2025-10-01T00:00:00Z
+OCT_1 = 1759276800
+NOW = OCT_1 + 12 * 3600
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo(monkeypatch):
+    monkeypatch.setattr(timestamps, "_formats", {})
+    monkeypatch.setattr(timestamps, "stats", {"remembered": 0, "detected": 0, "unparsed": 0})
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025-10-01T00:00:00Z", OCT_1),
+    ("2025-10-01T02:00:00+02:00", OCT_1),
+    ("2025-10-01T00:00:00", OCT_1),           # no offset: UTC
+    ("2025-10-01T00:00:00.750Z", OCT_1),      # floored to the second
+    ("October 1, 2025", OCT_1),
+    ("Oct 1, 2025", OCT_1),
+    ("1 October 2025", OCT_1),
+    ("1 Oct 2025, 09:30", OCT_1 + 9 * 3600 + 1800),
+    ("October 1, 2025 01:15 PM", OCT_1 + 13 * 3600 + 900),
+    ("10/01/2025", OCT_1),
+])
+def test_absolute_formats(text, expected):
+    assert timestamps.epoch_ints([text]) == [expected]
+
+
+@pytest.mark.parametrize("text, seconds_ago", [
+    ("3 hours ago", 3 * 3600),
+    ("an hour ago", 3600),
+    ("1 min ago", 60),
+    ("2 days ago", 2 * 86400),
+    ("Yesterday", 86400),
+    ("just now", 0),
+])
+def test_relative_forms_count_back_from_now(text, seconds_ago):
+    assert timestamps.epoch_ints([text], now=NOW) == [NOW - seconds_ago]
+
+
+def test_now_may_be_given_per_value():
+    assert timestamps.epoch_ints(["1 hour ago", "1 hour ago"], now=[NOW, NOW + 60]) == [NOW - 3600, NOW - 3540]
+
+
+def test_unparseable_values_are_missing():
+    epochs = timestamps.to_epoch(["", None, "sometime soon", "Oct 1, 2025"])
+    assert [math.isnan(value) for value in epochs] == [True, True, True, False]
+    assert timestamps.epoch_ints(["", None, "sometime soon"]) == [None, None, None]
+    # Empty values are not counted as unparsed, only text that matched nothing
+    assert timestamps.stats["unparsed"] == 2
+
+
+def test_majority_format_is_remembered_per_source():
+    timestamps.to_epoch(["Oct 1, 2025", "Sep 30, 2025", "2025-09-29T08:00:00Z"], source="nvidia")
+    assert timestamps._formats == {"nvidia": "%b %d, %Y"}
+    assert timestamps.stats["detected"] == 1
+
+    assert timestamps.epoch_ints(["Oct 2, 2025"], source="nvidia") == [OCT_1 + 86400]
+    assert timestamps.stats["remembered"] == 1
+
+
+def test_memo_follows_a_source_that_changes_format():
+    timestamps.to_epoch(["Oct 1, 2025"], source="site")
+    assert timestamps.epoch_ints(["2025-10-01T00:00:00Z"], source="site") == [OCT_1]
+    assert timestamps._formats["site"] == "ISO8601"
+    assert timestamps.stats == {"remembered": 0, "detected": 2, "unparsed": 0}
+
+
+def test_batches_without_a_source_are_not_remembered():
+    timestamps.to_epoch(["Oct 1, 2025"])
+    assert timestamps._formats == {}
@@ -0,0 +1,98 @@
+import math
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- Timestamp normalization ---
+# Sources publish dates as ISO `datetime` attributes (ArsTechnica, DeepMind,
+# CyberScoop), "October 1, 2025" / "Aug 1, 2025" text (GBHackers,
+# CyberExpress, Nvidia) or "3 hours ago" (Forbes).  to_epoch() turns a whole
+# column of them into UTC epoch seconds at once: each candidate format is
+# one vectorized pandas parse over the values still unparsed, so a batch
+# costs a few array passes instead of a parser call per row.  The format
+# that matched most of a source's last batch is tried first next time, so
+# a source in a single format is parsed in one pass.  Values with no offset
+# are taken as UTC; relative ones count back from ``now`` (the scrape time).
+
+# Tried in this order after the source's remembered format
+FORMATS = (
+    "ISO8601",
+    "relative",
+    "%B %d, %Y",         # October 1, 2025
+    "%b %d, %Y",         # Aug 1, 2025
+    "%d %B %Y",          # 1 October 2025
+    "%d %b %Y",          # 1 Oct 2025
+    "%d %b %Y, %H:%M",   # 1 Oct 2025, 09:30 (older InfoSecurity CSV rows)
+    "%B %d, %Y %I:%M %p",
+    "%b %d, %Y %I:%M %p",
+    "%m/%d/%Y",
+)
+
+_RELATIVE = re.compile(
+    r"^(?:(?P<count>\d+|an?|one)\s+(?P<unit>sec|second|min|minute|hour|hr|day|week|month|year)s?\s+ago"
+    r"|(?P<word>just now|now|today|yesterday))$", re.IGNORECASE)
+_UNIT_SECONDS = {
+    "sec": 1, "second": 1, "min": 60, "minute": 60, "hour": 3600, "hr": 3600,
+    "day": 86400, "week": 7 * 86400, "month": 30 * 86400, "year": 365 * 86400,
+}
+_WORD_SECONDS = {"just now": 0, "now": 0, "today": 0, "yesterday": 86400}
+_EPOCH = pd.Timestamp(0, tz="UTC")
+
+_formats = {}   # source -> format that parsed most of its last batch
+_lock = threading.Lock()
+stats = {"remembered": 0, "detected": 0, "unparsed": 0}
+
+
+def _relative(text, now):
+    parts = text.str.lower().str.extract(_RELATIVE)
+    count = pd.to_numeric(parts["count"].replace({"a": "1", "an": "1", "one": "1"}), errors="coerce")
+    seconds = count * parts["unit"].str.lower().map(_UNIT_SECONDS)
+    seconds = seconds.fillna(parts["word"].str.lower().map(_WORD_SECONDS))
+    return (now - seconds.astype("float64")).to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _parse(text, fmt, now):
+    """Epoch seconds (float, NaN where ``fmt`` does not match) for a string Series."""
+    if fmt == "relative":
+        return _relative(text, now)
+    parsed = pd.to_datetime(text, format=fmt, utc=True, errors="coerce")
+    return (parsed - _EPOCH).dt.total_seconds().to_numpy(dtype="float64", na_value=np.nan)
+
+
+def to_epoch(values, source=None, now=None):
+    """UTC epoch seconds (float64 array, NaN when unparseable) for a column of timestamps.
+
+    ``now`` (default: the current time) is an epoch, or one per value.
+    """
+    text = pd.Series(list(values), dtype="string").str.strip()
+    now = np.broadcast_to(np.asarray(time.time() if now is None else now, dtype="float64"), len(text))
+    epochs = np.full(len(text), np.nan)
+    todo = np.flatnonzero(text.fillna("").to_numpy() != "")
+    remembered = _formats.get(source)
+    order = ([remembered] if remembered else []) + [fmt for fmt in FORMATS if fmt != remembered]
+    matched = {}
+    for fmt in order:
+        if not len(todo):
+            break
+        parsed = _parse(text.iloc[todo].reset_index(drop=True), fmt, now[todo])
+        hit = ~np.isnan(parsed)
+        if hit.any():
+            epochs[todo[hit]] = parsed[hit]
+            matched[fmt] = int(hit.sum())
+            todo = todo[~hit]
+    with _lock:
+        if matched:
+            best = max(matched, key=matched.get)
+            stats["remembered" if best == remembered else "detected"] += 1
+            if source is not None:
+                _formats[source] = best
+        stats["unparsed"] += len(todo)
+    return np.floor(epochs)
+
+
+def epoch_ints(values, source=None, now=None):
+    """to_epoch() as a list of ints, None for unparseable values (for SQLite)."""
+    return [None if math.isnan(value) else int(value) for value in to_epoch(values, source, now).tolist()]